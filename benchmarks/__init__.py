@@ -0,0 +1,6 @@
+"""Benchmarks for the cc hot paths. Run modules with ``python -m benchmarks.<name>``.
+
+``benchmarks.suite`` runs everything, writes JSON results and checks them
+against a baseline; ``benchmarks.synthetic`` and ``benchmarks.fake_ffmpeg``
+provide its inputs.
+"""
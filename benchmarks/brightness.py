@@ -0,0 +1,78 @@
+"""Frames/sec of the per-frame brightness statistics.
+
+Compares the original per-byte loop from ``cc.decoder`` against the pure-Python
+and NumPy paths of ``cc.brightness.brightness_stats``::
+
+    python -m benchmarks.brightness --width 1280 --height 720
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Callable
+
+from cc.brightness import brightness_stats, numpy_available
+
+
+def _legacy_brightness_stats(frame_bytes: bytes) -> dict[str, float]:
+    if not frame_bytes:
+        return {"mean": 0.0, "min": 0.0, "max": 0.0}
+    total = 0
+    min_value = 255
+    max_value = 0
+    for value in frame_bytes:
+        total += value
+        if value < min_value:
+            min_value = value
+        if value > max_value:
+            max_value = value
+    mean = total / len(frame_bytes)
+    return {"mean": float(mean), "min": float(min_value), "max": float(max_value)}
+
+
+def _frames_per_second(
+    func: Callable[[bytes], object], frame: bytes, min_seconds: float
+) -> float:
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds or count == 0:
+        func(frame)
+        count += 1
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    frame = os.urandom(args.width * args.height * 3)
+    cases: list[tuple[str, Callable[[bytes], object]]] = [
+        ("legacy loop", _legacy_brightness_stats),
+        ("python", lambda data: brightness_stats(data, use_numpy=False)),
+    ]
+    if numpy_available():
+        cases.append(("numpy", lambda data: brightness_stats(data, use_numpy=True)))
+        cases.append(
+            (
+                "numpy subsample=4",
+                lambda data: brightness_stats(data, subsample=4, use_numpy=True),
+            )
+        )
+
+    print(f"rgb24 {args.width}x{args.height}")
+    baseline = None
+    for name, func in cases:
+        fps = _frames_per_second(func, frame, args.seconds)
+        baseline = baseline or fps
+        print(f"{name:>20}: {fps:10.1f} frames/s  ({fps / baseline:7.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
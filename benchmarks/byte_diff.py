@@ -0,0 +1,99 @@
+"""Frames/sec of the hash-diff byte comparison.
+
+Compares the original per-index loop from ``cc.strategies`` against the
+word-wise XOR and NumPy paths of ``_byte_diff_ratio``, on a near-duplicate
+frame (full scan) and a changed frame (early exit at the threshold)::
+
+    python -m benchmarks.byte_diff --width 1280 --height 720
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Callable
+
+from benchmarks.brightness import _frames_per_second
+from cc import strategies
+
+
+def _legacy_byte_diff_ratio(previous: bytes, current: bytes) -> float:
+    max_len = max(len(previous), len(current))
+    if max_len == 0:
+        return 0.0
+    diff = 0
+    for idx in range(max_len):
+        prev_byte = previous[idx] if idx < len(previous) else None
+        curr_byte = current[idx] if idx < len(current) else None
+        if prev_byte != curr_byte:
+            diff += 1
+    return diff / max_len
+
+
+def _with_numpy(enabled: bool, func: Callable[[], object]) -> Callable[[bytes], object]:
+    numpy_module = strategies._np
+
+    def _run(_: bytes) -> object:
+        strategies._np = numpy_module if enabled else None
+        try:
+            return func()
+        finally:
+            strategies._np = numpy_module
+
+    return _run
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    previous = os.urandom(args.width * args.height * 3)
+    similar = bytearray(previous)
+    for index in range(0, len(similar), 1000):
+        similar[index] ^= 0xFF
+    near_duplicate = bytes(similar)
+    changed = os.urandom(len(previous))
+
+    cases: list[tuple[str, Callable[[bytes], object]]] = [
+        ("legacy loop", lambda _: _legacy_byte_diff_ratio(previous, near_duplicate)),
+    ]
+    for label, enabled in (("xor", False), ("numpy", True)):
+        if enabled and strategies._np is None:
+            continue
+        cases.append(
+            (
+                f"{label} near-duplicate",
+                _with_numpy(
+                    enabled,
+                    lambda: strategies._byte_diff_ratio(
+                        previous, near_duplicate, limit=args.threshold
+                    ),
+                ),
+            )
+        )
+        cases.append(
+            (
+                f"{label} changed",
+                _with_numpy(
+                    enabled,
+                    lambda: strategies._byte_diff_ratio(
+                        previous, changed, limit=args.threshold
+                    ),
+                ),
+            )
+        )
+
+    print(f"rgb24 {args.width}x{args.height}, threshold {args.threshold}")
+    baseline = None
+    for name, func in cases:
+        fps = _frames_per_second(func, previous, args.seconds)
+        baseline = baseline or fps
+        print(f"{name:>22}: {fps:10.1f} frames/s  ({fps / baseline:8.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
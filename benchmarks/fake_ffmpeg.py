@@ -0,0 +1,418 @@
+"""Stand-in ffmpeg/ffprobe that "decodes" a :class:`SyntheticClip` JSON file.
+
+It covers the options :class:`cc.decoder.FFmpegDecoder` and
+``FFmpegAVDecoder`` pass: ffprobe ``-show_streams``/``-show_frames``/
+``-show_packets`` and ``-show_entries`` packet/format sections; ffmpeg ``-ss``, ``-copyts``,
+``-start_at_zero`` and ``-skip_frame`` inputs and any
+number of ``rawvideo``/``s16le`` outputs to ``-`` or ``pipe:N``, with the
+``scale``, ``fps``, ``format``, ``showinfo`` and ``ashowinfo`` filters.
+Frames are rendered at the output size rather than resampled. Outputs are
+written interleaved in PTS order with showinfo lines on stderr, like the real
+thing, so benchmarks can run the decoders where ffmpeg is not installed::
+
+    ffmpeg_path = fake_ffmpeg.install(directory)
+    FFmpegDecoder(clip.save(directory / "clip.json"), ffmpeg_path=ffmpeg_path)
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import stat
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, Iterator, Optional
+
+from benchmarks.synthetic import PIX_FMTS, SyntheticClip
+
+# Options that take no value; every other option consumes the next argument.
+_FLAGS = {
+    "-y",
+    "-hide_banner",
+    "-nostats",
+    "-noaccurate_seek",
+    "-copyts",
+    "-start_at_zero",
+}
+_ROOT = Path(__file__).resolve().parent.parent
+
+_Write = Callable[[], None]
+
+
+class FakeFFmpegError(Exception):
+    pass
+
+
+def install(directory: str | Path) -> str:
+    """Write ``ffmpeg`` and ``ffprobe`` launchers into ``directory``.
+
+    Returns the ffmpeg path. The decoder finds ffprobe by replacing
+    ``"ffmpeg"`` in that path, so ``directory`` itself must not contain it.
+    """
+
+    directory = Path(directory).resolve()
+    if "ffmpeg" in str(directory):
+        raise ValueError("The fake ffmpeg directory must not contain 'ffmpeg'.")
+    directory.mkdir(parents=True, exist_ok=True)
+    for tool in ("ffmpeg", "ffprobe"):
+        path = directory / tool
+        path.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"sys.path.insert(0, {str(_ROOT)!r})\n"
+            "from benchmarks.fake_ffmpeg import main\n"
+            f"sys.exit(main([{tool!r}, *sys.argv[1:]]))\n",
+            encoding="utf-8",
+        )
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return str(directory / "ffmpeg")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("ffmpeg", "ffprobe"):
+        print("usage: fake_ffmpeg {ffmpeg,ffprobe} ARGS...", file=sys.stderr)
+        return 2
+    try:
+        if argv[0] == "ffprobe":
+            return _ffprobe(argv[1:])
+        return _ffmpeg(argv[1:])
+    except FakeFFmpegError as exc:
+        print(f"fake {argv[0]}: {exc}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # The reader stopped early, as when a consumer breaks out of a loop.
+        return 1
+
+
+def _ffprobe(args: list[str]) -> int:
+    clip = SyntheticClip.load(args[-1])
+    options = args[:-1]
+    video = True
+    if "-select_streams" in options:
+        video = options[options.index("-select_streams") + 1].startswith("v")
+    # -show_entries prints the sections it names, e.g. "packet=...:format=...".
+    sections = set()
+    if "-show_entries" in options:
+        entries = options[options.index("-show_entries") + 1]
+        sections = {entry.split("=")[0] for entry in entries.split(":")}
+    payload: dict[str, object] = {}
+    if "-show_streams" in options:
+        payload["streams"] = _probe_streams(clip, video)
+    if "-show_frames" in options:
+        payload["frames"] = _probe_frames(clip, video)
+    if "-show_packets" in options or "packet" in sections:
+        keyframes = set(clip.keyframe_pts())
+        payload["packets"] = [
+            {
+                "pts_time": _time(clip.start_time + pts),
+                "flags": "K__" if pts in keyframes else "___",
+            }
+            for pts in clip.video_pts()
+        ]
+    if "format" in sections:
+        payload["format"] = {"start_time": _time(clip.start_time)}
+    json.dump(payload, sys.stdout)
+    return 0
+
+
+def _probe_streams(clip: SyntheticClip, video: bool) -> list[dict[str, object]]:
+    if video:
+        return [
+            {
+                "codec_type": "video",
+                "width": clip.width,
+                "height": clip.height,
+                "pix_fmt": "yuv420p",
+            }
+        ]
+    if clip.audio is None:
+        return []
+    return [
+        {
+            "codec_type": "audio",
+            "channels": clip.channels,
+            "sample_rate": str(clip.sample_rate),
+            "sample_fmt": "s16",
+        }
+    ]
+
+
+def _probe_frames(clip: SyntheticClip, video: bool) -> list[dict[str, object]]:
+    # ffprobe reports the input's own timestamps, offset by its start time.
+    start = clip.start_time
+    if video:
+        return [
+            {"media_type": "video", "pts_time": _time(start + pts)}
+            for pts in clip.video_pts()
+        ]
+    return [
+        {"media_type": "audio", "pts_time": _time(start + pts), "nb_samples": count}
+        for pts, count in clip.audio_frames()
+    ]
+
+
+@dataclass
+class _Output:
+    target: str
+    options: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_audio(self) -> bool:
+        stream = self.options.get("-map")
+        if stream is not None:
+            return stream.startswith("0:a")
+        return self.options.get("-f") == "s16le"
+
+    def filters(self, key: str) -> list[tuple[str, str]]:
+        chain = self.options.get(key)
+        if not chain:
+            return []
+        parsed = []
+        for part in _split_filters(chain):
+            name, _, value = part.partition("=")
+            parsed.append((name, value))
+        return parsed
+
+
+@dataclass(frozen=True)
+class _Input:
+    path: str
+    seek: Optional[float]
+    copyts: bool
+    start_at_zero: bool
+    keyframes_only: bool
+
+    def offset(self, clip: SyntheticClip, start: Optional[float]) -> float:
+        """What to subtract from zero-based clip times to get output PTS.
+
+        Like ffmpeg, output starts at zero (or at the seek point) unless
+        ``-copyts`` keeps the input timestamps, which ``-start_at_zero``
+        shifts back by the input's start time.
+        """
+
+        if not self.copyts:
+            return start or 0.0
+        return 0.0 if self.start_at_zero else -clip.start_time
+
+
+def _ffmpeg(args: list[str]) -> int:
+    source, outputs = _parse_command(args)
+    clip = SyntheticClip.load(source.path)
+    start = None
+    if source.seek is not None:
+        # -noaccurate_seek: decoding starts at the keyframe at or before -ss.
+        start = max(
+            (pts for pts in clip.keyframe_pts() if pts <= source.seek), default=0.0
+        )
+    streams = []
+    files: list[IO[bytes]] = []
+    try:
+        for order, output in enumerate(outputs):
+            handle = _open_target(output.target)
+            files.append(handle)
+            if output.is_audio:
+                events = _audio_events(clip, output, handle, start, source)
+            else:
+                events = _video_events(clip, output, handle, start, source)
+            streams.append(((pts, order, write) for pts, write in events))
+        for _, _, write in heapq.merge(*streams, key=lambda event: event[:2]):
+            write()
+    finally:
+        for handle in files:
+            try:
+                handle.close()
+            except BrokenPipeError:
+                pass
+    return 0
+
+
+def _parse_command(args: list[str]) -> tuple[_Input, list[_Output]]:
+    try:
+        input_index = args.index("-i")
+    except ValueError:
+        raise FakeFFmpegError("no -i input given.") from None
+    input_options = _options(args[:input_index])
+    skip_frame = input_options.get("-skip_frame", "default")
+    if skip_frame not in ("default", "none", "nokey"):
+        raise FakeFFmpegError(f"unsupported -skip_frame {skip_frame}.")
+    seek = input_options.get("-ss")
+    source = _Input(
+        path=args[input_index + 1],
+        seek=float(seek) if seek is not None else None,
+        copyts="-copyts" in args[:input_index],
+        start_at_zero="-start_at_zero" in args[:input_index],
+        keyframes_only=skip_frame == "nokey",
+    )
+    outputs = []
+    pending: list[str] = []
+    rest = iter(args[input_index + 2 :])
+    for arg in rest:
+        if arg == "-" or not arg.startswith("-"):
+            outputs.append(_Output(arg, _options(pending)))
+            pending = []
+        elif arg in _FLAGS:
+            pending.append(arg)
+        else:
+            pending += [arg, next(rest, "")]
+    if not outputs:
+        raise FakeFFmpegError("no output given.")
+    return source, outputs
+
+
+def _options(args: list[str]) -> dict[str, str]:
+    options = {}
+    index = 0
+    while index < len(args):
+        if args[index] in _FLAGS:
+            options[args[index]] = ""
+            index += 1
+        else:
+            options[args[index]] = args[index + 1] if index + 1 < len(args) else ""
+            index += 2
+    return options
+
+
+def _video_events(
+    clip: SyntheticClip,
+    output: _Output,
+    handle: IO[bytes],
+    start: Optional[float],
+    source: _Input,
+) -> Iterator[tuple[float, _Write]]:
+    pix_fmt = output.options.get("-pix_fmt", "rgb24")
+    if pix_fmt not in PIX_FMTS:
+        raise FakeFFmpegError(f"unsupported -pix_fmt {pix_fmt}.")
+    width, height = clip.width, clip.height
+    fps: Optional[float] = None
+    showinfo = False
+    for name, value in output.filters("-vf"):
+        if name == "scale":
+            width, height = _scaled_size(value, width, height)
+        elif name == "fps":
+            fps = float(value)
+        elif name == "showinfo":
+            showinfo = True
+        elif name != "format":
+            raise FakeFFmpegError(f"unsupported video filter {name}.")
+    renderer = clip.renderer(width, height)
+    keyframes = set(clip.keyframe_pts())
+    offset = source.offset(clip, start)
+    last_slot = None
+    count = 0
+    for index, pts in enumerate(clip.video_pts()):
+        if start is not None and pts < start:
+            continue
+        if source.keyframes_only and pts not in keyframes:
+            continue
+        if fps is not None:
+            slot = int(pts * fps + 1e-6)
+            if slot == last_slot:
+                continue
+            last_slot = slot
+            pts = slot / fps
+        out_pts = pts - offset
+        log = None
+        if showinfo:
+            log = (
+                f"[Parsed_showinfo_0 @ 0x0] n:{count:4d}"
+                f" pts:{round(out_pts * 90000):7d} pts_time:{_time(out_pts):<8}"
+                f" duration:1 fmt:{pix_fmt}"
+                f" s:{width}x{height} iskey:{int(pts in keyframes)}\n"
+            )
+        count += 1
+        yield out_pts, _writer(handle, log, lambda i=index: renderer.frame(i, pix_fmt))
+
+
+def _audio_events(
+    clip: SyntheticClip,
+    output: _Output,
+    handle: IO[bytes],
+    start: Optional[float],
+    source: _Input,
+) -> Iterator[tuple[float, _Write]]:
+    if output.options.get("-f") != "s16le":
+        raise FakeFFmpegError("audio output must be -f s16le.")
+    if clip.audio is None:
+        raise FakeFFmpegError("the input has no audio stream.")
+    rate = int(output.options.get("-ar", clip.sample_rate))
+    if rate != clip.sample_rate:
+        raise FakeFFmpegError("resampling is not supported.")
+    channels = int(output.options.get("-ac", clip.channels))
+    showinfo = any(name == "ashowinfo" for name, _ in output.filters("-af"))
+    offset = source.offset(clip, start)
+    position = 0
+    count = 0
+    for pts, samples in clip.audio_frames():
+        first = position
+        position += samples
+        if start is not None and pts < start:
+            continue
+        out_pts = pts - offset
+        log = None
+        if showinfo:
+            log = (
+                f"[Parsed_ashowinfo_0 @ 0x0] n:{count} pts:{first}"
+                f" pts_time:{_time(out_pts)} fmt:s16 channels:{channels}"
+                f" rate:{rate} nb_samples:{samples} checksum:00000000\n"
+            )
+        count += 1
+        yield out_pts, _writer(
+            handle, log, lambda a=first, n=samples: clip.pcm(a, n, channels)
+        )
+
+
+def _writer(
+    handle: IO[bytes], log: Optional[str], payload: Callable[[], bytes]
+) -> _Write:
+    def write() -> None:
+        if log is not None:
+            sys.stderr.write(log)
+            sys.stderr.flush()
+        handle.write(payload())
+        # ffmpeg writes every packet through; readers wait on small proxy
+        # and audio packets that would otherwise sit in the buffer.
+        handle.flush()
+
+    return write
+
+
+def _open_target(target: str) -> IO[bytes]:
+    if target in ("-", "pipe:1", "pipe:"):
+        return os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    if target.startswith("pipe:"):
+        return os.fdopen(int(target[len("pipe:") :]), "wb")
+    return open(target, "wb")
+
+
+def _scaled_size(value: str, width: int, height: int) -> tuple[int, int]:
+    target_width, target_height = (int(part) for part in value.split(":")[:2])
+    if target_width < 0:
+        target_width = max(2, round(target_height * width / height / 2) * 2)
+    elif target_height < 0:
+        target_height = max(2, round(target_width * height / width / 2) * 2)
+    return target_width, target_height
+
+
+def _split_filters(chain: str) -> list[str]:
+    parts, current, quoted = [], [], False
+    for char in chain:
+        if char == "'":
+            quoted = not quoted
+        if char == "," and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _time(value: float) -> str:
+    return repr(round(value, 6))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
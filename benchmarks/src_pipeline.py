@@ -0,0 +1,87 @@
+"""Throughput of the ``src/cc`` :class:`Pipeline` on synthetic frames.
+
+``src/cc`` and the root ``cc`` package share the import name ``cc``, so this
+module must run with ``src`` first on ``sys.path``; the suite starts it in a
+subprocess from the ``src`` directory. It prints one JSON object of
+``{name: measurement}``::
+
+    cd src && PYTHONPATH=.. python -m benchmarks.src_pipeline --seconds 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any
+
+from benchmarks.synthetic import SceneRenderer
+from benchmarks.timing import measure
+from cc import ContentFingerprinter, DedupHistory, ExactHashStrategy, Pipeline
+from cc import FramePacket, PipelineStage
+
+
+class _DecodeStage(PipelineStage):
+    def __init__(self, fps: float) -> None:
+        self.fps = fps
+        self.fingerprinter = ContentFingerprinter()
+
+    def process(self, packet: Any, context: dict[str, Any]) -> FramePacket:
+        index, data = packet
+        return FramePacket(
+            frame_id=str(index),
+            timestamp=index / self.fps,
+            data=data,
+            fingerprinter=self.fingerprinter,
+        )
+
+
+class _BrightnessStage(PipelineStage):
+    def process(self, packet: FramePacket, context: dict[str, Any]) -> FramePacket:
+        packet.features["brightness"] = sum(packet.data) / (255 * len(packet.data))
+        return packet
+
+
+def run(
+    *,
+    scene: str = "flicker",
+    width: int = 320,
+    height: int = 240,
+    frames: int = 100,
+    min_seconds: float = 0.2,
+    rounds: int = 3,
+) -> dict[str, dict[str, float]]:
+    renderer = SceneRenderer(scene, width, height)
+    packets = [(index, renderer.frame(index)) for index in range(frames)]
+    results = {}
+    for name, threaded in (("serial", False), ("threaded", True)):
+
+        def _run(threaded: bool = threaded) -> None:
+            pipeline = Pipeline(
+                decoder=_DecodeStage(fps=25.0),
+                feature_extractor=_BrightnessStage(),
+                dedup_strategy=ExactHashStrategy(),
+                history=DedupHistory(max_size=64),
+                threaded=threaded,
+            )
+            for _ in pipeline.run(packets):
+                pass
+
+        measurement = measure(
+            _run, items=frames, min_seconds=min_seconds, rounds=rounds
+        )
+        results[f"src_pipeline.{name}"] = measurement.as_dict()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args(argv)
+    results = run(min_seconds=args.seconds, rounds=args.rounds, frames=args.frames)
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
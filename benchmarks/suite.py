@@ -0,0 +1,754 @@
+"""Benchmark suite with JSON results and regression thresholds.
+
+Micro benchmarks time one hot function on synthetic input. End-to-end ones
+run ``FrameDeduper``, ``dedup.Deduplicator``, the ``src/cc`` ``Pipeline`` and
+the decoders over synthetic clips::
+
+    python -m benchmarks.suite --output base.json
+    python -m benchmarks.suite --baseline base.json --output head.json
+
+The decoders use the real ffmpeg and ffprobe when both are on ``PATH``
+(``--ffmpeg real`` requires them) and :mod:`benchmarks.fake_ffmpeg`
+otherwise; results only compare against a baseline run with the same one.
+With ``--baseline`` every benchmark whose best rate fell by more than its
+threshold is reported and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from benchmarks import fake_ffmpeg
+from benchmarks.synthetic import SceneRenderer, SyntheticClip, audio_samples
+from benchmarks.synthetic import write_media
+from benchmarks.timing import Measurement, measure
+
+_FORMAT_VERSION = 1
+_ROOT = Path(__file__).resolve().parent.parent
+_MICRO_THRESHOLD = 0.10
+_E2E_THRESHOLD = 0.20
+# Subprocess-bound runs are the noisiest.
+_PROCESS_THRESHOLD = 0.30
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    group: str
+    unit: str
+    threshold: float
+    run: Callable[["_Context"], Measurement]
+
+
+@dataclass
+class _Context:
+    width: int
+    height: int
+    frames: int
+    min_seconds: float
+    rounds: int
+    ffmpeg: str
+    directory: Path
+    _ffmpeg_path: Optional[str] = None
+    _clip_paths: dict[tuple[float, bool], str] = field(default_factory=dict)
+    _src_results: Optional[dict[str, Any]] = None
+    _cache: dict[str, Any] = field(default_factory=dict)
+
+    def measure(self, func: Callable[[], object], items: int = 1) -> Measurement:
+        return measure(
+            func, items=items, min_seconds=self.min_seconds, rounds=self.rounds
+        )
+
+    def renderer(self, scene: str) -> SceneRenderer:
+        return SceneRenderer(scene, self.width, self.height)
+
+    def clip(self, start_time: float = 0.0, *, audio: bool = True) -> SyntheticClip:
+        return SyntheticClip(
+            width=self.width,
+            height=self.height,
+            frames=self.frames,
+            scene="pan",
+            audio="tone" if audio else None,
+            start_time=start_time,
+        )
+
+    def media(
+        self, start_time: float = 0.0, *, audio: bool = True
+    ) -> tuple[str, str]:
+        """ffmpeg path and input path of the decoder benchmarks."""
+
+        if self._ffmpeg_path is None:
+            if self.ffmpeg == "real":
+                self._ffmpeg_path = "ffmpeg"
+            else:
+                self._ffmpeg_path = fake_ffmpeg.install(self.directory / "bin")
+        key = (start_time, audio)
+        if key not in self._clip_paths:
+            clip = self.clip(start_time, audio=audio)
+            name = f"clip-{start_time:g}" if audio else f"clip-{start_time:g}-video"
+            if self.ffmpeg == "real":
+                media = write_media(clip, self.directory / f"{name}.mkv")
+            else:
+                media = clip.save(self.directory / f"{name}.json")
+            self._clip_paths[key] = str(media)
+        return self._ffmpeg_path, self._clip_paths[key]
+
+    def src_results(self) -> dict[str, Any]:
+        if self._src_results is None:
+            self._src_results = _run_src_pipeline(self)
+        return self._src_results
+
+
+_BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(
+    name: str, *, group: str, unit: str = "frames", threshold: float
+) -> Callable[[Callable[[_Context], Measurement]], Callable[[_Context], Measurement]]:
+    def register(
+        func: Callable[[_Context], Measurement],
+    ) -> Callable[[_Context], Measurement]:
+        _BENCHMARKS.append(Benchmark(name, group, unit, threshold, func))
+        return func
+
+    return register
+
+
+def benchmarks() -> list[Benchmark]:
+    return list(_BENCHMARKS)
+
+
+@contextmanager
+def _without_numpy(module: Any) -> Iterator[None]:
+    numpy_module = module._np
+    module._np = None
+    try:
+        yield
+    finally:
+        module._np = numpy_module
+
+
+def _numpy_version() -> Optional[str]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy.__version__
+
+
+# Micro benchmarks ---------------------------------------------------------
+
+
+def _frame_stats(context: _Context, pix_fmt: str) -> Measurement:
+    from cc.decoder import _FrameLayout
+
+    layout = _FrameLayout(context.width, context.height, pix_fmt)
+    frame = context.renderer("pan").frame(0, pix_fmt)
+    return context.measure(lambda: layout.stats(frame))
+
+
+@benchmark("decoder.frame_stats[rgb24]", group="micro", threshold=_MICRO_THRESHOLD)
+def _frame_stats_rgb24(context: _Context) -> Measurement:
+    return _frame_stats(context, "rgb24")
+
+
+@benchmark("decoder.frame_stats[gray]", group="micro", threshold=_MICRO_THRESHOLD)
+def _frame_stats_gray(context: _Context) -> Measurement:
+    return _frame_stats(context, "gray")
+
+
+def _band_energy(context: _Context, python: bool) -> Measurement:
+    from cc import features
+
+    samples = audio_samples("tone", 48000, 1024)
+
+    def run() -> None:
+        features._compute_band_energy(samples, 48000, features._DEFAULT_BANDS)
+
+    with ExitStack() as stack:
+        if python:
+            if features._np is None:
+                raise BenchmarkSkipped("NumPy is not installed, see the plain run.")
+            stack.enter_context(_without_numpy(features))
+        return context.measure(run)
+
+
+@benchmark(
+    "features.band_energy", group="micro", unit="packets", threshold=_MICRO_THRESHOLD
+)
+def _band_energy_default(context: _Context) -> Measurement:
+    return _band_energy(context, python=False)
+
+
+@benchmark(
+    "features.band_energy[python]",
+    group="micro",
+    unit="packets",
+    threshold=_MICRO_THRESHOLD,
+)
+def _band_energy_python(context: _Context) -> Measurement:
+    return _band_energy(context, python=True)
+
+
+def _byte_diff(context: _Context, changed: bool) -> Measurement:
+    from cc import strategies
+
+    renderer = context.renderer("pan")
+    previous = renderer.frame(0)
+    if changed:
+        current = renderer.frame(1)
+    else:
+        similar = bytearray(previous)
+        for index in range(0, len(similar), 1000):
+            similar[index] ^= 0xFF
+        current = bytes(similar)
+    return context.measure(
+        lambda: strategies._byte_diff_ratio(previous, current, limit=0.05)
+    )
+
+
+@benchmark(
+    "strategies.byte_diff[near-duplicate]",
+    group="micro",
+    threshold=_MICRO_THRESHOLD,
+)
+def _byte_diff_near(context: _Context) -> Measurement:
+    return _byte_diff(context, changed=False)
+
+
+@benchmark("strategies.byte_diff[changed]", group="micro", threshold=_MICRO_THRESHOLD)
+def _byte_diff_changed(context: _Context) -> Measurement:
+    return _byte_diff(context, changed=True)
+
+
+def _frame_features(context: _Context, count: int) -> list[Any]:
+    key = f"features:{count}"
+    if key not in context._cache:
+        from cc.features import _DEFAULT_BANDS, _compute_band_energy
+        from dedup import FrameFeatures
+
+        renderer = context.renderer("pan")
+        features = []
+        for index in range(count):
+            luma = renderer.luma(index)
+            samples = audio_samples("noise", 48000, 1024, start=index * 1024)
+            features.append(
+                FrameFeatures(
+                    brightness=sum(luma) / (255 * len(luma)),
+                    audio_energy=sum(s * s for s in samples) / len(samples),
+                    audio_spectrum=tuple(
+                        _compute_band_energy(samples, 48000, _DEFAULT_BANDS).values()
+                    ),
+                    resolution=(context.width, context.height),
+                )
+            )
+        context._cache[key] = features
+    return context._cache[key]
+
+
+def _is_duplicate(context: _Context, history_size: int) -> Measurement:
+    from dedup import DedupConfig, Deduplicator
+
+    features = _frame_features(context, history_size + 1)
+    deduplicator = Deduplicator(DedupConfig(history_size=history_size))
+    for previous in features[:-1]:
+        deduplicator.add(previous)
+    # Far brighter than the history, so no entry matches and every one is
+    # compared: the worst case.
+    current = replace(features[-1], brightness=features[-1].brightness + 0.5)
+    return context.measure(lambda: deduplicator.is_duplicate(current))
+
+
+@benchmark("dedup.is_duplicate[history=5]", group="micro", threshold=_MICRO_THRESHOLD)
+def _is_duplicate_small(context: _Context) -> Measurement:
+    return _is_duplicate(context, 5)
+
+
+@benchmark("dedup.is_duplicate[history=32]", group="micro", threshold=_MICRO_THRESHOLD)
+def _is_duplicate_large(context: _Context) -> Measurement:
+    return _is_duplicate(context, 32)
+
+
+# End-to-end benchmarks ----------------------------------------------------
+
+
+def _frame_deduper(context: _Context, strategy: str, batch: bool) -> Measurement:
+    from cc import DedupeConfig, FrameDeduper, StrategyConfig
+
+    params = {"width": context.width, "height": context.height}
+    config = DedupeConfig(
+        strategies={strategy: StrategyConfig(threshold=0.05, params=params)}
+    )
+    renderer = context.renderer("flicker")
+    pan = context.renderer("pan")
+    # Runs of repeated, flickering and panning frames.
+    frames = [
+        renderer.frame(index // 3) if index % 20 < 10 else pan.frame(index)
+        for index in range(context.frames)
+    ]
+
+    batch_frames: Any = frames
+    if batch:
+        # process_batch vectorizes over an (N, H, W, C) array; separate
+        # buffers are compared a row at a time.
+        from cc import strategies
+
+        if strategies._np is None:
+            raise BenchmarkSkipped("NumPy is not installed.")
+        batch_frames = strategies._np.frombuffer(
+            b"".join(frames), dtype=strategies._np.uint8
+        ).reshape(len(frames), context.height, context.width, 3)
+
+    def run() -> None:
+        deduper = FrameDeduper(config)
+        if batch:
+            deduper.process_batch(batch_frames)
+            return
+        for frame in frames:
+            deduper.process_frame(frame)
+
+    return context.measure(run, items=len(frames))
+
+
+@benchmark("frame_deduper[hash_diff]", group="e2e", threshold=_E2E_THRESHOLD)
+def _frame_deduper_hash(context: _Context) -> Measurement:
+    return _frame_deduper(context, "hash_diff", batch=False)
+
+
+@benchmark("frame_deduper[hash_diff,batch]", group="e2e", threshold=_E2E_THRESHOLD)
+def _frame_deduper_hash_batch(context: _Context) -> Measurement:
+    return _frame_deduper(context, "hash_diff", batch=True)
+
+
+@benchmark("frame_deduper[dhash]", group="e2e", threshold=_E2E_THRESHOLD)
+def _frame_deduper_dhash(context: _Context) -> Measurement:
+    return _frame_deduper(context, "dhash", batch=False)
+
+
+def _replay(context: _Context, history_size: int) -> Measurement:
+    from dedup import DedupConfig, Deduplicator
+
+    features = _frame_features(context, context.frames)
+    config = DedupConfig(history_size=history_size)
+    return context.measure(
+        lambda: Deduplicator(config).replay(features), items=len(features)
+    )
+
+
+@benchmark("deduplicator.replay[history=5]", group="e2e", threshold=_E2E_THRESHOLD)
+def _replay_small(context: _Context) -> Measurement:
+    return _replay(context, 5)
+
+
+@benchmark("deduplicator.replay[history=32]", group="e2e", threshold=_E2E_THRESHOLD)
+def _replay_large(context: _Context) -> Measurement:
+    return _replay(context, 32)
+
+
+def _src_pipeline(context: _Context, name: str) -> Measurement:
+    result = context.src_results().get(name)
+    if result is None:
+        raise BenchmarkSkipped(f"{name} missing from the src/cc run.")
+    return Measurement(**result)
+
+
+@benchmark("src_pipeline.serial", group="e2e", threshold=_PROCESS_THRESHOLD)
+def _src_pipeline_serial(context: _Context) -> Measurement:
+    return _src_pipeline(context, "src_pipeline.serial")
+
+
+@benchmark("src_pipeline.threaded", group="e2e", threshold=_PROCESS_THRESHOLD)
+def _src_pipeline_threaded(context: _Context) -> Measurement:
+    return _src_pipeline(context, "src_pipeline.threaded")
+
+
+def _run_src_pipeline(context: _Context) -> dict[str, Any]:
+    # src/cc is imported as "cc" too, so it gets its own interpreter with
+    # src first on sys.path.
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        part for part in (str(_ROOT), env.get("PYTHONPATH")) if part
+    )
+    cmd = [
+        sys.executable,
+        "-m",
+        "benchmarks.src_pipeline",
+        "--seconds",
+        str(context.min_seconds),
+        "--rounds",
+        str(context.rounds),
+        "--frames",
+        str(context.frames),
+    ]
+    result = subprocess.run(
+        cmd, cwd=_ROOT / "src", env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        reason = (result.stderr.strip().splitlines() or ["failed"])[-1]
+        raise BenchmarkSkipped(f"src/cc run failed: {reason}")
+    return json.loads(result.stdout)
+
+
+def _decode(
+    context: _Context,
+    make_iterator: Callable[[str, str], Any],
+    *,
+    start_time: float = 0.0,
+) -> Measurement:
+    ffmpeg_path, input_path = context.media(start_time)
+
+    def run() -> int:
+        count = 0
+        for packet in make_iterator(ffmpeg_path, input_path):
+            count += 1
+            release = getattr(packet, "release", None)
+            if release is not None:
+                release()
+        return count
+
+    return context.measure(run, items=run())
+
+
+@benchmark("decoder.iter_frames", group="e2e", threshold=_PROCESS_THRESHOLD)
+def _decoder_frames(context: _Context) -> Measurement:
+    from cc.decoder import FFmpegDecoder
+
+    return _decode(
+        context,
+        lambda ffmpeg, path: FFmpegDecoder(path, ffmpeg_path=ffmpeg).iter_frames(),
+    )
+
+
+@benchmark("decoder.iter_frames[streaming]", group="e2e", threshold=_PROCESS_THRESHOLD)
+def _decoder_frames_streaming(context: _Context) -> Measurement:
+    from cc.decoder import FFmpegDecoder
+
+    return _decode(
+        context,
+        lambda ffmpeg, path: FFmpegDecoder(
+            path, ffmpeg_path=ffmpeg, streaming=True
+        ).iter_frames(),
+    )
+
+
+@benchmark(
+    "decoder.iter_frames[segments=2]", group="e2e", threshold=_PROCESS_THRESHOLD
+)
+def _decoder_frames_segmented(context: _Context) -> Measurement:
+    from cc.decoder import FFmpegDecoder
+
+    # The input starts at 5s, as when cut from a longer recording, so a
+    # segment decoded on the wrong timebase shows up as a mismatch.
+    ffmpeg_path, input_path = context.media(start_time=5.0)
+
+    def frames(**options: Any) -> list[tuple[float, bytes]]:
+        decoder = FFmpegDecoder(input_path, ffmpeg_path=ffmpeg_path, **options)
+        decoded = []
+        for frame in decoder.iter_frames():
+            decoded.append((frame.pts, bytes(frame.frame)))
+            frame.release()
+        return decoded
+
+    expected = frames(streaming=True)
+    # A small queue makes the later segment spill frames it decodes ahead.
+    for queue_size in (64, 2):
+        stitched = frames(streaming=True, segments=2, segment_queue_size=queue_size)
+        if stitched != expected:
+            raise RuntimeError(
+                f"Segmented decoding returned {len(stitched)} frame(s) that "
+                f"differ from the {len(expected)} of unsegmented decoding."
+            )
+    return _decode(
+        context,
+        lambda ffmpeg, path: FFmpegDecoder(
+            path, ffmpeg_path=ffmpeg, streaming=True, segments=2
+        ).iter_frames(),
+        start_time=5.0,
+    )
+
+
+@benchmark(
+    "decoder.iter_frames[gray,half]", group="e2e", threshold=_PROCESS_THRESHOLD
+)
+def _decoder_frames_gray(context: _Context) -> Measurement:
+    from cc.decoder import FFmpegDecoder
+
+    clip = context.clip()
+    return _decode(
+        context,
+        lambda ffmpeg, path: FFmpegDecoder(
+            path,
+            ffmpeg_path=ffmpeg,
+            streaming=True,
+            pix_fmt="gray",
+            scale=(clip.width // 2, -1),
+        ).iter_frames(),
+    )
+
+
+@benchmark(
+    "decoder.iter_av_packets",
+    group="e2e",
+    unit="packets",
+    threshold=_PROCESS_THRESHOLD,
+)
+def _decoder_av_packets(context: _Context) -> Measurement:
+    from cc.decoder import FFmpegAVDecoder
+
+    return _decode(
+        context,
+        lambda ffmpeg, path: FFmpegAVDecoder(
+            path, ffmpeg_path=ffmpeg
+        ).iter_av_packets(),
+    )
+
+
+@benchmark("feature_cache.build", group="e2e", threshold=_PROCESS_THRESHOLD)
+def _feature_cache_build(context: _Context) -> Measurement:
+    from cc import feature_cache
+    from cc.decoder import FFmpegDecoder
+    from cc.feature_cache import FeatureCache
+
+    if feature_cache._np is None:
+        raise BenchmarkSkipped("NumPy is not installed.")
+
+    def build(input_path: str, directory: Path) -> Any:
+        cache = FeatureCache(directory)
+        decoder = FFmpegDecoder(input_path, ffmpeg_path=ffmpeg_path)
+        cache.build(decoder)
+        return cache.load(decoder)
+
+    # An input without audio gets empty audio columns.
+    ffmpeg_path, input_path = context.media(audio=False)
+    features = build(input_path, context.directory / "features-video")
+    if features is None or len(features.audio_pts) or not features.frame_count:
+        raise RuntimeError("Feature cache of a video-only input is incomplete.")
+    ffmpeg_path, input_path = context.media()
+
+    def run() -> int:
+        directory = context.directory / "features"
+        count = build(input_path, directory).frame_count
+        shutil.rmtree(directory)
+        return count
+
+    return context.measure(run, items=run())
+
+
+# Running and comparing ----------------------------------------------------
+
+
+def run_suite(
+    selected: list[Benchmark],
+    *,
+    width: int = 640,
+    height: int = 360,
+    frames: int = 100,
+    min_seconds: float = 0.2,
+    rounds: int = 3,
+    ffmpeg: str = "auto",
+    report: Callable[[str], None] = lambda line: None,
+) -> dict[str, Any]:
+    """Run ``selected`` and return the JSON-ready results document."""
+
+    backend = _ffmpeg_backend(ffmpeg)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="cc-bench-") as directory:
+        context = _Context(
+            width=width,
+            height=height,
+            frames=frames,
+            min_seconds=min_seconds,
+            rounds=rounds,
+            ffmpeg=backend,
+            directory=Path(directory),
+        )
+        for bench in selected:
+            try:
+                measurement = bench.run(context)
+            except BenchmarkSkipped as exc:
+                report(f"{bench.name:<40} skipped: {exc}")
+                continue
+            entry = {
+                "group": bench.group,
+                "unit": bench.unit,
+                "threshold": bench.threshold,
+                **measurement.as_dict(),
+            }
+            if bench.name.startswith("decoder.iter"):
+                entry["ffmpeg"] = backend
+            results[bench.name] = entry
+            report(f"{bench.name:<40} {measurement.rate:12.1f} {bench.unit}/s")
+    return {
+        "format": _FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "numpy": _numpy_version(),
+            "ffmpeg": backend,
+            "commit": _git_commit(),
+            "width": width,
+            "height": height,
+            "frames": frames,
+        },
+        "benchmarks": results,
+    }
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio < 1.0 - self.threshold
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    threshold: Optional[float] = None,
+) -> list[Comparison]:
+    """Compare the benchmarks present in both documents.
+
+    ``threshold`` overrides each benchmark's own. Decoder results from a
+    different ffmpeg backend are left out.
+    """
+
+    if baseline.get("format") != _FORMAT_VERSION:
+        raise ValueError("Baseline results use an unsupported format.")
+    comparisons = []
+    previous = baseline.get("benchmarks", {})
+    for name, entry in current.get("benchmarks", {}).items():
+        base = previous.get(name)
+        if base is None or base.get("ffmpeg") != entry.get("ffmpeg"):
+            continue
+        comparisons.append(
+            Comparison(
+                name=name,
+                baseline=float(base["rate"]),
+                current=float(entry["rate"]),
+                threshold=entry["threshold"] if threshold is None else threshold,
+            )
+        )
+    return comparisons
+
+
+def _ffmpeg_backend(choice: str) -> str:
+    available = shutil.which("ffmpeg") and shutil.which("ffprobe")
+    if choice == "real" and not available:
+        raise RuntimeError("ffmpeg and ffprobe must be on PATH for --ffmpeg real.")
+    if choice == "auto":
+        return "real" if available else "fake"
+    return choice
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k",
+        "--filter",
+        action="append",
+        default=[],
+        help="run benchmarks whose name contains this text (repeatable)",
+    )
+    parser.add_argument("--group", choices=("micro", "e2e"))
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--ffmpeg", choices=("auto", "real", "fake"), default="auto")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="allowed slowdown as a fraction, overriding each benchmark's own",
+    )
+    args = parser.parse_args(argv)
+
+    selected = [
+        bench
+        for bench in benchmarks()
+        if (args.group is None or bench.group == args.group)
+        and (not args.filter or any(text in bench.name for text in args.filter))
+    ]
+    if args.list:
+        for bench in selected:
+            print(f"{bench.name:<40} {bench.group:<6} {bench.threshold:.0%}")
+        return 0
+
+    results = run_suite(
+        selected,
+        width=args.width,
+        height=args.height,
+        frames=args.frames,
+        min_seconds=args.seconds,
+        rounds=args.rounds,
+        ffmpeg=args.ffmpeg,
+        report=print,
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline is None:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    comparisons = compare(results, baseline, threshold=args.threshold)
+    print()
+    for key in ("python", "numpy", "width", "height", "frames"):
+        ours = results["environment"].get(key)
+        theirs = baseline.get("environment", {}).get(key)
+        if ours != theirs:
+            print(f"note: {key} differs from the baseline ({theirs} -> {ours})")
+    for item in comparisons:
+        flag = "REGRESSION" if item.regressed else ""
+        print(f"{item.name:<40} {item.ratio - 1:+8.1%}  {flag}")
+    regressions = [item for item in comparisons if item.regressed]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than their threshold.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
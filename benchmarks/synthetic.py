@@ -0,0 +1,299 @@
+"""Deterministic synthetic frames, audio and clips for the benchmarks.
+
+Only the standard library is used, so the fake ffmpeg and the ``src/cc``
+benchmark (which runs without the root ``cc`` package) can share it.
+
+Scenes:
+
+- ``static``: one blocky texture, repeated.
+- ``pan``: the texture moving one pixel to the left per frame.
+- ``flicker``: the static frame alternating with a brighter copy.
+- ``noise``: a fresh random frame every time, so nothing is a duplicate.
+
+Audio kinds are ``silence``, ``tone`` (a sine) and ``noise``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+SCENES = ("static", "pan", "flicker", "noise")
+AUDIO_KINDS = ("silence", "tone", "noise")
+PIX_FMTS = ("rgb24", "gray", "yuv420p")
+
+_BLOCK = 8
+_FLICKER_STEP = 24
+_TINT_GREEN = bytes(min(255, value * 3 // 4 + 32) for value in range(256))
+_TINT_BLUE = bytes(255 - value for value in range(256))
+_BRIGHTER = bytes(min(255, value + _FLICKER_STEP) for value in range(256))
+
+
+class SceneRenderer:
+    """Render frame ``index`` of a scene at a fixed size and pixel format.
+
+    Frames are built from an 8-bit luma plane; rgb24 tints it into three
+    channels and yuv420p appends neutral chroma planes.
+    """
+
+    def __init__(self, scene: str, width: int, height: int, *, seed: int = 0) -> None:
+        if scene not in SCENES:
+            raise ValueError(f"Unknown scene '{scene}'.")
+        if width <= 0 or height <= 0:
+            raise ValueError("width and height must be positive.")
+        self.scene = scene
+        self.width = width
+        self.height = height
+        self._random = random.Random(seed)
+        texture_width = width * 2 if scene == "pan" else width
+        self._rows = _texture_rows(texture_width, height, self._random)
+        self._base = b"".join(row[:width] for row in self._rows)
+
+    def luma(self, index: int) -> bytes:
+        if self.scene == "pan":
+            offset = index % self.width
+            return b"".join(row[offset : offset + self.width] for row in self._rows)
+        if self.scene == "flicker" and index % 2:
+            return self._base.translate(_BRIGHTER)
+        if self.scene == "noise":
+            return self._random.randbytes(self.width * self.height)
+        return self._base
+
+    def frame(self, index: int, pix_fmt: str = "rgb24") -> bytes:
+        luma = self.luma(index)
+        if pix_fmt == "gray":
+            return luma
+        if pix_fmt == "yuv420p":
+            chroma = ((self.width + 1) // 2) * ((self.height + 1) // 2)
+            return luma + b"\x80" * (2 * chroma)
+        if pix_fmt != "rgb24":
+            raise ValueError(f"Unsupported pix_fmt: {pix_fmt}.")
+        frame = bytearray(len(luma) * 3)
+        frame[0::3] = luma
+        frame[1::3] = luma.translate(_TINT_GREEN)
+        frame[2::3] = luma.translate(_TINT_BLUE)
+        return bytes(frame)
+
+
+def video_frames(
+    scene: str,
+    width: int,
+    height: int,
+    count: int,
+    *,
+    pix_fmt: str = "rgb24",
+    seed: int = 0,
+) -> Iterator[bytes]:
+    """Yield ``count`` frames of ``scene``."""
+
+    renderer = SceneRenderer(scene, width, height, seed=seed)
+    for index in range(count):
+        yield renderer.frame(index, pix_fmt)
+
+
+def audio_samples(
+    kind: str,
+    sample_rate: int,
+    count: int,
+    *,
+    start: int = 0,
+    frequency: float = 440.0,
+    amplitude: float = 0.5,
+    seed: int = 0,
+) -> list[float]:
+    """``count`` mono samples in [-1, 1) starting at sample ``start``."""
+
+    if kind == "silence":
+        return [0.0] * count
+    if kind == "tone":
+        step = 2 * math.pi * frequency / sample_rate
+        return [amplitude * math.sin(step * n) for n in range(start, start + count)]
+    if kind == "noise":
+        rng = random.Random(seed * 1_000_003 + start)
+        return [rng.uniform(-amplitude, amplitude) for _ in range(count)]
+    raise ValueError(f"Unknown audio kind '{kind}'.")
+
+
+def pcm_s16le(samples: list[float], channels: int = 1) -> bytes:
+    """Interleaved signed 16-bit little-endian PCM, every channel the same."""
+
+    values = array("h", (max(-32768, min(32767, int(s * 32768))) for s in samples))
+    if channels > 1:
+        interleaved = array("h", bytes(len(values) * channels * 2))
+        for channel in range(channels):
+            interleaved[channel::channels] = values
+        values = interleaved
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+@dataclass(frozen=True)
+class SyntheticClip:
+    """Description of a synthetic audio/video input.
+
+    The fake ffmpeg decodes a clip saved as JSON; :func:`write_media` encodes
+    the same content with a real ffmpeg. ``audio=None`` leaves out the audio
+    stream. ``start_time`` offsets the container timestamps, like a clip cut
+    from a longer recording; the PTS methods stay relative to it.
+    """
+
+    width: int = 320
+    height: int = 240
+    fps: float = 25.0
+    frames: int = 250
+    scene: str = "pan"
+    gop: int = 25
+    audio: Optional[str] = "tone"
+    sample_rate: int = 48000
+    channels: int = 1
+    audio_frame_samples: int = 1024
+    seed: int = 0
+    start_time: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.fps
+
+    def video_pts(self) -> list[float]:
+        return [index / self.fps for index in range(self.frames)]
+
+    def keyframe_pts(self) -> list[float]:
+        return [index / self.fps for index in range(0, self.frames, self.gop)]
+
+    def audio_frames(self) -> list[tuple[float, int]]:
+        """PTS and sample count of each audio frame; the last may be short."""
+
+        if self.audio is None:
+            return []
+        total = round(self.duration * self.sample_rate)
+        return [
+            (start / self.sample_rate, min(self.audio_frame_samples, total - start))
+            for start in range(0, total, self.audio_frame_samples)
+        ]
+
+    def renderer(
+        self, width: Optional[int] = None, height: Optional[int] = None
+    ) -> SceneRenderer:
+        return SceneRenderer(
+            self.scene, width or self.width, height or self.height, seed=self.seed
+        )
+
+    def pcm(self, start: int, count: int, channels: Optional[int] = None) -> bytes:
+        kind = self.audio or "silence"
+        samples = audio_samples(
+            kind, self.sample_rate, count, start=start, seed=self.seed
+        )
+        return pcm_s16le(samples, channels or self.channels)
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SyntheticClip":
+        return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def write_media(
+    clip: SyntheticClip, path: str | Path, *, ffmpeg_path: str = "ffmpeg"
+) -> Path:
+    """Encode ``clip`` with a real ffmpeg (MPEG-4 video, PCM audio, Matroska)."""
+
+    path = Path(path)
+    with tempfile.TemporaryDirectory(prefix="cc-bench-") as directory:
+        cmd = [
+            ffmpeg_path,
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{clip.width}x{clip.height}",
+            "-r",
+            repr(clip.fps),
+            "-i",
+            "-",
+        ]
+        maps = ["-map", "0:v"]
+        if clip.audio is not None:
+            audio_path = Path(directory) / "audio.raw"
+            total = sum(count for _, count in clip.audio_frames())
+            audio_path.write_bytes(clip.pcm(0, total))
+            cmd += [
+                "-f",
+                "s16le",
+                "-ar",
+                str(clip.sample_rate),
+                "-ac",
+                str(clip.channels),
+                "-i",
+                str(audio_path),
+            ]
+            maps += ["-map", "1:a", "-c:a", "pcm_s16le"]
+        cmd += [
+            *maps,
+            "-c:v",
+            "mpeg4",
+            "-q:v",
+            "4",
+            "-g",
+            str(clip.gop),
+            "-pix_fmt",
+            "yuv420p",
+        ]
+        if clip.start_time:
+            cmd += ["-output_ts_offset", repr(clip.start_time)]
+        cmd.append(str(path))
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        assert process.stdin is not None
+        try:
+            renderer = clip.renderer()
+            for index in range(clip.frames):
+                process.stdin.write(renderer.frame(index))
+        finally:
+            process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {path}.")
+    return path
+
+
+def _texture_rows(width: int, height: int, rng: random.Random) -> list[bytes]:
+    # Flat 8x8 blocks over a diagonal gradient: a one-pixel pan changes only
+    # block edges, like a slow camera move over a mostly smooth scene.
+    rows = []
+    columns = (width + _BLOCK - 1) // _BLOCK
+    for block_row in range((height + _BLOCK - 1) // _BLOCK):
+        levels = [rng.randrange(0, 192) for _ in range(columns)]
+        row = bytes(
+            (levels[x // _BLOCK] + (x + block_row * _BLOCK) // 16) % 256
+            for x in range(width)
+        )
+        rows.extend([row] * min(_BLOCK, height - block_row * _BLOCK))
+    return rows
+
+
+__all__ = [
+    "AUDIO_KINDS",
+    "PIX_FMTS",
+    "SCENES",
+    "SceneRenderer",
+    "SyntheticClip",
+    "audio_samples",
+    "pcm_s16le",
+    "video_frames",
+    "write_media",
+]
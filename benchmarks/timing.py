@@ -0,0 +1,70 @@
+"""Throughput measurement shared by the benchmark suite.
+
+Standard library only, like :mod:`benchmarks.synthetic`, so it also works in
+the ``src/cc`` benchmark subprocess.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Items per second of one benchmark over ``rounds`` timed rounds.
+
+    ``rate`` is the best round, which is the least disturbed by other load on
+    the machine; ``median`` shows how noisy the rounds were.
+    """
+
+    rate: float
+    median: float
+    rounds: int
+    calls: int
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "rate": self.rate,
+            "median": self.median,
+            "rounds": self.rounds,
+            "calls": self.calls,
+        }
+
+
+def measure(
+    func: Callable[[], object],
+    *,
+    items: int = 1,
+    min_seconds: float = 0.2,
+    rounds: int = 3,
+) -> Measurement:
+    """Time ``func``, which handles ``items`` items per call.
+
+    Each round repeats the call until ``min_seconds`` have passed, after one
+    untimed warm-up call.
+    """
+
+    if rounds <= 0:
+        raise ValueError("rounds must be positive.")
+    func()
+    rates = []
+    calls = 0
+    for _ in range(rounds):
+        count = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_seconds or count == 0:
+            func()
+            count += 1
+            elapsed = time.perf_counter() - start
+        calls += count
+        rates.append(count * items / elapsed)
+    return Measurement(
+        rate=max(rates), median=statistics.median(rates), rounds=rounds, calls=calls
+    )
+
+
+__all__ = ["Measurement", "measure"]
@@ -1,46 +1,61 @@
-"""Core interfaces for frame de-duplication."""
+"""Core interfaces for frame de-duplication, feature extraction and decoding."""
 
 from cc.config import DedupeConfig, StrategyConfig, load_config
-from cc.pipeline import FrameDeduper, FrameMetrics
+from cc.parallel import ParallelFrameDeduper, StreamDecision
+from cc.pipeline import FrameDeduper, FrameMetrics, StrategyStats
 from cc.strategies import BaseStrategy, StrategyDecision, StrategyRegistry
 
-__all__ = [
-    "BaseStrategy",
-    "DedupeConfig",
-    "FrameDeduper",
-    "FrameMetrics",
-    "StrategyConfig",
-    "StrategyDecision",
-    "StrategyRegistry",
-    "load_config",
-"""Core feature extraction and packet structures."""
-
-from .features import AudioFeature, BrightnessFeature, SizeFeature
-from .packets import AVPacket, FramePacket
+from .decoder import FFmpegAVDecoder, FFmpegDecoder
 from .extractors import (
     attach_audio_feature,
     attach_brightness_feature,
     attach_size_feature,
 )
+from .feature_cache import CachedFeatures, FeatureCache
+from .features import AudioFeature, BrightnessFeature, SizeFeature
+from .packets import (
+    AVPacket,
+    AudioPacket,
+    FramePacket,
+    MergedPacket,
+    PacketBatch,
+    aiter_av_packets,
+    iter_av_packets,
+    iter_packet_batches,
+    merge_streams,
+)
+from .pipeline import Pipeline
 
 __all__ = [
+    "AVPacket",
     "AudioFeature",
+    "AudioPacket",
+    "BaseStrategy",
     "BrightnessFeature",
-    "SizeFeature",
+    "CachedFeatures",
+    "DedupeConfig",
+    "FFmpegAVDecoder",
+    "FFmpegDecoder",
+    "FeatureCache",
+    "FrameDeduper",
+    "FrameMetrics",
     "FramePacket",
-    "AVPacket",
-    "attach_brightness_feature",
+    "MergedPacket",
+    "PacketBatch",
+    "ParallelFrameDeduper",
+    "Pipeline",
+    "SizeFeature",
+    "StrategyConfig",
+    "StrategyDecision",
+    "StrategyRegistry",
+    "StrategyStats",
+    "StreamDecision",
+    "aiter_av_packets",
     "attach_audio_feature",
+    "attach_brightness_feature",
     "attach_size_feature",
-from .decoder import FFmpegDecoder
-from .packets import AVPacket, AudioPacket, FramePacket, iter_av_packets
-from .pipeline import Pipeline
-
-__all__ = [
-    "FFmpegDecoder",
-    "FramePacket",
-    "AudioPacket",
-    "AVPacket",
     "iter_av_packets",
-    "Pipeline",
+    "iter_packet_batches",
+    "load_config",
+    "merge_streams",
 ]
@@ -0,0 +1,15 @@
+"""Helpers for optional third-party dependencies."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from types import ModuleType
+
+
+def optional_module(name: str) -> ModuleType | None:
+    """Import ``name`` if it is installed, otherwise return ``None``."""
+
+    if importlib.util.find_spec(name) is None:
+        return None
+    return importlib.import_module(name)
@@ -0,0 +1,227 @@
+"""Brightness statistics over packed 8-bit frame buffers."""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, Mapping
+
+from ._optional import optional_module
+
+LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)
+CHANNEL_NAMES = ("r", "g", "b", "a")
+_SINGLE_BYTES = tuple(bytes((value,)) for value in range(256))
+
+_np: Any = optional_module("numpy")
+
+
+def numpy_available() -> bool:
+    return _np is not None
+
+
+class BrightnessStats(Mapping[str, float]):
+    """Read-only brightness statistics stored as one tuple of values.
+
+    It reads like the dict :func:`brightness_stats` returns (same keys and
+    order) but costs a single tuple per frame; the names and their index are
+    shared by every instance with the same channel count.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, names: tuple[str, ...], values: tuple[float, ...]) -> None:
+        if len(names) != len(values):
+            raise ValueError("names and values must have the same length.")
+        self._index = _name_index(names)
+        self._values = values
+
+    @classmethod
+    def compute(
+        cls,
+        frame: bytes | bytearray | memoryview,
+        *,
+        channels: int = 3,
+        subsample: int = 1,
+        use_numpy: bool | None = None,
+    ) -> BrightnessStats:
+        """:func:`brightness_stats` as a :class:`BrightnessStats`."""
+
+        names, values = _stats_values(frame, channels, subsample, use_numpy)
+        return cls(names, values)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._index)
+
+    @property
+    def luma(self) -> float:
+        return self._values[self._index["luma"]]
+
+    def as_tuple(self) -> tuple[float, ...]:
+        return self._values
+
+    def __getitem__(self, name: str) -> float:
+        return self._values[self._index[name]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"BrightnessStats({dict(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (BrightnessStats, (self.names, self._values))
+
+
+_NAME_INDEXES: dict[tuple[str, ...], dict[str, int]] = {}
+
+
+def _name_index(names: tuple[str, ...]) -> dict[str, int]:
+    index = _NAME_INDEXES.get(names)
+    if index is None:
+        index = _NAME_INDEXES[names] = {name: i for i, name in enumerate(names)}
+    return index
+
+
+def brightness_stats(
+    frame: bytes | bytearray | memoryview,
+    *,
+    channels: int = 3,
+    subsample: int = 1,
+    use_numpy: bool | None = None,
+) -> dict[str, float]:
+    """Compute brightness statistics for an interleaved 8-bit frame.
+
+    Returns ``mean``/``min``/``max`` over all samples, ``<channel>_mean``,
+    ``<channel>_min`` and ``<channel>_max`` per channel, and ``luma``, the
+    average Rec. 709 luminance used by ``compute_brightness_feature``. With
+    ``subsample > 1`` only every ``subsample``-th pixel is visited and the
+    result is an estimate. NumPy is used when available unless ``use_numpy``
+    is ``False``; the buffer is viewed in place, never copied.
+    """
+
+    names, values = _stats_values(frame, channels, subsample, use_numpy)
+    return dict(zip(names, values))
+
+
+def _stats_values(
+    frame: bytes | bytearray | memoryview,
+    channels: int,
+    subsample: int,
+    use_numpy: bool | None,
+) -> tuple[tuple[str, ...], tuple[float, ...]]:
+    if channels <= 0:
+        raise ValueError("channels must be positive.")
+    if subsample <= 0:
+        raise ValueError("subsample must be positive.")
+    if use_numpy is None:
+        use_numpy = _np is not None
+    elif use_numpy and _np is None:
+        raise RuntimeError("NumPy is required for vectorized brightness stats.")
+
+    length = len(frame) - len(frame) % channels
+    if length == 0:
+        return _stat_names(channels), (0.0,) * len(_stat_names(channels))
+    if use_numpy:
+        per_channel = _channel_stats_numpy(frame, length, channels, subsample)
+    else:
+        per_channel = _channel_stats_python(frame, length, channels, subsample)
+    return _combine(per_channel, channels)
+
+
+def _channel_stats_numpy(
+    frame: bytes | bytearray | memoryview, length: int, channels: int, subsample: int
+) -> list[tuple[int, int, int, int]]:
+    values = _np.frombuffer(frame, dtype=_np.uint8, count=length)
+    step = channels * subsample
+    stats = []
+    for channel in range(channels):
+        view = values[channel::step]
+        stats.append(
+            (
+                int(view.sum(dtype=_np.uint64)),
+                int(view.min()),
+                int(view.max()),
+                view.size,
+            )
+        )
+    return stats
+
+
+def _channel_stats_python(
+    frame: bytes | bytearray | memoryview, length: int, channels: int, subsample: int
+) -> list[tuple[int, int, int, int]]:
+    step = channels * subsample
+    stats = []
+    for channel in range(channels):
+        view = bytes(frame[channel:length:step])
+        low, high = _byte_extrema(view)
+        stats.append((sum(view), low, high, len(view)))
+    return stats
+
+
+def _byte_extrema(data: bytes) -> tuple[int, int]:
+    # ``in`` on bytes is a memchr scan, far cheaper than min()/max() comparing
+    # every element; real frames rarely need more than a handful of probes.
+    low = next(value for value in range(256) if _SINGLE_BYTES[value] in data)
+    high = next(
+        value for value in range(255, low - 1, -1) if _SINGLE_BYTES[value] in data
+    )
+    return low, high
+
+
+def _combine(
+    per_channel: list[tuple[int, int, int, int]], channels: int
+) -> tuple[tuple[str, ...], tuple[float, ...]]:
+    total = sum(entry[0] for entry in per_channel)
+    count = sum(entry[3] for entry in per_channel)
+    values = [
+        total / count,
+        float(min(entry[1] for entry in per_channel)),
+        float(max(entry[2] for entry in per_channel)),
+    ]
+    means = []
+    for channel_total, low, high, channel_count in per_channel:
+        mean = channel_total / channel_count
+        means.append(mean)
+        values.extend((mean, float(low), float(high)))
+    values.append(_luma(means))
+    return _stat_names(channels), tuple(values)
+
+
+def _stat_names(channels: int) -> tuple[str, ...]:
+    names = _STAT_NAMES.get(channels)
+    if names is None:
+        per_channel = []
+        for channel in range(channels):
+            name = _channel_name(channel, channels)
+            per_channel.extend((f"{name}_mean", f"{name}_min", f"{name}_max"))
+        names = _STAT_NAMES[channels] = ("mean", "min", "max", *per_channel, "luma")
+    return names
+
+
+_STAT_NAMES: dict[int, tuple[str, ...]] = {}
+
+
+def _luma(means: list[float]) -> float:
+    if len(means) >= 3:
+        return sum(weight * mean for weight, mean in zip(LUMA_WEIGHTS, means))
+    return means[0]
+
+
+def _channel_name(channel: int, channels: int) -> str:
+    if channels == 1:
+        return "y"
+    if channels <= len(CHANNEL_NAMES):
+        return CHANNEL_NAMES[channel]
+    return f"c{channel}"
+
+
+__all__ = [
+    "BrightnessStats",
+    "CHANNEL_NAMES",
+    "LUMA_WEIGHTS",
+    "brightness_stats",
+    "numpy_available",
+]
@@ -0,0 +1,119 @@
+"""Reusable frame buffers filled in place from decoder pipes."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import BinaryIO
+
+
+class PooledBuffer:
+    """A preallocated frame buffer lent out by a :class:`FrameBufferPool`.
+
+    ``view`` is a read-only memoryview over the buffer. Its contents stay valid
+    while at least one reference is held: the decoder hands the buffer out with
+    one reference, holders that keep the frame around call :meth:`retain`, and
+    every holder calls :meth:`release` when done.
+    """
+
+    __slots__ = ("buffer", "view", "_writable", "_pool", "_refs")
+
+    def __init__(self, pool: FrameBufferPool, size: int) -> None:
+        self.buffer = bytearray(size)
+        self._writable = memoryview(self.buffer)
+        self.view = self._writable.toreadonly()
+        self._pool = pool
+        self._refs = 0
+
+    def retain(self) -> None:
+        self._pool._retain(self)
+
+    def release(self) -> None:
+        self._pool._release(self)
+
+
+class FrameBufferPool:
+    """Ring of preallocated ``bytearray`` frame buffers filled with readinto().
+
+    The pool starts with ``size`` buffers and grows only when every buffer is
+    still referenced; ``allocations`` and ``peak_in_use`` show whether ``size``
+    covers the consumer's working set.
+    """
+
+    def __init__(self, buffer_size: int, size: int = 4) -> None:
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive.")
+        if size <= 0:
+            raise ValueError("size must be positive.")
+        self.buffer_size = buffer_size
+        self.allocations = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._lock = threading.Lock()
+        self._free: deque[PooledBuffer] = deque()
+        for _ in range(size):
+            self._free.append(self._allocate())
+
+    @property
+    def size(self) -> int:
+        return self.allocations
+
+    def acquire(self) -> PooledBuffer:
+        with self._lock:
+            buffer = self._free.popleft() if self._free else self._allocate()
+            buffer._refs = 1
+            self.in_use += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+        return buffer
+
+    def read_from(self, stream: BinaryIO) -> PooledBuffer | None:
+        """Fill a buffer from ``stream``; ``None`` on EOF or a short read."""
+
+        buffer = self.acquire()
+        if _readinto_exact(stream, buffer._writable) < self.buffer_size:
+            buffer.release()
+            return None
+        return buffer
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": self.allocations,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "buffer_size": self.buffer_size,
+            }
+
+    def _allocate(self) -> PooledBuffer:
+        self.allocations += 1
+        return PooledBuffer(self, self.buffer_size)
+
+    def _retain(self, buffer: PooledBuffer) -> None:
+        with self._lock:
+            if buffer._refs <= 0:
+                raise RuntimeError("Cannot retain a buffer that was already released.")
+            buffer._refs += 1
+
+    def _release(self, buffer: PooledBuffer) -> None:
+        with self._lock:
+            if buffer._refs <= 0:
+                return
+            buffer._refs -= 1
+            if buffer._refs == 0:
+                self.in_use -= 1
+                self._free.append(buffer)
+
+
+def _readinto_exact(stream: BinaryIO, view: memoryview) -> int:
+    total = len(view)
+    filled = stream.readinto(view) or 0
+    while 0 < filled < total:
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+__all__ = ["FrameBufferPool", "PooledBuffer"]
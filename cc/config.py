@@ -21,6 +21,7 @@ class DedupeConfig:
     output_fps: int = 30
     debug: bool = False
     strategies: dict[str, StrategyConfig] = field(default_factory=dict)
+    short_circuit: bool = False
 
     @staticmethod
     def from_dict(payload: dict[str, Any]) -> "DedupeConfig":
@@ -42,6 +43,7 @@ class DedupeConfig:
             output_fps=int(payload.get("output_fps", 30)),
             debug=bool(payload.get("debug", False)),
             strategies=strategies,
+            short_circuit=bool(payload.get("short_circuit", False)),
         )
 
 
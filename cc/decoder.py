@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import bisect
 import json
+import os
+import queue
+import re
 import subprocess
-from dataclasses import dataclass
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Iterable, Iterator
+from typing import IO, AsyncIterator, Iterable, Iterator, Optional, Sequence
 
-from .packets import AudioPacket, FramePacket
+from .brightness import BrightnessStats
+from .buffers import FrameBufferPool, PooledBuffer
+from .packets import AVPacket, AudioPacket, FramePacket, iter_av_packets
+from .proxy import proxy_size
 
 
 @dataclass(frozen=True)
@@ -23,52 +34,237 @@ class AudioStreamInfo:
     sample_fmt: str
 
 
+# Channels brightness stats are computed over for each output pixel format;
+# planar formats use their leading luma plane.
+_PIX_FMT_CHANNELS = {"rgb24": 3, "gray": 1, "yuv420p": 1}
+_SKIP_FRAME_VALUES = ("none", "default", "noref", "bidir", "nokey", "nointra", "all")
+
+
+@dataclass(frozen=True)
+class _FrameLayout:
+    """Byte layout of one decoded output frame."""
+
+    width: int
+    height: int
+    pix_fmt: str
+
+    @property
+    def frame_size(self) -> int:
+        luma = self.width * self.height
+        if self.pix_fmt == "yuv420p":
+            chroma = ((self.width + 1) // 2) * ((self.height + 1) // 2)
+            return luma + 2 * chroma
+        return luma * _PIX_FMT_CHANNELS[self.pix_fmt]
+
+    def stats(self, frame: bytes | memoryview) -> BrightnessStats:
+        channels = _PIX_FMT_CHANNELS[self.pix_fmt]
+        stats_size = self.width * self.height * channels
+        if stats_size < len(frame):
+            frame = memoryview(frame)[:stats_size]
+        return BrightnessStats.compute(frame, channels=channels)
+
+
+@dataclass(frozen=True)
+class SegmentRange:
+    """Frames with ``start <= pts < end`` of an input; ``end=None`` runs to EOF.
+
+    Decoding starts at keyframe ``seek`` (``None`` for the beginning of the
+    input), at or before ``start``. Times are relative to the input's start
+    time, like the timestamps of unsegmented decoding.
+    """
+
+    start: float
+    end: Optional[float]
+    seek: Optional[float]
+
+
+# showinfo/ashowinfo messages are matched without their "[Parsed_... @ 0x..]"
+# prefix: av_log drops it when another thread's log output is mid-line.
+# Audio messages carry nb_samples, video messages the frame size.
+_SHOWINFO_PATTERN = re.compile(
+    r"n:\s*\d+\s+pts:\s*\S+\s+pts_time:(?P<pts_time>\S+)"
+    r"(?:(?!n:\s*\d+\s+pts:).)*?"
+    r"(?:\bnb_samples:(?P<nb_samples>\d+)|\bs:\d+x\d+)"
+)
+
+
+@dataclass(frozen=True)
+class _ShowinfoEntry:
+    pts: Optional[float]
+    nb_samples: Optional[int]
+
+
+@dataclass(frozen=True)
+class _ShowinfoQueues:
+    video: "queue.SimpleQueue[_ShowinfoEntry | None]"
+    audio: "queue.SimpleQueue[_ShowinfoEntry | None]"
+
+
 class FFmpegDecoder:
-    """Decode audio/video using the ffmpeg CLI and pipes."""
+    """Decode audio/video using the ffmpeg CLI and pipes.
+
+    By default frame timestamps come from an ``ffprobe -show_frames`` pass over
+    the whole input. With ``streaming=True`` they are read inline from the
+    ``showinfo``/``ashowinfo`` filter log of the decoding ffmpeg process
+    instead, so decoding starts immediately and memory stays flat.
+
+    With ``buffer_pool_size > 0`` frames are read with ``readinto`` into a
+    :class:`FrameBufferPool` and ``FramePacket.frame`` is a read-only
+    memoryview; consumers call ``packet.release()`` once done with a frame.
+
+    With ``proxy_scale > 0`` the same ffmpeg process also writes every frame
+    area-downscaled by that factor as 8-bit gray to an extra pipe, and it is
+    attached as ``FramePacket.proxy`` for cheap comparisons.
+
+    Output tuning, all applied inside ffmpeg: ``threads`` sets decoder
+    threads, ``pix_fmt`` is ``"rgb24"``, ``"gray"`` or ``"yuv420p"``,
+    ``scale`` resizes to ``(width, height)`` where a value ``<= 0`` keeps the
+    aspect ratio (rounded to even), ``fps`` resamples the frame rate,
+    ``select`` is a ``select`` filter expression and ``skip_frame`` an ffmpeg
+    ``-skip_frame`` value such as ``"nokey"``. ``FramePacket.size`` and the
+    brightness stats follow the output format: gray and yuv420p frames get
+    single-channel ``y_*`` stats of the luma plane. ``fps``, ``select`` and
+    ``skip_frame`` change which frames come out, so those frames are always
+    timed from ``showinfo`` as in streaming mode.
 
-    def __init__(self, input_path: str | Path, *, ffmpeg_path: str = "ffmpeg") -> None:
+    With ``segments > 1`` :meth:`iter_frames` splits the input at keyframes
+    into that many time ranges, decodes them with one ffmpeg process each
+    and stitches the frames back in PTS order. Every range keeps up to
+    ``segment_queue_size`` frames in memory; past that, ranges the consumer
+    has not reached yet spill their frames to a temporary file and keep
+    decoding, while the range being consumed waits for the consumer. Jobs
+    that can handle the ranges independently should use
+    :meth:`segment_ranges` and :meth:`iter_segment` directly instead.
+    """
+
+    def __init__(
+        self,
+        input_path: str | Path,
+        *,
+        ffmpeg_path: str = "ffmpeg",
+        streaming: bool = False,
+        buffer_pool_size: int = 0,
+        proxy_scale: int = 0,
+        segments: int = 1,
+        segment_queue_size: int = 64,
+        threads: Optional[int] = None,
+        pix_fmt: str = "rgb24",
+        scale: Optional[tuple[int, int]] = None,
+        fps: Optional[float] = None,
+        select: Optional[str] = None,
+        skip_frame: Optional[str] = None,
+    ) -> None:
+        if pix_fmt not in _PIX_FMT_CHANNELS:
+            raise ValueError(f"Unsupported pix_fmt: {pix_fmt}.")
+        if scale is not None and scale[0] <= 0 and scale[1] <= 0:
+            raise ValueError("scale needs at least one positive dimension.")
+        if fps is not None and fps <= 0:
+            raise ValueError("fps must be positive.")
+        if threads is not None and threads < 0:
+            raise ValueError("threads must not be negative.")
+        if skip_frame is not None and skip_frame not in _SKIP_FRAME_VALUES:
+            raise ValueError(f"Unsupported skip_frame: {skip_frame}.")
+        if proxy_scale < 0:
+            raise ValueError("proxy_scale must not be negative.")
+        if segments <= 0:
+            raise ValueError("segments must be positive.")
+        if segment_queue_size <= 0:
+            raise ValueError("segment_queue_size must be positive.")
         self.input_path = str(input_path)
         self.ffmpeg_path = ffmpeg_path
+        self.streaming = streaming
+        self.buffer_pool_size = buffer_pool_size
+        self.proxy_scale = proxy_scale
+        self.segments = segments
+        self.segment_queue_size = segment_queue_size
+        self.threads = threads
+        self.pix_fmt = pix_fmt
+        self.scale = scale
+        self.fps = fps
+        self.select = select
+        self.skip_frame = skip_frame
+        self.buffer_pool: Optional[FrameBufferPool] = None
+
+    def decode_parameters(self) -> dict[str, object]:
+        """Settings that change decoded output, e.g. for cache keys."""
+
+        parameters: dict[str, object] = {"video_output": self._video_output_args()}
+        if self.skip_frame is not None:
+            parameters["skip_frame"] = self.skip_frame
+        return parameters
+
+    def output_size(self, video_info: VideoStreamInfo) -> tuple[int, int]:
+        """Width and height of decoded frames for an input of ``video_info``."""
+
+        if self.scale is None:
+            return video_info.width, video_info.height
+        width, height = self.scale
+        if width <= 0:
+            width = _even(height * video_info.width / video_info.height)
+        elif height <= 0:
+            height = _even(width * video_info.height / video_info.width)
+        return width, height
 
     def iter_frames(self) -> Iterable[FramePacket]:
         video_info = self._get_video_info()
+        if self.segments > 1:
+            yield from self._iter_frames_segmented(video_info)
+            return
+        if self.streaming or self._drops_frames():
+            yield from self._iter_frames_streaming(video_info)
+            return
         frame_pts = list(self._iter_frame_pts())
-        frame_size = video_info.width * video_info.height * 3
+        layout = self._frame_layout(video_info)
+        frame_size = layout.frame_size
+        pool = self._create_buffer_pool(frame_size)
+        proxies = self._open_proxies(video_info)
 
         cmd = [
             self.ffmpeg_path,
+            *self._video_input_args(),
             "-i",
             self.input_path,
-            "-f",
-            "rawvideo",
-            "-pix_fmt",
-            "rgb24",
+            *self._video_output_args(video_info, showinfo=False),
             "-",
+            *proxies.output_args,
         ]
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=proxies.pass_fds,
+            )
+        except BaseException:
+            proxies.close()
+            raise
+        proxies.start()
         if process.stdout is None:
             raise RuntimeError("Failed to open ffmpeg stdout pipe")
 
-        for pts in frame_pts:
-            frame_bytes = process.stdout.read(frame_size)
-            if len(frame_bytes) < frame_size:
-                break
-            yield FramePacket(
-                frame=frame_bytes,
-                pts=pts,
-                size=frame_size,
-                brightness_stats=_brightness_stats(frame_bytes),
-            )
-
-        process.stdout.close()
-        process.wait()
+        try:
+            for pts in frame_pts:
+                frame = _read_frame(process.stdout, frame_size, pool)
+                if frame is None:
+                    break
+                frame_data, pooled = frame
+                yield FramePacket(
+                    frame=frame_data,
+                    pts=pts,
+                    size=frame_size,
+                    brightness_stats=layout.stats(frame_data),
+                    pooled=pooled,
+                    proxy=proxies.get(),
+                )
+        finally:
+            _stop_process(process)
+            proxies.close()
 
     def iter_audio(self) -> Iterable[AudioPacket]:
         audio_info = self._get_audio_info()
+        if self.streaming:
+            yield from self._iter_audio_streaming(audio_info)
+            return
         audio_frames = list(self._iter_audio_frames())
         bytes_per_sample = 2
         frame_sample_bytes = audio_info.channels * bytes_per_sample
@@ -105,6 +301,497 @@ class FFmpegDecoder:
         process.stdout.close()
         process.wait()
 
+    def keyframe_times(self) -> list[float]:
+        """Sorted PTS of the video keyframes, from the packet index (no decoding).
+
+        These are the input's own timestamps; subtract :meth:`start_time` to
+        get the zero-based times of decoded frames.
+        """
+
+        return self._keyframe_index()[1]
+
+    def start_time(self) -> float:
+        """Start time of the input, which decoded timestamps are relative to."""
+
+        payload = self._run_ffprobe_json(["-show_entries", "format=start_time"])
+        return _start_time(payload)
+
+    def _keyframe_index(self) -> tuple[float, list[float]]:
+        # Only the pts and flags of each packet are printed, with the start
+        # time from the same ffprobe run.
+        payload = self._run_ffprobe_json(
+            [
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "packet=pts_time,flags:format=start_time",
+            ]
+        )
+        times = set()
+        for packet in payload.get("packets", []):
+            pts = packet.get("pts_time")
+            if pts is not None and "K" in packet.get("flags", ""):
+                times.add(float(pts))
+        return _start_time(payload), sorted(times)
+
+    def segment_ranges(self, count: Optional[int] = None) -> list[SegmentRange]:
+        """Split the input at keyframes into up to ``count`` time ranges.
+
+        ``count`` defaults to ``segments``. Boundaries are the first keyframes
+        at or after equal time steps between the first and last keyframe, so
+        inputs with few keyframes yield fewer ranges. Each range after the
+        first seeks to the keyframe before its start, so
+        :meth:`iter_segment` can decode the frame preceding it.
+        """
+
+        count = self.segments if count is None else count
+        if count <= 0:
+            raise ValueError("count must be positive.")
+        if count == 1:
+            return [SegmentRange(start=0.0, end=None, seek=None)]
+        offset, keyframes = self._keyframe_index()
+        keyframes = [pts - offset for pts in keyframes]
+        if len(keyframes) < 2:
+            return [SegmentRange(start=0.0, end=None, seek=None)]
+        first, last = keyframes[0], keyframes[-1]
+        boundaries: list[int] = []
+        for step in range(1, count):
+            target = first + (last - first) * step / count
+            index = bisect.bisect_left(keyframes, target)
+            if index < len(keyframes) and (not boundaries or index > boundaries[-1]):
+                boundaries.append(index)
+        ranges = []
+        start, seek = 0.0, None
+        for index in boundaries:
+            ranges.append(SegmentRange(start=start, end=keyframes[index], seek=seek))
+            start, seek = keyframes[index], keyframes[index - 1]
+        ranges.append(SegmentRange(start=start, end=None, seek=seek))
+        return ranges
+
+    def iter_segment(
+        self, segment: SegmentRange, *, overlap: bool = True
+    ) -> Iterator[FramePacket]:
+        """Decode the frames of one range, timestamps read from ``showinfo``.
+
+        With ``overlap`` the last frame before ``segment.start`` comes first,
+        so a deduper run over this range alone can compare the first frame
+        with its predecessor.
+        """
+
+        video_info = self._get_video_info()
+        frame_size = self._frame_layout(video_info).frame_size
+        pool = self._create_buffer_pool(frame_size)
+        return self._iter_segment(video_info, segment, pool, overlap=overlap)
+
+    def _iter_segment(
+        self,
+        video_info: VideoStreamInfo,
+        segment: SegmentRange,
+        pool: Optional[FrameBufferPool],
+        *,
+        overlap: bool,
+    ) -> Iterator[FramePacket]:
+        # -copyts -start_at_zero gives every range, the first included, the
+        # zero-based timestamps of unsegmented decoding; -ss is relative to
+        # the input's start time too.
+        input_args = ["-copyts", "-start_at_zero"]
+        if segment.seek is not None:
+            # Without overlap the range's own keyframe is enough.
+            seek = segment.seek if overlap else segment.start
+            # -noaccurate_seek starts output at the keyframe found.
+            input_args = ["-ss", repr(seek), "-noaccurate_seek", *input_args]
+        frames = self._stream_frames(video_info, pool, input_args)
+        previous: Optional[FramePacket] = None
+        try:
+            for packet in frames:
+                if packet.pts < segment.start:
+                    if previous is not None:
+                        previous.release()
+                    previous = packet
+                    continue
+                if segment.end is not None and packet.pts >= segment.end:
+                    packet.release()
+                    break
+                if previous is not None:
+                    if overlap:
+                        yield previous
+                    else:
+                        previous.release()
+                    previous = None
+                yield packet
+        finally:
+            frames.close()
+            if previous is not None:
+                previous.release()
+
+    def _iter_frames_segmented(
+        self, video_info: VideoStreamInfo
+    ) -> Iterator[FramePacket]:
+        frame_size = self._frame_layout(video_info).frame_size
+        pool = self._create_buffer_pool(frame_size)
+        outputs: list[_SegmentBuffer] = []
+        threads = []
+        for segment in self.segment_ranges():
+            output = _SegmentBuffer(self.segment_queue_size)
+            outputs.append(output)
+            frames = self._iter_segment(video_info, segment, pool, overlap=False)
+            threads.append(
+                threading.Thread(
+                    target=_decode_segment,
+                    args=(frames, output),
+                    name="ffmpeg-segment",
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+        last_pts: Optional[float] = None
+        try:
+            for output in outputs:
+                while True:
+                    item = output.get()
+                    if isinstance(item, _SegmentEnd):
+                        if item.error is not None:
+                            raise item.error
+                        break
+                    # Ranges share no frames, so timestamps only go backwards
+                    # when the ranges do not share one timebase.
+                    if last_pts is not None and item.pts <= last_pts:
+                        item.release()
+                        raise RuntimeError(
+                            f"Segment timestamps are out of order: {item.pts} "
+                            f"after {last_pts}."
+                        )
+                    last_pts = item.pts
+                    yield item
+        finally:
+            for output in outputs:
+                output.close()
+            for thread in threads:
+                thread.join()
+            for output in outputs:
+                output.remove_spill()
+
+    def _iter_frames_streaming(
+        self, video_info: VideoStreamInfo
+    ) -> Iterator[FramePacket]:
+        frame_size = self._frame_layout(video_info).frame_size
+        pool = self._create_buffer_pool(frame_size)
+        return self._stream_frames(video_info, pool, [])
+
+    def _stream_frames(
+        self,
+        video_info: VideoStreamInfo,
+        pool: Optional[FrameBufferPool],
+        input_args: list[str],
+    ) -> Iterator[FramePacket]:
+        layout = self._frame_layout(video_info)
+        frame_size = layout.frame_size
+        proxies = self._open_proxies(video_info)
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-nostats",
+            *self._video_input_args(),
+            *input_args,
+            "-i",
+            self.input_path,
+            *self._video_output_args(video_info),
+            "-",
+            *proxies.output_args,
+        ]
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=proxies.pass_fds,
+            )
+        except BaseException:
+            proxies.close()
+            raise
+        proxies.start()
+        if process.stdout is None or process.stderr is None:
+            raise RuntimeError("Failed to open ffmpeg pipes")
+        entries = _start_showinfo_reader(process.stderr).video
+        try:
+            while True:
+                frame = _read_frame(process.stdout, frame_size, pool)
+                if frame is None:
+                    break
+                frame_data, pooled = frame
+                proxy = proxies.get()
+                entry = entries.get()
+                if entry is None or entry.pts is None:
+                    if pooled is not None:
+                        pooled.release()
+                    if entry is None:
+                        break
+                    continue
+                yield FramePacket(
+                    frame=frame_data,
+                    pts=entry.pts,
+                    size=frame_size,
+                    brightness_stats=layout.stats(frame_data),
+                    pooled=pooled,
+                    proxy=proxy,
+                )
+        finally:
+            _stop_process(process)
+            proxies.close()
+
+    def _iter_audio_streaming(
+        self, audio_info: AudioStreamInfo
+    ) -> Iterator[AudioPacket]:
+        bytes_per_sample = 2
+        frame_sample_bytes = audio_info.channels * bytes_per_sample
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            self.input_path,
+            *self._audio_output_args(audio_info),
+            "-",
+        ]
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if process.stdout is None or process.stderr is None:
+            raise RuntimeError("Failed to open ffmpeg pipes")
+        entries = _start_showinfo_reader(process.stderr).audio
+        try:
+            while True:
+                entry = entries.get()
+                if entry is None or entry.nb_samples is None:
+                    break
+                chunk_size = entry.nb_samples * frame_sample_bytes
+                samples = process.stdout.read(chunk_size)
+                if len(samples) < chunk_size:
+                    break
+                if entry.pts is None:
+                    continue
+                yield AudioPacket(samples=samples, pts=entry.pts)
+        finally:
+            _stop_process(process)
+
+    async def aiter_frames(self) -> AsyncIterator[FramePacket]:
+        """Stream frames through an asyncio subprocess.
+
+        Timestamps always come from ``showinfo`` as with ``streaming=True``.
+        Frames are plain ``bytes``; ``buffer_pool_size`` does not apply.
+        """
+
+        video_info = await asyncio.to_thread(self._get_video_info)
+        layout = self._frame_layout(video_info)
+        frame_size = layout.frame_size
+        proxies = self._open_proxies(video_info)
+        try:
+            process = await self._start_async_process(
+                self._video_output_args(video_info),
+                input_args=self._video_input_args(),
+                proxies=proxies,
+            )
+        except BaseException:
+            proxies.close()
+            raise
+        proxies.start()
+        if process.stdout is None or process.stderr is None:
+            raise RuntimeError("Failed to open ffmpeg pipes")
+        entries: asyncio.Queue[_ShowinfoEntry | None] = asyncio.Queue()
+        reader = asyncio.create_task(
+            _read_showinfo_async(process.stderr, entries, audio=False)
+        )
+        try:
+            while True:
+                try:
+                    frame_data = await process.stdout.readexactly(frame_size)
+                except asyncio.IncompleteReadError:
+                    break
+                proxy = await proxies.aget()
+                entry = await entries.get()
+                if entry is None:
+                    break
+                if entry.pts is None:
+                    continue
+                yield FramePacket(
+                    frame=frame_data,
+                    pts=entry.pts,
+                    size=frame_size,
+                    brightness_stats=layout.stats(frame_data),
+                    proxy=proxy,
+                )
+        finally:
+            await _stop_async_process(process)
+            reader.cancel()
+            await asyncio.to_thread(proxies.close)
+
+    async def aiter_audio(self) -> AsyncIterator[AudioPacket]:
+        """Stream audio through an asyncio subprocess; see :meth:`aiter_frames`."""
+
+        audio_info = await asyncio.to_thread(self._get_audio_info)
+        frame_sample_bytes = audio_info.channels * 2
+        process = await self._start_async_process(
+            self._audio_output_args(audio_info)
+        )
+        if process.stdout is None or process.stderr is None:
+            raise RuntimeError("Failed to open ffmpeg pipes")
+        entries: asyncio.Queue[_ShowinfoEntry | None] = asyncio.Queue()
+        reader = asyncio.create_task(
+            _read_showinfo_async(process.stderr, entries, audio=True)
+        )
+        try:
+            while True:
+                entry = await entries.get()
+                if entry is None or entry.nb_samples is None:
+                    break
+                try:
+                    samples = await process.stdout.readexactly(
+                        entry.nb_samples * frame_sample_bytes
+                    )
+                except asyncio.IncompleteReadError:
+                    break
+                if entry.pts is None:
+                    continue
+                yield AudioPacket(samples=samples, pts=entry.pts)
+        finally:
+            await _stop_async_process(process)
+            reader.cancel()
+
+    async def _start_async_process(
+        self,
+        output_args: list[str],
+        *,
+        input_args: Sequence[str] = (),
+        proxies: Optional[_ProxyReader] = None,
+    ) -> asyncio.subprocess.Process:
+        proxy_args: list[str] = []
+        pass_fds: tuple[int, ...] = ()
+        if proxies is not None:
+            proxy_args, pass_fds = proxies.output_args, proxies.pass_fds
+        return await asyncio.create_subprocess_exec(
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-nostats",
+            *input_args,
+            "-i",
+            self.input_path,
+            *output_args,
+            "-",
+            *proxy_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=pass_fds,
+        )
+
+    def _create_buffer_pool(self, frame_size: int) -> Optional[FrameBufferPool]:
+        if self.buffer_pool_size <= 0:
+            self.buffer_pool = None
+        else:
+            self.buffer_pool = FrameBufferPool(frame_size, self.buffer_pool_size)
+        return self.buffer_pool
+
+    def _video_input_args(self) -> list[str]:
+        args = []
+        if self.threads is not None:
+            args += ["-threads", str(self.threads)]
+        if self.skip_frame is not None:
+            args += ["-skip_frame", self.skip_frame]
+        return args
+
+    def _video_output_args(
+        self, video_info: Optional[VideoStreamInfo] = None, *, showinfo: bool = True
+    ) -> list[str]:
+        """Output options for the raw video stream.
+
+        Without ``video_info`` a scale keeping the aspect ratio is written as
+        ffmpeg's ``-2``; decoding always passes the resolved size so frame
+        sizes are known up front.
+        """
+
+        filters = self._frame_filters()
+        if self.scale is not None:
+            if video_info is not None:
+                width, height = self.output_size(video_info)
+            else:
+                width, height = (value if value > 0 else -2 for value in self.scale)
+            filters.append(f"scale={width}:{height}")
+        if showinfo:
+            filters.append("showinfo=checksum=0")
+        args = ["-map", "0:v:0"]
+        if filters:
+            args += ["-vf", ",".join(filters)]
+        args += self._fps_mode_args()
+        return [*args, "-f", "rawvideo", "-pix_fmt", self.pix_fmt]
+
+    def _frame_filters(self) -> list[str]:
+        # Shared by the proxy output so both streams keep the same frames.
+        filters = []
+        if self.select is not None:
+            filters.append(f"select='{self.select}'")
+        if self.fps is not None:
+            filters.append(f"fps={self.fps!r}")
+        return filters
+
+    def _fps_mode_args(self) -> list[str]:
+        # rawvideo output defaults to constant frame rate, which would
+        # duplicate frames select and skip_frame left out.
+        if self.select is None and self.skip_frame is None:
+            return []
+        return ["-fps_mode", "passthrough"]
+
+    def _frame_layout(self, video_info: VideoStreamInfo) -> _FrameLayout:
+        width, height = self.output_size(video_info)
+        return _FrameLayout(width=width, height=height, pix_fmt=self.pix_fmt)
+
+    def _drops_frames(self) -> bool:
+        return (
+            self.fps is not None
+            or self.select is not None
+            or self.skip_frame is not None
+        )
+
+    def _open_proxies(self, video_info: VideoStreamInfo) -> _ProxyReader:
+        if self.proxy_scale <= 0:
+            return _ProxyReader(None)
+        width, height = proxy_size(*self.output_size(video_info), self.proxy_scale)
+        filters = [
+            *self._frame_filters(),
+            f"scale={width}:{height}:flags=area,format=gray",
+        ]
+        return _ProxyReader(
+            [
+                "-map",
+                "0:v:0",
+                "-vf",
+                ",".join(filters),
+                *self._fps_mode_args(),
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "gray",
+            ],
+            frame_size=width * height,
+        )
+
+    def _audio_output_args(self, audio_info: AudioStreamInfo) -> list[str]:
+        return [
+            "-map",
+            "0:a:0",
+            "-af",
+            "ashowinfo",
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-ac",
+            str(audio_info.channels),
+            "-ar",
+            str(audio_info.sample_rate),
+        ]
+
     def _get_video_info(self) -> VideoStreamInfo:
         payload = self._run_ffprobe_json(
             ["-select_streams", "v:0", "-show_streams"]
@@ -117,10 +804,19 @@ class FFmpegDecoder:
         )
 
     def _get_audio_info(self) -> AudioStreamInfo:
+        audio_info = self._find_audio_info()
+        if audio_info is None:
+            raise RuntimeError("Input has no audio stream.")
+        return audio_info
+
+    def _find_audio_info(self) -> Optional[AudioStreamInfo]:
         payload = self._run_ffprobe_json(
             ["-select_streams", "a:0", "-show_streams"]
         )
-        stream = payload["streams"][0]
+        streams = payload.get("streams") or []
+        if not streams:
+            return None
+        stream = streams[0]
         return AudioStreamInfo(
             channels=int(stream["channels"]),
             sample_rate=int(stream["sample_rate"]),
@@ -171,18 +867,548 @@ class FFmpegDecoder:
         return json.loads(result.stdout)
 
 
-def _brightness_stats(frame_bytes: bytes) -> dict[str, float]:
-    if not frame_bytes:
-        return {"mean": 0.0, "min": 0.0, "max": 0.0}
-    values = frame_bytes
-    total = 0
-    min_value = 255
-    max_value = 0
-    for value in values:
-        total += value
-        if value < min_value:
-            min_value = value
-        if value > max_value:
-            max_value = value
-    mean = total / len(values)
-    return {"mean": float(mean), "min": float(min_value), "max": float(max_value)}
+class FFmpegAVDecoder(FFmpegDecoder):
+    """Decode video and audio from one ffmpeg process.
+
+    Video is written to stdout and audio to an extra pipe handed to the child,
+    so the container is demuxed and decoded once. Timestamps come from the
+    showinfo/ashowinfo log as in streaming mode. A reader thread per pipe
+    fills a bounded queue; the bounds must cover the input's audio/video
+    interleaving distance, otherwise ffmpeg stalls on the full side while the
+    merge waits on the other.
+    """
+
+    def __init__(
+        self,
+        input_path: str | Path,
+        *,
+        ffmpeg_path: str = "ffmpeg",
+        video_queue_size: int = 32,
+        audio_queue_size: int = 256,
+        buffer_pool_size: int = 0,
+        proxy_scale: int = 0,
+        threads: Optional[int] = None,
+        pix_fmt: str = "rgb24",
+        scale: Optional[tuple[int, int]] = None,
+        fps: Optional[float] = None,
+        select: Optional[str] = None,
+        skip_frame: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            input_path,
+            ffmpeg_path=ffmpeg_path,
+            streaming=True,
+            buffer_pool_size=buffer_pool_size,
+            proxy_scale=proxy_scale,
+            threads=threads,
+            pix_fmt=pix_fmt,
+            scale=scale,
+            fps=fps,
+            select=select,
+            skip_frame=skip_frame,
+        )
+        self.video_queue_size = video_queue_size
+        self.audio_queue_size = audio_queue_size
+
+    def iter_av_packets(self, *, tolerance: float = 1e-3) -> Iterator[AVPacket]:
+        video_info = self._get_video_info()
+        audio_info = self._get_audio_info()
+        session = self._start_session(video_info, audio_info)
+        try:
+            yield from iter_av_packets(
+                session.iter_frames(), session.iter_audio(), tolerance=tolerance
+            )
+        finally:
+            session.close()
+
+    def _start_session(
+        self, video_info: VideoStreamInfo, audio_info: AudioStreamInfo
+    ) -> "_AVSession":
+        layout = self._frame_layout(video_info)
+        proxies = self._open_proxies(video_info)
+        audio_read_fd, audio_write_fd = os.pipe()
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-nostats",
+            *self._video_input_args(),
+            "-i",
+            self.input_path,
+            *self._video_output_args(video_info),
+            "pipe:1",
+            *self._audio_output_args(audio_info),
+            f"pipe:{audio_write_fd}",
+            *proxies.output_args,
+        ]
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(audio_write_fd, *proxies.pass_fds),
+            )
+        except BaseException:
+            os.close(audio_read_fd)
+            proxies.close()
+            raise
+        finally:
+            os.close(audio_write_fd)
+        proxies.start()
+        if process.stdout is None or process.stderr is None:
+            raise RuntimeError("Failed to open ffmpeg pipes")
+        return _AVSession(
+            process,
+            os.fdopen(audio_read_fd, "rb"),
+            _start_showinfo_reader(process.stderr),
+            layout=layout,
+            frame_sample_bytes=audio_info.channels * 2,
+            pool=self._create_buffer_pool(layout.frame_size),
+            proxies=proxies,
+            video_queue_size=self.video_queue_size,
+            audio_queue_size=self.audio_queue_size,
+        )
+
+
+class _ProxyReader:
+    """Proxy frames ffmpeg writes to an extra pipe, read on a background thread.
+
+    Built with ``output_args=None`` it is a no-op whose :meth:`get` returns
+    ``None``, so callers need no separate path for decoding without proxies.
+    The thread keeps the pipe drained so ffmpeg never blocks on it while the
+    caller waits on the full-size output.
+    """
+
+    def __init__(
+        self, output_args: Optional[list[str]], *, frame_size: int = 0
+    ) -> None:
+        self.output_args: list[str] = []
+        self.pass_fds: tuple[int, ...] = ()
+        self._frame_size = frame_size
+        self._frames: "queue.SimpleQueue[bytes | None]" = queue.SimpleQueue()
+        self._pipe: Optional[IO[bytes]] = None
+        self._write_fd: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ended = False
+        if output_args is None:
+            return
+        read_fd, self._write_fd = os.pipe()
+        self._pipe = os.fdopen(read_fd, "rb")
+        self.output_args = [*output_args, f"pipe:{self._write_fd}"]
+        self.pass_fds = (self._write_fd,)
+
+    def start(self) -> None:
+        """Start reading once the child holds its own copy of the write end."""
+
+        if self._pipe is None:
+            return
+        self._close_write_end()
+        self._thread = threading.Thread(
+            target=self._read, name="ffmpeg-proxy", daemon=True
+        )
+        self._thread.start()
+
+    def get(self) -> Optional[bytes]:
+        """Next proxy frame, or ``None`` without proxies or after the last one."""
+
+        if self._thread is None or self._ended:
+            return None
+        proxy = self._frames.get()
+        self._ended = proxy is None
+        return proxy
+
+    async def aget(self) -> Optional[bytes]:
+        if self._thread is None or self._ended:
+            return None
+        return await asyncio.to_thread(self.get)
+
+    def close(self) -> None:
+        """Close the pipe; call after ffmpeg has exited so the reader sees EOF."""
+
+        self._close_write_end()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pipe is not None:
+            self._pipe.close()
+
+    def _close_write_end(self) -> None:
+        if self._write_fd is not None:
+            os.close(self._write_fd)
+            self._write_fd = None
+
+    def _read(self) -> None:
+        try:
+            while True:
+                proxy = self._pipe.read(self._frame_size)
+                if len(proxy) < self._frame_size:
+                    return
+                self._frames.put(proxy)
+        finally:
+            self._frames.put(None)
+
+
+class _AVSession:
+    """Reader threads and bounded queues for one shared ffmpeg process."""
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        audio_pipe: IO[bytes],
+        entries: _ShowinfoQueues,
+        *,
+        layout: _FrameLayout,
+        frame_sample_bytes: int,
+        pool: Optional[FrameBufferPool],
+        proxies: _ProxyReader,
+        video_queue_size: int,
+        audio_queue_size: int,
+    ) -> None:
+        self._process = process
+        self._audio_pipe = audio_pipe
+        self._entries = entries
+        self._layout = layout
+        self._frame_size = layout.frame_size
+        self._frame_sample_bytes = frame_sample_bytes
+        self._pool = pool
+        self._proxies = proxies
+        self._frames: "queue.Queue[FramePacket | None]" = queue.Queue(
+            maxsize=video_queue_size
+        )
+        self._audio: "queue.Queue[AudioPacket | None]" = queue.Queue(
+            maxsize=audio_queue_size
+        )
+        self._stopped = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._read_video, name="ffmpeg-video", daemon=True),
+            threading.Thread(target=self._read_audio, name="ffmpeg-audio", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def iter_frames(self) -> Iterator[FramePacket]:
+        return _drain(self._frames)
+
+    def iter_audio(self) -> Iterator[AudioPacket]:
+        return _drain(self._audio)
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._process.poll() is None:
+            self._process.kill()
+        for thread in self._threads:
+            thread.join()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+        self._audio_pipe.close()
+        self._process.wait()
+        self._proxies.close()
+
+    def _read_video(self) -> None:
+        stdout = self._process.stdout
+        try:
+            while not self._stopped.is_set():
+                frame = _read_frame(stdout, self._frame_size, self._pool)
+                if frame is None:
+                    break
+                frame_data, pooled = frame
+                proxy = self._proxies.get()
+                entry = self._entries.video.get()
+                if entry is None or entry.pts is None:
+                    if pooled is not None:
+                        pooled.release()
+                    if entry is None:
+                        break
+                    continue
+                packet = FramePacket(
+                    frame=frame_data,
+                    pts=entry.pts,
+                    size=self._frame_size,
+                    brightness_stats=self._layout.stats(frame_data),
+                    pooled=pooled,
+                    proxy=proxy,
+                )
+                if not self._put(self._frames, packet):
+                    return
+        finally:
+            self._put(self._frames, None)
+
+    def _read_audio(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                entry = self._entries.audio.get()
+                if entry is None or entry.nb_samples is None:
+                    break
+                chunk_size = entry.nb_samples * self._frame_sample_bytes
+                samples = self._audio_pipe.read(chunk_size)
+                if len(samples) < chunk_size:
+                    break
+                if entry.pts is None:
+                    continue
+                packet = AudioPacket(samples=samples, pts=entry.pts)
+                if not self._put(self._audio, packet):
+                    return
+        finally:
+            self._put(self._audio, None)
+
+    def _put(self, target: queue.Queue, item: object) -> bool:
+        while not self._stopped.is_set():
+            try:
+                target.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+
+@dataclass(frozen=True)
+class _SegmentEnd:
+    error: Optional[BaseException] = None
+
+
+@dataclass(frozen=True)
+class _SpilledFrame:
+    """A frame packet whose frame bytes wait in a segment's spill file."""
+
+    packet: FramePacket
+    offset: int
+    length: int
+
+
+class _SegmentBuffer:
+    """First-in first-out frames of one segment, spilling to a file when full.
+
+    Up to ``limit`` frames wait in memory. Once the consumer reads from the
+    buffer, its producer waits for room instead; until then further frames go
+    to a temporary file, so a segment decodes ahead without holding its
+    frames in memory.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._items: deque[FramePacket | _SpilledFrame | _SegmentEnd] = deque()
+        self._in_memory = 0
+        self._reading = False
+        self._closed = False
+        self._changed = threading.Condition()
+        self._spill: Optional[IO[bytes]] = None
+
+    def put(self, item: FramePacket | _SegmentEnd) -> bool:
+        """Append ``item``, or release it and return ``False`` once closed."""
+
+        spill = False
+        with self._changed:
+            if isinstance(item, FramePacket):
+                while (
+                    self._reading
+                    and self._in_memory >= self._limit
+                    and not self._closed
+                ):
+                    self._changed.wait()
+                spill = self._in_memory >= self._limit
+                if not spill:
+                    self._in_memory += 1
+            closed = self._closed
+        if not closed and spill:
+            # Only this segment's producer writes, so the file needs no lock.
+            item = self._spill_frame(item)
+        with self._changed:
+            if not self._closed:
+                self._items.append(item)
+                self._changed.notify_all()
+                return True
+        if isinstance(item, FramePacket):
+            item.release()
+        return False
+
+    def get(self) -> FramePacket | _SegmentEnd:
+        with self._changed:
+            self._reading = True
+            while not self._items:
+                self._changed.wait()
+            item = self._items.popleft()
+            if isinstance(item, FramePacket):
+                self._in_memory -= 1
+                self._changed.notify_all()
+        if isinstance(item, _SpilledFrame):
+            return self._load_frame(item)
+        return item
+
+    def close(self) -> None:
+        """Release the frames left and wake a waiting producer."""
+
+        with self._changed:
+            self._closed = True
+            items, self._items = self._items, deque()
+            self._changed.notify_all()
+        for item in items:
+            if isinstance(item, FramePacket):
+                item.release()
+
+    def remove_spill(self) -> None:
+        """Delete the spill file once the producer has stopped."""
+
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _spill_frame(self, packet: FramePacket) -> _SpilledFrame:
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile()
+        offset = self._spill.tell()
+        self._spill.write(packet.frame)
+        # The consumer reads with pread(), past Python's write buffer.
+        self._spill.flush()
+        packet.release()
+        return _SpilledFrame(
+            packet=replace(packet, frame=b"", pooled=None),
+            offset=offset,
+            length=self._spill.tell() - offset,
+        )
+
+    def _load_frame(self, spilled: _SpilledFrame) -> FramePacket:
+        assert self._spill is not None
+        frame = os.pread(self._spill.fileno(), spilled.length, spilled.offset)
+        if len(frame) < spilled.length:
+            raise RuntimeError("Short read from a segment spill file.")
+        return replace(spilled.packet, frame=frame)
+
+
+def _start_time(payload: dict) -> float:
+    value = payload.get("format", {}).get("start_time")
+    return float(value) if value not in (None, "N/A") else 0.0
+
+
+def _decode_segment(frames: Iterator[FramePacket], output: _SegmentBuffer) -> None:
+    end = _SegmentEnd()
+    try:
+        for packet in frames:
+            if not output.put(packet):
+                return
+    except BaseException as error:
+        end = _SegmentEnd(error)
+    finally:
+        frames.close()
+    output.put(end)
+
+
+def _drain(source: queue.Queue) -> Iterator:
+    while True:
+        item = source.get()
+        if item is None:
+            return
+        yield item
+
+
+def _read_frame(
+    stream: IO[bytes], frame_size: int, pool: Optional[FrameBufferPool]
+) -> Optional[tuple[bytes | memoryview, Optional[PooledBuffer]]]:
+    if pool is None:
+        frame_bytes = stream.read(frame_size)
+        if len(frame_bytes) < frame_size:
+            return None
+        return frame_bytes, None
+    pooled = pool.read_from(stream)
+    if pooled is None:
+        return None
+    return pooled.view, pooled
+
+
+def _start_showinfo_reader(stream: IO[bytes]) -> _ShowinfoQueues:
+    """Parse showinfo/ashowinfo lines from ffmpeg's stderr on a background thread.
+
+    Draining stderr continuously also keeps ffmpeg from blocking on a full log
+    pipe. ``None`` is queued on both queues once the stream ends.
+    """
+
+    entries = _ShowinfoQueues(video=queue.SimpleQueue(), audio=queue.SimpleQueue())
+
+    def _read() -> None:
+        try:
+            for raw_line in stream:
+                for entry in _parse_showinfo_line(raw_line):
+                    if entry.nb_samples is None:
+                        entries.video.put(entry)
+                    else:
+                        entries.audio.put(entry)
+        finally:
+            entries.video.put(None)
+            entries.audio.put(None)
+
+    threading.Thread(target=_read, name="ffmpeg-showinfo", daemon=True).start()
+    return entries
+
+
+async def _read_showinfo_async(
+    stream: asyncio.StreamReader,
+    entries: "asyncio.Queue[_ShowinfoEntry | None]",
+    *,
+    audio: bool,
+) -> None:
+    try:
+        async for raw_line in stream:
+            for entry in _parse_showinfo_line(raw_line):
+                if (entry.nb_samples is not None) == audio:
+                    entries.put_nowait(entry)
+    finally:
+        entries.put_nowait(None)
+
+
+def _parse_showinfo_line(raw_line: bytes) -> Iterator[_ShowinfoEntry]:
+    line = raw_line.decode("utf-8", "replace")
+    for match in _SHOWINFO_PATTERN.finditer(line):
+        nb_samples = match.group("nb_samples")
+        yield _ShowinfoEntry(
+            pts=_parse_pts_time(match.group("pts_time")),
+            nb_samples=int(nb_samples) if nb_samples else None,
+        )
+
+
+def _parse_pts_time(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _stop_process(process: subprocess.Popen, timeout: float = 5.0) -> None:
+    # Closing stdout makes an ffmpeg that is still writing exit on EPIPE, which
+    # covers consumers that stop iterating early.
+    if process.stdout is not None:
+        process.stdout.close()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def _stop_async_process(
+    process: asyncio.subprocess.Process, timeout: float = 5.0
+) -> None:
+    # asyncio cannot close just the stdout pipe, so an ffmpeg still running
+    # after the consumer stopped early is asked to quit. Its output is drained
+    # meanwhile: ffmpeg may be blocked writing, and wait() only returns once
+    # every pipe has reached EOF.
+    if process.returncode is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
+    drain = asyncio.create_task(_discard(process.stdout))
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+    finally:
+        drain.cancel()
+
+
+async def _discard(stream: Optional[asyncio.StreamReader]) -> None:
+    if stream is None:
+        return
+    while await stream.read(1 << 16):
+        pass
+
+
+def _even(value: float) -> int:
+    return max(2, round(value / 2) * 2)
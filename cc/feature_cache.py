@@ -0,0 +1,328 @@
+"""On-disk columnar cache of per-packet decoder features."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ._optional import optional_module
+from .decoder import AudioStreamInfo, FFmpegAVDecoder, FFmpegDecoder
+from .features import _DEFAULT_BANDS, compute_audio_feature_batch
+from .packets import AudioPacket, FramePacket
+
+_np: Any = optional_module("numpy")
+_xxhash: Any = optional_module("xxhash")
+
+_FORMAT_VERSION = 1
+_META_FILE = "meta.json"
+_COLUMNS = (
+    "frame_pts",
+    "brightness",
+    "fingerprints",
+    "audio_pts",
+    "audio_rms",
+    "audio_energy",
+    "audio_bands",
+)
+
+
+@dataclass(frozen=True)
+class CachedFeatures:
+    """Feature columns of one decoded input, memory-mapped read-only.
+
+    ``brightness`` has one column per name in ``brightness_names`` (the keys of
+    ``FramePacket.brightness_stats``), ``audio_bands`` one per name in
+    ``band_names``. ``fingerprints`` holds a 16-byte content digest per frame.
+    Audio features are computed on the channel mix scaled to [-1, 1).
+    """
+
+    width: int
+    height: int
+    sample_rate: int
+    channels: int
+    brightness_names: tuple[str, ...]
+    band_names: tuple[str, ...]
+    frame_pts: Any
+    brightness: Any
+    fingerprints: Any
+    audio_pts: Any
+    audio_rms: Any
+    audio_energy: Any
+    audio_bands: Any
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frame_pts)
+
+    def brightness_column(self, name: str) -> Any:
+        return self.brightness[:, self.brightness_names.index(name)]
+
+    def audio_index_for_frames(self) -> Any:
+        """Index of the last audio packet starting at or before each frame.
+
+        ``-1`` marks frames before the first audio packet.
+        """
+
+        return _np.searchsorted(self.audio_pts, self.frame_pts, side="right") - 1
+
+
+class FeatureCache:
+    """Directory of feature tables keyed by input file and decode parameters.
+
+    The key covers the resolved input path, its size and mtime, the decoder's
+    :meth:`~cc.decoder.FFmpegDecoder.decode_parameters`, the audio bands and
+    the fingerprint hash, so any change produces a new entry. An entry is a
+    directory of ``.npy`` columns plus ``meta.json``; it is written under a
+    temporary name and renamed into place, and its columns are opened with
+    ``mmap_mode="r"``. NumPy is required.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        bands: Iterable[tuple[float, float]] = _DEFAULT_BANDS,
+        include_audio: bool = True,
+    ) -> None:
+        if _np is None:
+            raise RuntimeError("NumPy is required for the feature cache.")
+        self.directory = Path(directory)
+        self.bands = tuple((float(low), float(high)) for low, high in bands)
+        self.include_audio = include_audio
+
+    def key(self, decoder: FFmpegDecoder) -> str:
+        path = Path(decoder.input_path).resolve()
+        stat = path.stat()
+        payload = {
+            "version": _FORMAT_VERSION,
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "decode": decoder.decode_parameters(),
+            "bands": self.bands,
+            "audio": self.include_audio,
+            "fingerprint": _fingerprint_name(),
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def load(self, decoder: FFmpegDecoder) -> Optional[CachedFeatures]:
+        entry = self.directory / self.key(decoder)
+        meta_path = entry / _META_FILE
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        columns = {
+            name: _np.load(entry / f"{name}.npy", mmap_mode="r") for name in _COLUMNS
+        }
+        return CachedFeatures(
+            width=meta["width"],
+            height=meta["height"],
+            sample_rate=meta["sample_rate"],
+            channels=meta["channels"],
+            brightness_names=tuple(meta["brightness_names"]),
+            band_names=tuple(meta["band_names"]),
+            **columns,
+        )
+
+    def load_or_build(self, decoder: FFmpegDecoder) -> CachedFeatures:
+        cached = self.load(decoder)
+        if cached is None:
+            self.build(decoder)
+            cached = self.load(decoder)
+            if cached is None:
+                raise RuntimeError("Feature cache entry vanished after writing.")
+        return cached
+
+    def build(self, decoder: FFmpegDecoder) -> None:
+        """Decode ``decoder``'s input once and store its feature columns.
+
+        With audio, one :class:`~cc.decoder.FFmpegAVDecoder` process decodes
+        both streams; inputs without an audio stream get empty audio columns.
+        """
+
+        video_info = decoder._get_video_info()
+        audio_info = decoder._find_audio_info() if self.include_audio else None
+        video = _VideoColumns()
+        if audio_info is None:
+            for frame in decoder.iter_frames():
+                video.add(frame)
+            audio_columns, audio_meta = _empty_audio_columns()
+        else:
+            audio = _AudioColumns(audio_info, self.bands)
+            for packet in _av_decoder(decoder).iter_av_packets():
+                if packet.frame is not None:
+                    video.add(packet.frame)
+                if packet.audio is not None:
+                    audio.add(packet.audio)
+            audio_columns, audio_meta = audio.finish()
+        columns, meta = video.finish()
+        width, height = decoder.output_size(video_info)
+        meta.update(width=width, height=height)
+        columns.update(audio_columns)
+        meta.update(audio_meta)
+        self._write_entry(self.key(decoder), columns, meta)
+
+    def _write_entry(
+        self, key: str, columns: dict[str, Any], meta: dict[str, Any]
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory))
+        try:
+            for name in _COLUMNS:
+                _np.save(staging / f"{name}.npy", columns[name])
+            (staging / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+            try:
+                os.replace(staging, self.directory / key)
+            except OSError:
+                # Another process stored the same entry first.
+                if not (self.directory / key / _META_FILE).exists():
+                    raise
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+
+def _av_decoder(decoder: FFmpegDecoder) -> FFmpegAVDecoder:
+    """An audio/video decoder with ``decoder``'s video output settings."""
+
+    if isinstance(decoder, FFmpegAVDecoder):
+        return decoder
+    return FFmpegAVDecoder(
+        decoder.input_path,
+        ffmpeg_path=decoder.ffmpeg_path,
+        buffer_pool_size=decoder.buffer_pool_size,
+        threads=decoder.threads,
+        pix_fmt=decoder.pix_fmt,
+        scale=decoder.scale,
+        fps=decoder.fps,
+        select=decoder.select,
+        skip_frame=decoder.skip_frame,
+    )
+
+
+class _VideoColumns:
+    """Frame columns collected one packet at a time."""
+
+    def __init__(self) -> None:
+        self._pts: list[float] = []
+        self._stats: list[list[float]] = []
+        self._digests: list[bytes] = []
+        self._names: Optional[list[str]] = None
+
+    def add(self, packet: FramePacket) -> None:
+        if self._names is None:
+            self._names = list(packet.brightness_stats)
+        self._pts.append(packet.pts)
+        self._stats.append([packet.brightness_stats[name] for name in self._names])
+        self._digests.append(_fingerprint(packet.frame))
+        packet.release()
+
+    def finish(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        count = len(self._pts)
+        names = self._names or []
+        columns = {
+            "frame_pts": _np.asarray(self._pts, dtype=_np.float64),
+            "brightness": _np.asarray(self._stats, dtype=_np.float64).reshape(
+                count, len(names)
+            ),
+            "fingerprints": _np.frombuffer(
+                b"".join(self._digests), dtype=_np.uint8
+            ).reshape(count, 16),
+        }
+        return columns, {"brightness_names": names}
+
+
+class _AudioColumns:
+    """Audio feature columns collected one packet at a time.
+
+    Equal-length packets share one batched FFT; a length change starts a new
+    batch.
+    """
+
+    def __init__(
+        self, audio_info: AudioStreamInfo, bands: tuple[tuple[float, float], ...]
+    ) -> None:
+        self._audio_info = audio_info
+        self._bands = bands
+        self._pts: list[float] = []
+        self._rms: list[float] = []
+        self._energy: list[float] = []
+        self._band_rows: list[list[float]] = []
+        self._band_names: list[str] = []
+        self._run: list[Any] = []
+
+    def add(self, packet: AudioPacket) -> None:
+        samples = _mono_samples(packet.samples, self._audio_info.channels)
+        if self._run and len(samples) != len(self._run[0]):
+            self._flush()
+        self._run.append(samples)
+        self._pts.append(packet.pts)
+
+    def finish(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        self._flush()
+        columns = {
+            "audio_pts": _np.asarray(self._pts, dtype=_np.float64),
+            "audio_rms": _np.asarray(self._rms, dtype=_np.float64),
+            "audio_energy": _np.asarray(self._energy, dtype=_np.float64),
+            "audio_bands": _np.asarray(self._band_rows, dtype=_np.float64).reshape(
+                len(self._pts), len(self._band_names)
+            ),
+        }
+        meta = {
+            "sample_rate": self._audio_info.sample_rate,
+            "channels": self._audio_info.channels,
+            "band_names": self._band_names,
+        }
+        return columns, meta
+
+    def _flush(self) -> None:
+        if not self._run:
+            return
+        for feature in compute_audio_feature_batch(
+            _np.stack(self._run), self._audio_info.sample_rate, self._bands
+        ):
+            self._band_names = list(feature.band_energy)
+            self._rms.append(feature.rms)
+            self._energy.append(feature.energy)
+            self._band_rows.append(list(feature.band_energy.values()))
+        self._run.clear()
+
+
+def _empty_audio_columns() -> tuple[dict[str, Any], dict[str, Any]]:
+    empty = _np.zeros(0, dtype=_np.float64)
+    columns = {
+        "audio_pts": empty,
+        "audio_rms": empty,
+        "audio_energy": empty,
+        "audio_bands": _np.zeros((0, 0), dtype=_np.float64),
+    }
+    return columns, {"sample_rate": 0, "channels": 0, "band_names": []}
+
+
+def _mono_samples(samples: bytes, channels: int) -> Any:
+    values = _np.frombuffer(samples, dtype="<i2").astype(_np.float64)
+    values /= 32768.0
+    if channels > 1:
+        values = values[: len(values) - len(values) % channels]
+        values = values.reshape(-1, channels).mean(axis=1)
+    return values
+
+
+def _fingerprint_name() -> str:
+    return "xxh3_128" if _xxhash is not None else "blake2b-128"
+
+
+def _fingerprint(frame: Any) -> bytes:
+    if _xxhash is not None:
+        return _xxhash.xxh3_128_digest(frame)
+    return hashlib.blake2b(frame, digest_size=16).digest()
+
+
+__all__ = ["CachedFeatures", "FeatureCache"]
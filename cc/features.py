@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from math import sqrt
-from typing import Iterable, Mapping, Sequence
+from typing import Any, Iterable, Mapping, Sequence
 import cmath
 
+from ._optional import optional_module
+
+_np: Any = optional_module("numpy")
+
 
 @dataclass(frozen=True)
 class BrightnessFeature:
@@ -61,7 +66,7 @@ def compute_brightness_feature(frame: Sequence[Sequence[object]]) -> BrightnessF
 
 
 def _compute_rms(samples: Sequence[float]) -> float:
-    if not samples:
+    if len(samples) == 0:
         return 0.0
     mean_square = sum(sample * sample for sample in samples) / len(samples)
     return sqrt(mean_square)
@@ -71,33 +76,132 @@ def _compute_energy(samples: Sequence[float]) -> float:
     return sum(sample * sample for sample in samples)
 
 
-def _compute_band_energy(
-    samples: Sequence[float], sample_rate: int, bands: Iterable[tuple[float, float]]
-) -> dict[str, float]:
-    if not samples or sample_rate <= 0:
-        return {f"{low}-{high}": 0.0 for low, high in bands}
+_DEFAULT_BANDS: tuple[tuple[float, float], ...] = (
+    (0.0, 200.0),
+    (200.0, 2000.0),
+    (2000.0, 8000.0),
+)
 
-    band_energy: dict[str, float] = {f"{low}-{high}": 0.0 for low, high in bands}
-    n = len(samples)
+
+def _band_key(low: float, high: float) -> str:
+    return f"{low}-{high}"
+
+
+@lru_cache(maxsize=64)
+def _band_bins(
+    n: int, sample_rate: int, bands: tuple[tuple[float, float], ...]
+) -> tuple[tuple[int, ...], ...]:
+    """Map every DFT bin to its band as indices into the one-sided spectrum.
+
+    Bin ``k`` of the full transform lands in the first band containing
+    ``k * sample_rate / n``. Bins above Nyquist mirror bin ``n - k`` of a real
+    signal, so an index may appear more than once.
+    """
+
+    bins: list[list[int]] = [[] for _ in bands]
     for k in range(n):
         frequency = k * sample_rate / n
-        for low, high in bands:
+        for index, (low, high) in enumerate(bands):
             if low <= frequency < high:
-                exponent = -2j * cmath.pi * k / n
-                value = sum(
-                    sample * cmath.exp(exponent * index)
-                    for index, sample in enumerate(samples)
-                )
-                magnitude = abs(value) / n
-                band_energy[f"{low}-{high}"] += magnitude * magnitude
+                bins[index].append(k if k <= n // 2 else n - k)
                 break
+    return tuple(tuple(entries) for entries in bins)
+
+
+@lru_cache(maxsize=64)
+def _band_matrix(
+    n: int, sample_rate: int, bands: tuple[tuple[float, float], ...]
+) -> Any:
+    matrix = _np.zeros((n // 2 + 1, len(bands)))
+    for index, entries in enumerate(_band_bins(n, sample_rate, bands)):
+        _np.add.at(matrix[:, index], list(entries), 1.0)
+    return matrix
+
+
+def _fft_radix2(values: list[complex]) -> list[complex]:
+    n = len(values)
+    result = list(values)
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            result[i], result[j] = result[j], result[i]
+    size = 2
+    while size <= n:
+        half = size // 2
+        step = cmath.exp(-2j * cmath.pi / size)
+        twiddles = [step**index for index in range(half)]
+        for start in range(0, n, size):
+            for offset in range(half):
+                even = result[start + offset]
+                odd = result[start + offset + half] * twiddles[offset]
+                result[start + offset] = even + odd
+                result[start + offset + half] = even - odd
+        size *= 2
+    return result
+
+
+def _ifft_radix2(values: list[complex]) -> list[complex]:
+    n = len(values)
+    transformed = _fft_radix2([value.conjugate() for value in values])
+    return [value.conjugate() / n for value in transformed]
+
+
+def _fft(values: Sequence[float]) -> list[complex]:
+    """Exact DFT of any length using radix-2 passes (Bluestein when needed)."""
+
+    n = len(values)
+    if n & (n - 1) == 0:
+        return _fft_radix2([complex(value) for value in values])
+    size = 1 << (2 * n - 1).bit_length()
+    chirp = [cmath.exp(-1j * cmath.pi * (k * k % (2 * n)) / n) for k in range(n)]
+    a = [values[k] * chirp[k] for k in range(n)] + [0j] * (size - n)
+    b = [0j] * size
+    b[0] = chirp[0].conjugate()
+    for k in range(1, n):
+        b[k] = b[size - k] = chirp[k].conjugate()
+    convolved = _ifft_radix2(
+        [x * y for x, y in zip(_fft_radix2(a), _fft_radix2(b))]
+    )
+    return [convolved[k] * chirp[k] for k in range(n)]
+
+
+def _one_sided_power(samples: Sequence[float]) -> list[float]:
+    n = len(samples)
+    if _np is not None:
+        spectrum = _np.fft.rfft(_np.asarray(samples, dtype=_np.float64))
+        return ((_np.abs(spectrum) / n) ** 2).tolist()
+    spectrum = _fft(samples)[: n // 2 + 1]
+    return [(abs(value) / n) ** 2 for value in spectrum]
+
+
+def _compute_band_energy(
+    samples: Sequence[float], sample_rate: int, bands: Iterable[tuple[float, float]]
+) -> dict[str, float]:
+    bands = tuple((low, high) for low, high in bands)
+    if len(samples) == 0 or sample_rate <= 0:
+        return {_band_key(low, high): 0.0 for low, high in bands}
+
+    power = _one_sided_power(samples)
+    band_energy: dict[str, float] = {}
+    for (low, high), entries in zip(
+        bands, _band_bins(len(samples), sample_rate, bands)
+    ):
+        key = _band_key(low, high)
+        band_energy[key] = band_energy.get(key, 0.0) + sum(
+            power[index] for index in entries
+        )
     return band_energy
 
 
 def compute_audio_feature(
     samples: Sequence[float],
     sample_rate: int,
-    bands: Iterable[tuple[float, float]] = ((0.0, 200.0), (200.0, 2000.0), (2000.0, 8000.0)),
+    bands: Iterable[tuple[float, float]] = _DEFAULT_BANDS,
 ) -> AudioFeature:
     """Compute RMS, energy, and band energy from audio samples."""
 
@@ -107,6 +211,45 @@ def compute_audio_feature(
     return AudioFeature(rms=rms, energy=energy, band_energy=band_energy)
 
 
+def compute_audio_feature_batch(
+    packets: Sequence[Sequence[float]],
+    sample_rate: int,
+    bands: Iterable[tuple[float, float]] = _DEFAULT_BANDS,
+) -> list[AudioFeature]:
+    """Compute audio features for equal-length packets in one pass.
+
+    ``packets`` is a 2-D array (or sequence of sequences) with one packet per
+    row. With NumPy all rows share a single batched real FFT and one matrix
+    product against the cached band masks.
+    """
+
+    bands = tuple((low, high) for low, high in bands)
+    if _np is None:
+        return [compute_audio_feature(row, sample_rate, bands) for row in packets]
+    matrix = _np.asarray(packets, dtype=_np.float64)
+    if matrix.ndim != 2:
+        raise ValueError("packets must be a 2-D array of equal-length rows.")
+    count, n = matrix.shape
+    squares = matrix * matrix
+    energies = squares.sum(axis=1)
+    rms_values = _np.sqrt(energies / n) if n else _np.zeros(count)
+    if n == 0 or sample_rate <= 0:
+        band_values = _np.zeros((count, len(bands)))
+    else:
+        power = (_np.abs(_np.fft.rfft(matrix, axis=1)) / n) ** 2
+        band_values = power @ _band_matrix(n, sample_rate, bands)
+    keys = [_band_key(low, high) for low, high in bands]
+    features = []
+    for rms, energy, row in zip(
+        rms_values.tolist(), energies.tolist(), band_values.tolist()
+    ):
+        band_energy: dict[str, float] = {}
+        for key, value in zip(keys, row):
+            band_energy[key] = band_energy.get(key, 0.0) + value
+        features.append(AudioFeature(rms=rms, energy=energy, band_energy=band_energy))
+    return features
+
+
 def compute_size_feature(
     original_resolution: tuple[int, int], current_resolution: tuple[int, int]
 ) -> SizeFeature:
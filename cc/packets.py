@@ -2,8 +2,28 @@
 
 from __future__ import annotations
 
+import heapq
+import itertools
+from array import array
 from dataclasses import dataclass, field
-from typing import Any, Dict, Sequence
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+from ._optional import optional_module
+from .brightness import BrightnessStats
+from .buffers import PooledBuffer
+
+_np: Any = optional_module("numpy")
 
 
 @dataclass
@@ -28,78 +48,336 @@ class AVPacket:
 
     def add_feature(self, name: str, feature: Any) -> None:
         self.features[name] = feature
-from __future__ import annotations
-
-from dataclasses import dataclass
-from typing import Any, Iterable, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FramePacket:
-    frame: bytes
+    frame: bytes | memoryview
     pts: float
     size: int
-    brightness_stats: dict[str, float]
+    brightness_stats: Mapping[str, float]
+    pooled: Optional[PooledBuffer] = field(default=None, repr=False, compare=False)
+    # Downscaled 8-bit gray copy of ``frame`` when the decoder produces one.
+    proxy: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def retain(self) -> None:
+        """Keep a pooled frame buffer alive beyond the current consumer."""
+
+        if self.pooled is not None:
+            self.pooled.retain()
+
+    def release(self) -> None:
+        """Return a pooled frame buffer; a no-op for frames that own bytes."""
+
+        if self.pooled is not None:
+            self.pooled.release()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AudioPacket:
     samples: bytes
     pts: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AVPacket:
     pts: float
     frame: Optional[FramePacket] = None
     audio: Optional[AudioPacket] = None
 
 
+@dataclass(frozen=True, slots=True)
+class PacketBatch:
+    """Frame packets stored by column instead of one object per frame.
+
+    Frame ``i`` is ``payload[offsets[i]:offsets[i + 1]]``. ``pts`` and
+    ``offsets`` are :mod:`array` columns and ``stats`` holds
+    ``len(stat_names)`` brightness values per frame, row by row, so NumPy can
+    view any column without copying. Indexing or iterating yields
+    :class:`FramePacket` views, which lets :func:`iter_av_packets` and
+    ``FrameDeduper.process_batch`` take a batch directly. Proxies are not
+    kept.
+    """
+
+    payload: bytearray
+    offsets: array
+    pts: array
+    stats: array
+    stat_names: tuple[str, ...]
+
+    @classmethod
+    def from_packets(cls, packets: Iterable[FramePacket]) -> PacketBatch:
+        """Copy ``packets`` into one batch; pooled frames stay with the caller."""
+
+        payload = bytearray()
+        offsets = array("q", [0])
+        pts = array("d")
+        stats = array("d")
+        stat_names: Optional[tuple[str, ...]] = None
+        for packet in packets:
+            names = tuple(packet.brightness_stats)
+            if stat_names is None:
+                stat_names = names
+            elif names != stat_names:
+                raise ValueError("All packets in a batch need the same stat names.")
+            payload += packet.frame
+            offsets.append(len(payload))
+            pts.append(packet.pts)
+            stats.extend(packet.brightness_stats.values())
+        return cls(payload, offsets, pts, stats, stat_names or ())
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def __getitem__(self, index: int) -> FramePacket:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PacketBatch index out of range.")
+        return FramePacket(
+            frame=self.frame(index),
+            pts=self.pts[index],
+            size=self.offsets[index + 1] - self.offsets[index],
+            brightness_stats=self.stats_row(index),
+        )
+
+    def __iter__(self) -> Iterator[FramePacket]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def sizes(self) -> array:
+        return array(
+            "q", (end - start for start, end in zip(self.offsets, self.offsets[1:]))
+        )
+
+    def frame(self, index: int) -> memoryview:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return memoryview(self.payload)[start:end].toreadonly()
+
+    def stats_row(self, index: int) -> BrightnessStats:
+        width = len(self.stat_names)
+        return BrightnessStats(
+            self.stat_names, tuple(self.stats[index * width : (index + 1) * width])
+        )
+
+    def frame_rows(self) -> Any | None:
+        """Read-only (N, frame_size) uint8 view of the payload.
+
+        ``None`` without NumPy or when the frames differ in size.
+        """
+
+        if _np is None or len(self) == 0:
+            return None
+        size = self.offsets[1]
+        if any(
+            end - start != size for start, end in zip(self.offsets, self.offsets[1:])
+        ):
+            return None
+        rows = _np.frombuffer(self.payload, dtype=_np.uint8, count=len(self) * size)
+        rows = rows.reshape(len(self), size)
+        rows.flags.writeable = False
+        return rows
+
+
+def iter_packet_batches(
+    frames: Iterable[FramePacket], batch_size: int = 64
+) -> Iterator[PacketBatch]:
+    """Group ``frames`` into batches of up to ``batch_size`` packets.
+
+    Each frame is copied into its batch and pooled frames are released right
+    away, so a decoder's buffer pool keeps cycling.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+    pending: list[FramePacket] = []
+    for packet in frames:
+        pending.append(packet)
+        if len(pending) == batch_size:
+            yield _batch_and_release(pending)
+            pending = []
+    if pending:
+        yield _batch_and_release(pending)
+
+
+def _batch_and_release(packets: list[FramePacket]) -> PacketBatch:
+    try:
+        return PacketBatch.from_packets(packets)
+    finally:
+        for packet in packets:
+            packet.release()
+
+
+@dataclass(frozen=True, slots=True)
+class MergedPacket:
+    """Packets of several inputs whose PTS fall within one tolerance window.
+
+    ``tracks`` maps input names to at most one packet each; ``pts`` is the
+    mean of their timestamps.
+    """
+
+    pts: float
+    tracks: dict[str, Any]
+
+
+def merge_streams(
+    inputs: Mapping[str, Iterable[Any]],
+    *,
+    tolerance: float = 1e-3,
+    reorder_window: int = 0,
+) -> Iterator[MergedPacket]:
+    """Merge any number of packet streams by PTS into tolerance groups.
+
+    The next packet of every input sits in a heap keyed by ``pts``, so a
+    packet costs O(log k) for k inputs. The earliest one opens a group and
+    the next packet of every other input within ``tolerance`` of it joins.
+    Inputs are expected in PTS order; with ``reorder_window > 0`` each input
+    reads that many packets ahead and hands them out sorted, which repairs
+    locally out-of-order timestamps. At most ``k * (reorder_window + 1)``
+    packets are held.
+    """
+
+    for pts, tracks in _merge(inputs, tolerance, reorder_window):
+        yield MergedPacket(pts, tracks)
+
+
+def _merge(
+    inputs: Mapping[str, Iterable[Any]], tolerance: float, reorder_window: int
+) -> Iterator[tuple[float, dict[str, Any]]]:
+    if reorder_window < 0:
+        raise ValueError("reorder_window must not be negative.")
+    names = list(inputs)
+    pulls = [_reader(inputs[name], reorder_window) for name in names]
+    heappop, heappush = heapq.heappop, heapq.heappush
+    heap: list[tuple[float, int, Any]] = []
+    for index, pull in enumerate(pulls):
+        packet = pull()
+        if packet is not None:
+            heappush(heap, (packet.pts, index, packet))
+    while heap:
+        pts, index, packet = heappop(heap)
+        if not heap or heap[0][0] - pts > tolerance:
+            # Common case: no other input within tolerance.
+            tracks = {names[index]: packet}
+            packet = pulls[index]()
+            if packet is not None:
+                heappush(heap, (packet.pts, index, packet))
+            yield pts, tracks
+            continue
+        tracks = {names[index]: packet}
+        members = [index]
+        total = pts
+        while heap and heap[0][0] - pts <= tolerance:
+            other_pts, other, other_packet = heappop(heap)
+            tracks[names[other]] = other_packet
+            members.append(other)
+            total += other_pts
+        for member in members:
+            packet = pulls[member]()
+            if packet is not None:
+                heappush(heap, (packet.pts, member, packet))
+        yield total / len(members), tracks
+
+
+def _reader(packets: Iterable[Any], window: int) -> Callable[[], Optional[Any]]:
+    """Return a function giving the next packet of ``packets``, or ``None``.
+
+    With ``window > 0`` it reads that many packets ahead and hands them out
+    in PTS order.
+    """
+
+    iterator = iter(packets)
+    if window == 0:
+        return lambda: next(iterator, None)
+    pending: list[tuple[float, int, Any]] = []
+    arrivals = itertools.count()
+
+    def pull() -> Optional[Any]:
+        while len(pending) <= window:
+            packet = next(iterator, None)
+            if packet is None:
+                break
+            # The arrival count breaks PTS ties so packets are never compared.
+            heapq.heappush(pending, (packet.pts, next(arrivals), packet))
+        if not pending:
+            return None
+        return heapq.heappop(pending)[2]
+
+    return pull
+
+
 def iter_av_packets(
     frames: Iterable[FramePacket],
     audio_packets: Iterable[AudioPacket],
     *,
     tolerance: float = 1e-3,
+    reorder_window: int = 0,
 ) -> Iterable[AVPacket]:
     """Align audio and video packets by PTS.
 
     If both packets are within the tolerance, emit a combined packet. Otherwise
-    emit whichever packet has the earlier timestamp.
+    emit whichever packet has the earlier timestamp. ``frames`` may also be a
+    :class:`PacketBatch`. This is :func:`merge_streams` over two inputs; use
+    that directly for more tracks.
     """
 
-    frame_iter = iter(frames)
-    audio_iter = iter(audio_packets)
+    merged = _merge(
+        {"frame": frames, "audio": audio_packets}, tolerance, reorder_window
+    )
+    for pts, tracks in merged:
+        yield AVPacket(pts, tracks.get("frame"), tracks.get("audio"))
 
-    next_frame: Optional[FramePacket] = next(frame_iter, None)
-    next_audio: Optional[AudioPacket] = next(audio_iter, None)
+
+async def aiter_av_packets(
+    frames: AsyncIterable[FramePacket],
+    audio_packets: AsyncIterable[AudioPacket],
+    *,
+    tolerance: float = 1e-3,
+) -> AsyncIterator[AVPacket]:
+    """Async :func:`iter_av_packets`."""
+
+    frame_iter = aiter(frames)
+    audio_iter = aiter(audio_packets)
+
+    next_frame: Optional[FramePacket] = await anext(frame_iter, None)
+    next_audio: Optional[AudioPacket] = await anext(audio_iter, None)
 
     while next_frame is not None or next_audio is not None:
-        if next_frame is None:
-            yield AVPacket(pts=next_audio.pts, audio=next_audio)
-            next_audio = next(audio_iter, None)
-            continue
-        if next_audio is None:
-            yield AVPacket(pts=next_frame.pts, frame=next_frame)
-            next_frame = next(frame_iter, None)
-            continue
+        packet = _merge_next(next_frame, next_audio, tolerance)
+        yield packet
+        if packet.frame is not None:
+            next_frame = await anext(frame_iter, None)
+        if packet.audio is not None:
+            next_audio = await anext(audio_iter, None)
+
 
-        pts_delta = next_frame.pts - next_audio.pts
-        if abs(pts_delta) <= tolerance:
-            pts = (next_frame.pts + next_audio.pts) / 2.0
-            yield AVPacket(pts=pts, frame=next_frame, audio=next_audio)
-            next_frame = next(frame_iter, None)
-            next_audio = next(audio_iter, None)
-        elif pts_delta < 0:
-            yield AVPacket(pts=next_frame.pts, frame=next_frame)
-            next_frame = next(frame_iter, None)
-        else:
-            yield AVPacket(pts=next_audio.pts, audio=next_audio)
-            next_audio = next(audio_iter, None)
+def _merge_next(
+    next_frame: Optional[FramePacket],
+    next_audio: Optional[AudioPacket],
+    tolerance: float,
+) -> AVPacket:
+    if next_frame is None:
+        return AVPacket(pts=next_audio.pts, audio=next_audio)
+    if next_audio is None:
+        return AVPacket(pts=next_frame.pts, frame=next_frame)
+    pts_delta = next_frame.pts - next_audio.pts
+    if abs(pts_delta) <= tolerance:
+        pts = (next_frame.pts + next_audio.pts) / 2.0
+        return AVPacket(pts=pts, frame=next_frame, audio=next_audio)
+    if pts_delta < 0:
+        return AVPacket(pts=next_frame.pts, frame=next_frame)
+    return AVPacket(pts=next_audio.pts, audio=next_audio)
 
 
 __all__ = [
     "FramePacket",
     "AudioPacket",
     "AVPacket",
+    "MergedPacket",
+    "PacketBatch",
+    "aiter_av_packets",
     "iter_av_packets",
+    "iter_packet_batches",
+    "merge_streams",
 ]
@@ -0,0 +1,372 @@
+"""Multi-stream frame de-duplication across worker processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import queue
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Deque, Iterable, Iterator
+
+from cc.config import DedupeConfig
+from cc.pipeline import FrameDeduper, FrameMetrics, StrategyStats
+
+_FRAME = "frame"
+_ERROR = "error"
+_METRICS = "metrics"
+# How often a blocked collect checks that the workers are still alive.
+_POLL_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class StreamDecision:
+    stream_id: str
+    index: int
+    keep: bool
+
+
+class ParallelFrameDeduper:
+    """Shard independent streams across worker processes.
+
+    Every stream is pinned to one worker, which owns that stream's
+    :class:`FrameDeduper`, so per-stream decisions match a single-process run.
+    Frames are copied into a per-worker ring of ``slots_per_worker`` shared
+    memory slots of ``max_frame_size`` bytes and only slot indices cross the
+    process boundary. Strategies must be registered at import time to be
+    available in spawned workers.
+
+    An exception raised while a worker processes a frame is re-raised from
+    the call that collects that frame's result, with the worker's traceback
+    as its cause; a worker that dies raises :class:`RuntimeError` instead of
+    blocking the caller.
+
+    Frame counts are tracked as results arrive. Each worker's per-stream
+    :class:`FrameMetrics` and :class:`~cc.pipeline.StrategyStats` come back
+    when the deduper closes, so strategy timings are only available after
+    :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        config: DedupeConfig,
+        *,
+        max_frame_size: int,
+        workers: int | None = None,
+        slots_per_worker: int = 8,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        if max_frame_size <= 0:
+            raise ValueError("max_frame_size must be positive.")
+        if slots_per_worker <= 0:
+            raise ValueError("slots_per_worker must be positive.")
+        self.config = config
+        self.max_frame_size = max_frame_size
+        self.workers = workers or os.cpu_count() or 1
+        self.slots_per_worker = slots_per_worker
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._tasks: list[Any] = []
+        self._memory: list[SharedMemory] = []
+        self._processes: list[Any] = []
+        self._free_slots: list[Deque[int]] = []
+        self._assignments: dict[str, int] = {}
+        self._stream_counts = [0] * self.workers
+        self._next_index: dict[str, int] = {}
+        self._pending = 0
+        self._ready: Deque[StreamDecision] = deque()
+        self._stream_metrics: dict[str, FrameMetrics] = {}
+        self._stream_strategy_stats: dict[str, dict[str, StrategyStats]] = {}
+        self._metrics = FrameMetrics()
+        self._closed = False
+        self._start_workers()
+
+    def __enter__(self) -> ParallelFrameDeduper:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(self, stream_id: str, frame: Any) -> int:
+        """Queue a frame of ``stream_id``; returns its index within the stream."""
+
+        payload = memoryview(_payload(frame)).cast("B")
+        if len(payload) > self.max_frame_size:
+            raise ValueError(
+                f"Frame of {len(payload)} bytes exceeds max_frame_size "
+                f"{self.max_frame_size}."
+            )
+        worker = self._worker_for(stream_id)
+        while not self._free_slots[worker]:
+            self._collect(block=True)
+        slot = self._free_slots[worker].popleft()
+        offset = slot * self.max_frame_size
+        self._memory[worker].buf[offset : offset + len(payload)] = payload
+        index = self._next_index.get(stream_id, 0)
+        self._next_index[stream_id] = index + 1
+        self._tasks[worker].put((_FRAME, stream_id, index, slot, len(payload)))
+        self._pending += 1
+        return index
+
+    def results(self, *, wait: bool = False) -> Iterator[StreamDecision]:
+        """Yield finished decisions; with ``wait`` until every frame is done."""
+
+        while True:
+            self._collect(block=False)
+            while self._ready:
+                yield self._ready.popleft()
+            if not wait or self._pending == 0:
+                return
+            self._collect(block=True)
+
+    def run(self, frames: Iterable[tuple[str, Any]]) -> Iterator[StreamDecision]:
+        """Submit ``(stream_id, frame)`` pairs and yield decisions as they finish.
+
+        Decisions for one stream arrive in order; across streams they arrive
+        in completion order.
+        """
+
+        for stream_id, frame in frames:
+            self.submit(stream_id, frame)
+            yield from self.results()
+        yield from self.results(wait=True)
+
+    def metrics(self) -> FrameMetrics:
+        """Aggregate frame counts over all streams into one FrameMetrics."""
+
+        self._metrics.total_frames = sum(
+            metrics.total_frames for metrics in self._stream_metrics.values()
+        )
+        self._metrics.kept_frames = sum(
+            metrics.kept_frames for metrics in self._stream_metrics.values()
+        )
+        return self._metrics
+
+    def stream_metrics(self) -> dict[str, FrameMetrics]:
+        return dict(self._stream_metrics)
+
+    def strategy_stats(self) -> dict[str, StrategyStats]:
+        """Per-strategy stats summed over all streams; empty until closed."""
+
+        totals: dict[str, StrategyStats] = {}
+        for stats in self._stream_strategy_stats.values():
+            for name, stream_stats in stats.items():
+                total = totals.setdefault(name, StrategyStats(cost=stream_stats.cost))
+                total.calls += stream_stats.calls
+                total.drops += stream_stats.drops
+                total.seconds += stream_stats.seconds
+        return totals
+
+    def stream_strategy_stats(self) -> dict[str, dict[str, StrategyStats]]:
+        return dict(self._stream_strategy_stats)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            for tasks in self._tasks:
+                tasks.put(None)
+            self._receive_worker_metrics()
+            for process in self._processes:
+                process.join()
+        finally:
+            for memory in self._memory:
+                memory.close()
+                memory.unlink()
+            self._results.close()
+            for tasks in self._tasks:
+                tasks.close()
+
+    def _start_workers(self) -> None:
+        slot_bytes = self.max_frame_size * self.slots_per_worker
+        for worker in range(self.workers):
+            memory = SharedMemory(create=True, size=slot_bytes)
+            tasks = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    worker,
+                    self.config,
+                    memory.name,
+                    self.max_frame_size,
+                    tasks,
+                    self._results,
+                ),
+                name=f"cc-dedupe-{worker}",
+                daemon=True,
+            )
+            process.start()
+            self._memory.append(memory)
+            self._tasks.append(tasks)
+            self._processes.append(process)
+            self._free_slots.append(deque(range(self.slots_per_worker)))
+
+    def _worker_for(self, stream_id: str) -> int:
+        worker = self._assignments.get(stream_id)
+        if worker is None:
+            worker = min(range(self.workers), key=self._stream_counts.__getitem__)
+            self._assignments[stream_id] = worker
+            self._stream_counts[worker] += 1
+            self._stream_metrics[stream_id] = FrameMetrics()
+        return worker
+
+    def _collect(self, *, block: bool) -> None:
+        while self._pending:
+            if not block and self._results.empty():
+                return
+            try:
+                message = self._results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                message = None
+            if message is None:
+                self._check_workers()
+                continue
+            kind, worker, stream_id, index, slot, result = message
+            block = False
+            self._free_slots[worker].append(slot)
+            self._pending -= 1
+            if kind == _ERROR:
+                error, remote_traceback = result
+                raise error from _RemoteTraceback(remote_traceback)
+            keep = result
+            self._stream_metrics[stream_id].record(keep)
+            self._ready.append(
+                StreamDecision(stream_id=stream_id, index=index, keep=keep)
+            )
+
+    def _receive_worker_metrics(self) -> None:
+        # Workers answer the stop message with their streams' metrics, after
+        # the results of frames still in flight, which are not reported.
+        waiting = set(range(len(self._processes)))
+        while waiting:
+            try:
+                message = self._results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                waiting = {
+                    worker for worker in waiting if self._processes[worker].is_alive()
+                }
+                continue
+            kind, worker, _, _, _, result = message
+            if kind != _METRICS:
+                continue
+            waiting.discard(worker)
+            for stream_id, (frame_metrics, stats) in result.items():
+                # Keep the parent's start time; worker clocks may differ.
+                metrics = self._stream_metrics[stream_id]
+                metrics.total_frames = frame_metrics.total_frames
+                metrics.kept_frames = frame_metrics.kept_frames
+                self._stream_strategy_stats[stream_id] = stats
+
+    def _check_workers(self) -> None:
+        for worker, process in enumerate(self._processes):
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Worker {worker} exited with code {process.exitcode} while "
+                    f"{self._pending} frame(s) were pending."
+                )
+
+
+class _RemoteTraceback(Exception):
+    def __init__(self, text: str) -> None:
+        super().__init__(text)
+        self.text = text
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _portable_error(exc: BaseException) -> BaseException:
+    # Exceptions with extra constructor arguments do not always survive
+    # pickling; send those as a RuntimeError carrying their repr.
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        return RuntimeError(repr(exc))
+    return exc
+
+
+class _SharedFrame:
+    """A frame viewed in place in a shared memory slot.
+
+    FrameDeduper retains the frames it keeps for comparison; retaining copies
+    the payload out so the slot can be reused.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: memoryview) -> None:
+        self.data: bytes | memoryview = data
+
+    def retain(self) -> None:
+        if isinstance(self.data, memoryview):
+            view = self.data
+            self.data = bytes(view)
+            view.release()
+
+    def release(self) -> None:
+        return None
+
+    def detach(self) -> None:
+        if isinstance(self.data, memoryview):
+            self.data.release()
+
+
+def _payload(frame: Any) -> bytes | bytearray | memoryview:
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        return frame
+    for attribute in ("data", "frame"):
+        data = getattr(frame, attribute, None)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return data
+    raise TypeError(
+        "Frame must be bytes-like or expose a 'data' or 'frame' attribute."
+    )
+
+
+def _worker_main(
+    worker: int,
+    config: DedupeConfig,
+    memory_name: str,
+    slot_size: int,
+    tasks: Any,
+    results: Any,
+) -> None:
+    memory = SharedMemory(name=memory_name)
+    dedupers: dict[str, FrameDeduper] = {}
+    try:
+        while True:
+            message = tasks.get()
+            if message is None:
+                metrics = {
+                    stream_id: (deduper.metrics, deduper.strategy_stats())
+                    for stream_id, deduper in dedupers.items()
+                }
+                results.put((_METRICS, worker, None, None, None, metrics))
+                return
+            _, stream_id, index, slot, length = message
+            deduper = dedupers.get(stream_id)
+            if deduper is None:
+                deduper = dedupers[stream_id] = FrameDeduper(config)
+            offset = slot * slot_size
+            frame = _SharedFrame(memory.buf[offset : offset + length])
+            try:
+                keep = deduper.process_frame(frame)
+            except Exception as exc:
+                frame.detach()
+                error = (_portable_error(exc), traceback.format_exc())
+                results.put((_ERROR, worker, stream_id, index, slot, error))
+                continue
+            if not keep:
+                frame.detach()
+            results.put((_FRAME, worker, stream_id, index, slot, keep))
+    finally:
+        dedupers.clear()
+        memory.close()
+
+
+__all__ = ["ParallelFrameDeduper", "StreamDecision"]
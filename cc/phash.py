@@ -0,0 +1,271 @@
+"""64-bit perceptual frame signatures and a BK-tree for Hamming lookups."""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from ._optional import optional_module
+from .brightness import LUMA_WEIGHTS
+
+_np: Any = optional_module("numpy")
+
+_PHASH_SIZE = 32
+_PHASH_BITS = 8
+_FALLBACK_SAMPLES_PER_CELL = 4
+
+
+def dhash(frame: Any, width: int, height: int, *, channels: int = 3) -> int:
+    """Difference hash: sign of horizontal gradients on a 9x8 luma thumbnail."""
+
+    grid = luma_thumbnail(frame, width, height, cols=9, rows=8, channels=channels)
+    signature = 0
+    for row in grid:
+        for left, right in zip(row, row[1:]):
+            signature = (signature << 1) | (1 if left > right else 0)
+    return signature
+
+
+def phash(frame: Any, width: int, height: int, *, channels: int = 3) -> int:
+    """DCT hash: low-frequency 8x8 DCT terms of a 32x32 thumbnail vs. median."""
+
+    grid = luma_thumbnail(
+        frame, width, height, cols=_PHASH_SIZE, rows=_PHASH_SIZE, channels=channels
+    )
+    if _np is not None:
+        matrix = _dct_matrix_numpy(_PHASH_SIZE)
+        coefficients = (matrix @ _np.asarray(grid) @ matrix.T)[
+            :_PHASH_BITS, :_PHASH_BITS
+        ].ravel().tolist()
+    else:
+        coefficients = _low_frequency_dct(grid, _PHASH_BITS)
+    # The DC term only tracks overall brightness; leave it out of the median.
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    signature = 0
+    for value in coefficients:
+        signature = (signature << 1) | (1 if value > median else 0)
+    return signature
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
+
+
+def luma_thumbnail(
+    frame: Any,
+    width: int,
+    height: int,
+    *,
+    cols: int,
+    rows: int,
+    channels: int = 3,
+) -> list[list[float]]:
+    """Downsample an interleaved 8-bit frame to a ``rows`` x ``cols`` luma grid.
+
+    NumPy computes exact area averages; the fallback averages a fixed number
+    of sample points per cell.
+    """
+
+    if width < cols or height < rows:
+        raise ValueError(f"Frame {width}x{height} is smaller than {cols}x{rows}.")
+    expected = width * height * channels
+    if len(frame) < expected:
+        raise ValueError(
+            f"Frame has {len(frame)} bytes, expected {expected} for "
+            f"{width}x{height}x{channels}."
+        )
+    if _np is not None:
+        return _luma_thumbnail_numpy(frame, width, height, cols, rows, channels)
+    return _luma_thumbnail_python(frame, width, height, cols, rows, channels)
+
+
+def _luma_thumbnail_numpy(
+    frame: Any, width: int, height: int, cols: int, rows: int, channels: int
+) -> list[list[float]]:
+    pixels = _np.frombuffer(frame, dtype=_np.uint8, count=width * height * channels)
+    pixels = pixels.reshape(height, width, channels)
+    row_edges = _cell_edges(height, rows)
+    col_edges = _cell_edges(width, cols)
+    sums = _np.add.reduceat(pixels, row_edges, axis=0, dtype=_np.uint64)
+    sums = _np.add.reduceat(sums, col_edges, axis=1)
+    counts = _np.outer(
+        _np.diff(row_edges + (height,)), _np.diff(col_edges + (width,))
+    )
+    means = sums / counts[:, :, None]
+    if channels >= 3:
+        luma = means[:, :, :3] @ _np.asarray(LUMA_WEIGHTS)
+    else:
+        luma = means[:, :, 0]
+    return luma.tolist()
+
+
+def _luma_thumbnail_python(
+    frame: Any, width: int, height: int, cols: int, rows: int, channels: int
+) -> list[list[float]]:
+    samples = _FALLBACK_SAMPLES_PER_CELL
+    ys = [
+        min(height - 1, int((row + (index + 0.5) / samples) * height / rows))
+        for row in range(rows)
+        for index in range(samples)
+    ]
+    xs = [
+        min(width - 1, int((col + (index + 0.5) / samples) * width / cols))
+        for col in range(cols)
+        for index in range(samples)
+    ]
+    weight_r, weight_g, weight_b = LUMA_WEIGHTS
+    grid: list[list[float]] = []
+    for row in range(rows):
+        cells = [0.0] * cols
+        for y in ys[row * samples : (row + 1) * samples]:
+            line = y * width * channels
+            for col in range(cols):
+                for x in xs[col * samples : (col + 1) * samples]:
+                    offset = line + x * channels
+                    if channels >= 3:
+                        cells[col] += (
+                            weight_r * frame[offset]
+                            + weight_g * frame[offset + 1]
+                            + weight_b * frame[offset + 2]
+                        )
+                    else:
+                        cells[col] += frame[offset]
+        grid.append([value / (samples * samples) for value in cells])
+    return grid
+
+
+def _cell_edges(length: int, cells: int) -> tuple[int, ...]:
+    return tuple(index * length // cells for index in range(cells))
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(size: int) -> tuple[tuple[float, ...], ...]:
+    rows = []
+    for k in range(size):
+        scale = math.sqrt((1 if k == 0 else 2) / size)
+        rows.append(
+            tuple(
+                scale * math.cos(math.pi * (2 * n + 1) * k / (2 * size))
+                for n in range(size)
+            )
+        )
+    return tuple(rows)
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix_numpy(size: int) -> Any:
+    return _np.asarray(_dct_matrix(size))
+
+
+def _low_frequency_dct(grid: list[list[float]], keep: int) -> list[float]:
+    matrix = _dct_matrix(len(grid))
+    # Only the top-left keep x keep block is needed: transform columns of the
+    # first ``keep`` basis rows, then rows.
+    size = len(grid)
+    partial = [
+        [sum(basis[n] * grid[n][col] for n in range(size)) for col in range(size)]
+        for basis in matrix[:keep]
+    ]
+    return [
+        sum(basis[n] * partial[row][n] for n in range(len(basis)))
+        for row in range(keep)
+        for basis in matrix[:keep]
+    ]
+
+
+class _BKNode:
+    __slots__ = ("signature", "live", "children")
+
+    def __init__(self, signature: int) -> None:
+        self.signature = signature
+        self.live = True
+        self.children: dict[int, _BKNode] = {}
+
+
+class BKTree:
+    """BK-tree of 64-bit signatures under Hamming distance.
+
+    Only the ``capacity`` most recently used distinct signatures are live;
+    re-adding a live signature refreshes its recency without taking a slot.
+    Evicted nodes are skipped by lookups and dropped when the tree is rebuilt
+    after growing past twice the capacity.
+    """
+
+    def __init__(self, capacity: int | None = None) -> None:
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self.capacity = capacity
+        self._root: _BKNode | None = None
+        # Live nodes by signature, least recently used first.
+        self._recent: OrderedDict[int, _BKNode] = OrderedDict()
+        self._nodes = 0
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def add(self, signature: int) -> None:
+        if signature in self._recent:
+            self._recent.move_to_end(signature)
+            return
+        self._recent[signature] = self._insert(signature)
+        if self.capacity is None or len(self._recent) <= self.capacity:
+            return
+        _, evicted = self._recent.popitem(last=False)
+        evicted.live = False
+        if self._nodes > 2 * self.capacity:
+            self._rebuild()
+
+    def find(self, signature: int, max_distance: int) -> tuple[int, int] | None:
+        """Return ``(distance, signature)`` of a live entry within range."""
+
+        if self._root is None:
+            return None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = (signature ^ node.signature).bit_count()
+            if distance <= max_distance and node.live:
+                return distance, node.signature
+            low = distance - max_distance
+            high = distance + max_distance
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return None
+
+    def _insert(self, signature: int) -> _BKNode:
+        if self._root is None:
+            self._root = _BKNode(signature)
+            self._nodes = 1
+            return self._root
+        node = self._root
+        while True:
+            distance = (signature ^ node.signature).bit_count()
+            if distance == 0:
+                node.live = True
+                return node
+            child = node.children.get(distance)
+            if child is None:
+                child = node.children[distance] = _BKNode(signature)
+                self._nodes += 1
+                return child
+            node = child
+
+    def _rebuild(self) -> None:
+        live = list(self._recent)
+        self._root = None
+        self._nodes = 0
+        self._recent = OrderedDict(
+            (signature, self._insert(signature)) for signature in live
+        )
+
+
+__all__ = [
+    "BKTree",
+    "dhash",
+    "hamming_distance",
+    "luma_thumbnail",
+    "phash",
+]
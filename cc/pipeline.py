@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Generator, Sequence
 
 from cc.config import DedupeConfig, StrategyConfig
 from cc.strategies import BaseStrategy, StrategyDecision, StrategyRegistry
@@ -36,11 +36,77 @@ class FrameMetrics:
         return self.dropped_frames / self.total_frames
 
 
+_ADAPT_MIN_CALLS = 32
+_REORDER_INTERVAL = 64
+
+
+@dataclass
+class StrategyStats:
+    """Calls, drop votes and time spent in one strategy's ``decide``."""
+
+    cost: float
+    calls: int = 0
+    drops: int = 0
+    seconds: float = 0.0
+
+    def record(self, keep: bool, seconds: float) -> None:
+        self.calls += 1
+        if not keep:
+            self.drops += 1
+        self.seconds += seconds
+
+    def hit_rate(self) -> float:
+        """Fraction of calls that voted to drop the frame."""
+
+        if self.calls == 0:
+            return 0.0
+        return self.drops / self.calls
+
+    def rank(self, seconds_per_cost: float = 1.0) -> float:
+        """Expected seconds spent per frame this strategy settles; lower first.
+
+        The declared cost, converted to seconds with ``seconds_per_cost``,
+        counts as ``_ADAPT_MIN_CALLS`` calls before the measured ones, so
+        every strategy is ranked in seconds and the measured time takes over
+        as calls accumulate. The drop rate is smoothed so a strategy that has
+        not dropped anything yet still gets a finite rank.
+        """
+
+        prior_seconds = _ADAPT_MIN_CALLS * self.cost * seconds_per_cost
+        per_call = (self.seconds + prior_seconds) / (self.calls + _ADAPT_MIN_CALLS)
+        return per_call * (self.calls + 2) / (self.drops + 1)
+
+
 class FrameDeduper:
-    def __init__(self, config: DedupeConfig) -> None:
+    """Keep a frame only if every enabled strategy votes to keep it.
+
+    With ``config.short_circuit`` strategies run cheapest first and evaluation
+    stops at the first drop vote. The order starts from each strategy's
+    declared ``cost`` (or a ``cost`` param) and is re-ranked every
+    ``_REORDER_INTERVAL`` frames from the measured time per call and drop rate,
+    with declared costs converted to seconds so both compare on one scale.
+    Strategies skipped for a dropped frame do not see it, so stateful ones
+    (the perceptual hash history) may diverge slightly from a full evaluation.
+
+    Per-strategy decisions are only collected when ``config.debug`` or
+    ``trace`` is set; the latest ones are in :attr:`last_decisions`.
+    """
+
+    def __init__(self, config: DedupeConfig, *, trace: bool = False) -> None:
         self.config = config
         self.metrics = FrameMetrics()
+        self.trace = trace
+        self.last_decisions: list[tuple[str, StrategyDecision]] = []
         self._strategies = self._build_strategies()
+        self._stats = {
+            strategy.name: StrategyStats(
+                cost=float(strategy_config.params.get("cost", strategy.cost))
+            )
+            for strategy, strategy_config in self._strategies
+        }
+        self._order = self._enabled_by_rank()
+        self._frames_since_reorder = 0
+        self._batched: dict[str, tuple[StrategyDecision, float]] = {}
         self._previous_frame: Any | None = None
         self._logger = logging.getLogger("cc.dedupe")
         if self.config.debug:
@@ -53,30 +119,158 @@ class FrameDeduper:
             strategies.append((strategy, strategy_config))
         return strategies
 
+    def strategy_stats(self) -> dict[str, StrategyStats]:
+        return dict(self._stats)
+
+    def strategy_order(self) -> list[str]:
+        """Names of the enabled strategies in short-circuit evaluation order."""
+
+        return [strategy.name for strategy, _ in self._order]
+
     def process_frame(self, frame: Any) -> bool:
-        decisions: list[tuple[str, StrategyDecision]] = []
-        keep = True
+        decisions: list[tuple[str, StrategyDecision]] | None = None
+        if self.config.debug or self.trace:
+            decisions = []
+        if self.config.short_circuit:
+            keep = self._evaluate_ordered(frame, decisions)
+        else:
+            keep = self._evaluate_all(frame, decisions)
+        self.metrics.record(keep)
+        if decisions is not None:
+            self.last_decisions = decisions
+            self._log_debug(frame, keep, decisions)
+        if keep:
+            self._replace_previous(frame)
+        return keep
+
+    def process_batch(self, frames: Sequence[Any]) -> list[bool]:
+        """Process ``frames`` in order and return their keep mask.
+
+        ``frames`` is an (N, H, W, C) array or a sequence of frame buffers.
+        Strategies with a :meth:`~cc.strategies.BaseStrategy.decide_batch`
+        compare the rows of the batch with the last kept frame in vectorized
+        steps and are told which frames were kept in the end, so their
+        decisions stay valid when another strategy drops a frame. The result
+        matches calling :meth:`process_frame` on every frame.
+        """
+
+        streams: dict[str, tuple[Generator[StrategyDecision, bool, None], float]]
+        streams = {}
         for strategy, strategy_config in self._strategies:
             if not strategy_config.enabled:
-                decisions.append(
-                    (strategy.name, StrategyDecision(True, "strategy_disabled"))
-                )
                 continue
-            decision = strategy.decide(
-                self._previous_frame,
-                frame,
-                self.config,
-                strategy_config,
+            started = time.perf_counter()
+            stream = strategy.decide_batch(
+                self._previous_frame, frames, self.config, strategy_config
             )
-            decisions.append((strategy.name, decision))
+            if stream is not None:
+                setup = (time.perf_counter() - started) / max(len(frames), 1)
+                streams[strategy.name] = (stream, setup)
+        keep_mask: list[bool] = []
+        try:
+            for frame in frames:
+                batched: dict[str, tuple[StrategyDecision, float]] = {}
+                for name, (stream, setup) in streams.items():
+                    started = time.perf_counter()
+                    decision = stream.send(keep_mask[-1]) if keep_mask else next(stream)
+                    batched[name] = (decision, setup + time.perf_counter() - started)
+                self._batched = batched
+                keep_mask.append(self.process_frame(frame))
+        finally:
+            self._batched = {}
+            for stream, _ in streams.values():
+                stream.close()
+        # Callers may decode the next chunk into the same array, so a kept
+        # array row must not stay a view into it.
+        previous = self._previous_frame
+        if getattr(previous, "base", None) is not None and hasattr(previous, "copy"):
+            self._previous_frame = previous.copy()
+        return keep_mask
+
+    def _evaluate_all(
+        self, frame: Any, decisions: list[tuple[str, StrategyDecision]] | None
+    ) -> bool:
+        keep = True
+        for strategy, strategy_config in self._strategies:
+            if not strategy_config.enabled:
+                if decisions is not None:
+                    decisions.append(
+                        (strategy.name, StrategyDecision(True, "strategy_disabled"))
+                    )
+                continue
+            decision = self._decide(strategy, strategy_config, frame)
+            if decisions is not None:
+                decisions.append((strategy.name, decision))
             if not decision.keep:
                 keep = False
-        self.metrics.record(keep)
-        self._log_debug(frame, keep, decisions)
-        if keep:
-            self._previous_frame = frame
         return keep
 
+    def _evaluate_ordered(
+        self, frame: Any, decisions: list[tuple[str, StrategyDecision]] | None
+    ) -> bool:
+        self._frames_since_reorder += 1
+        if self._frames_since_reorder >= _REORDER_INTERVAL:
+            self._frames_since_reorder = 0
+            self._order = self._enabled_by_rank()
+        for strategy, strategy_config in self._order:
+            decision = self._decide(strategy, strategy_config, frame)
+            if decisions is not None:
+                decisions.append((strategy.name, decision))
+            if not decision.keep:
+                return False
+        return True
+
+    def _decide(
+        self, strategy: BaseStrategy, strategy_config: StrategyConfig, frame: Any
+    ) -> StrategyDecision:
+        batched = self._batched.get(strategy.name)
+        if batched is not None:
+            decision, seconds = batched
+            self._stats[strategy.name].record(decision.keep, seconds)
+            return decision
+        started = time.perf_counter()
+        decision = strategy.decide(
+            self._previous_frame,
+            frame,
+            self.config,
+            strategy_config,
+        )
+        self._stats[strategy.name].record(
+            decision.keep, time.perf_counter() - started
+        )
+        return decision
+
+    def _enabled_by_rank(self) -> list[tuple[BaseStrategy, StrategyConfig]]:
+        enabled = [
+            (strategy, strategy_config)
+            for strategy, strategy_config in self._strategies
+            if strategy_config.enabled
+        ]
+        scale = self._seconds_per_cost()
+        # sorted() is stable, so equal ranks keep the configured order.
+        return sorted(
+            enabled, key=lambda item: self._stats[item[0].name].rank(scale)
+        )
+
+    def _seconds_per_cost(self) -> float:
+        # Measured seconds per unit of declared cost over all strategies, so
+        # declared costs convert to the same scale as measured times.
+        seconds = sum(stats.seconds for stats in self._stats.values())
+        cost = sum(stats.cost * stats.calls for stats in self._stats.values())
+        return seconds / cost if seconds > 0 and cost > 0 else 1.0
+
+    def _replace_previous(self, frame: Any) -> None:
+        # Pooled frames are recycled once every holder releases them, so the
+        # frame kept for comparison holds its own reference.
+        retain = getattr(frame, "retain", None)
+        if retain is not None:
+            retain()
+        previous = self._previous_frame
+        self._previous_frame = frame
+        release = getattr(previous, "release", None)
+        if release is not None:
+            release()
+
     def _log_debug(
         self,
         frame: Any,
@@ -108,27 +302,69 @@ def _frame_id(frame: Any) -> str:
     return hex(id(frame))
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
-from .decoder import FFmpegDecoder
-from .packets import AVPacket, iter_av_packets
+from .decoder import FFmpegAVDecoder, FFmpegDecoder
+from .packets import AVPacket, aiter_av_packets, iter_av_packets
 
 
 @dataclass
 class DecodeStage:
     ffmpeg_path: str = "ffmpeg"
     pts_tolerance: float = 1e-3
+    streaming: bool = False
+    shared_process: bool = False
+    proxy_scale: int = 0
 
     def run(self, input_path: str | Path) -> Iterable[AVPacket]:
-        decoder = FFmpegDecoder(input_path, ffmpeg_path=self.ffmpeg_path)
+        if self.shared_process:
+            av_decoder = FFmpegAVDecoder(
+                input_path,
+                ffmpeg_path=self.ffmpeg_path,
+                proxy_scale=self.proxy_scale,
+            )
+            return av_decoder.iter_av_packets(tolerance=self.pts_tolerance)
+        decoder = FFmpegDecoder(
+            input_path,
+            ffmpeg_path=self.ffmpeg_path,
+            streaming=self.streaming,
+            proxy_scale=self.proxy_scale,
+        )
         frames = decoder.iter_frames()
         audio = decoder.iter_audio()
         return iter_av_packets(frames, audio, tolerance=self.pts_tolerance)
 
+    def arun(self, input_path: str | Path) -> AsyncIterator[AVPacket]:
+        """Decode through asyncio subprocesses; always streams timestamps."""
+
+        decoder = FFmpegDecoder(
+            input_path, ffmpeg_path=self.ffmpeg_path, proxy_scale=self.proxy_scale
+        )
+        return aiter_av_packets(
+            decoder.aiter_frames(),
+            decoder.aiter_audio(),
+            tolerance=self.pts_tolerance,
+        )
+
 
 class Pipeline:
-    def __init__(self, *, ffmpeg_path: str = "ffmpeg") -> None:
-        self.decode_stage = DecodeStage(ffmpeg_path=ffmpeg_path)
+    def __init__(
+        self,
+        *,
+        ffmpeg_path: str = "ffmpeg",
+        streaming: bool = False,
+        shared_process: bool = False,
+        proxy_scale: int = 0,
+    ) -> None:
+        self.decode_stage = DecodeStage(
+            ffmpeg_path=ffmpeg_path,
+            streaming=streaming,
+            shared_process=shared_process,
+            proxy_scale=proxy_scale,
+        )
 
     def decode(self, input_path: str | Path) -> Iterable[AVPacket]:
         return self.decode_stage.run(input_path)
+
+    def adecode(self, input_path: str | Path) -> AsyncIterator[AVPacket]:
+        return self.decode_stage.arun(input_path)
@@ -0,0 +1,115 @@
+"""Small grayscale proxies of packed 8-bit frames for cheap comparisons."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ._optional import optional_module
+
+_np: Any = optional_module("numpy")
+
+# Rec. 709 luma weights (see cc.brightness.LUMA_WEIGHTS) in 1/256 steps.
+_LUMA_WEIGHTS_256 = (54, 183, 19)
+
+
+def proxy_size(width: int, height: int, scale: int) -> tuple[int, int]:
+    """Width and height of the proxy of a ``width`` x ``height`` frame."""
+
+    if scale <= 0:
+        raise ValueError("scale must be positive.")
+    return max(1, width // scale), max(1, height // scale)
+
+
+def luma_proxy(
+    frame: bytes | bytearray | memoryview,
+    width: int,
+    height: int,
+    *,
+    scale: int = 8,
+    channels: int = 3,
+) -> bytes:
+    """Downscale ``frame`` by ``scale`` in each direction to 8-bit luma.
+
+    With NumPy every proxy pixel is the Rec. 709 luma of the mean of its
+    ``scale`` x ``scale`` block (an area downsample); rows and columns that do
+    not fill a whole block are dropped. Without NumPy the top-left pixel of
+    each block is sampled instead, which is coarser but still cheap.
+    ``channels`` is 1 for grayscale frames, otherwise the first three
+    channels are read as RGB.
+    """
+
+    proxy_width, proxy_height = proxy_size(width, height, scale)
+    if len(frame) < width * height * channels:
+        raise ValueError("Frame is smaller than width * height * channels.")
+    block_x = width // proxy_width
+    block_y = height // proxy_height
+    if _np is not None:
+        return _luma_proxy_numpy(
+            frame, width, channels, proxy_width, proxy_height, block_x, block_y
+        )
+    return _luma_proxy_python(
+        frame, width, channels, proxy_width, proxy_height, block_x, block_y
+    )
+
+
+def _luma_proxy_numpy(
+    frame: bytes | bytearray | memoryview,
+    width: int,
+    channels: int,
+    proxy_width: int,
+    proxy_height: int,
+    block_x: int,
+    block_y: int,
+) -> bytes:
+    rows = _np.frombuffer(
+        frame, dtype=_np.uint8, count=proxy_height * block_y * width * channels
+    ).reshape(proxy_height, block_y, width * channels)
+    # Sum block rows first (uint16 holds 255 * block_y for block_y <= 257),
+    # then the columns of each block on the already shrunk array.
+    row_sums = rows.sum(axis=1, dtype=_np.uint16 if block_y <= 257 else _np.uint32)
+    row_sums = row_sums[:, : proxy_width * block_x * channels]
+    blocks = row_sums.reshape(proxy_height, proxy_width, block_x, channels).sum(
+        axis=2, dtype=_np.uint32
+    )
+    divisor = block_x * block_y
+    if channels < 3:
+        luma = blocks[..., 0] // divisor
+    else:
+        red, green, blue = _LUMA_WEIGHTS_256
+        luma = (
+            blocks[..., 0] * red + blocks[..., 1] * green + blocks[..., 2] * blue
+        ) // (divisor * 256)
+    return luma.astype(_np.uint8).tobytes()
+
+
+def _luma_proxy_python(
+    frame: bytes | bytearray | memoryview,
+    width: int,
+    channels: int,
+    proxy_width: int,
+    proxy_height: int,
+    block_x: int,
+    block_y: int,
+) -> bytes:
+    data = memoryview(frame).cast("B")
+    stride = width * channels
+    step = block_x * channels
+    span = proxy_width * step
+    output = bytearray()
+    red, green, blue = _LUMA_WEIGHTS_256
+    for proxy_row in range(proxy_height):
+        start = proxy_row * block_y * stride
+        if channels < 3:
+            output += data[start : start + span : step]
+            continue
+        reds = data[start : start + span : step]
+        greens = data[start + 1 : start + span : step]
+        blues = data[start + 2 : start + span : step]
+        output += bytes(
+            (r * red + g * green + b * blue) >> 8
+            for r, g, b in zip(reds, greens, blues)
+        )
+    return bytes(output)
+
+
+__all__ = ["luma_proxy", "proxy_size"]
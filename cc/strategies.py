@@ -2,9 +2,20 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from hashlib import sha256
-from typing import Any, Callable
+from typing import Any, Callable, Generator, Sequence
 
+from cc._optional import optional_module
 from cc.config import DedupeConfig, StrategyConfig
+from cc.packets import PacketBatch
+from cc.phash import BKTree, dhash, phash
+from cc.proxy import luma_proxy
+
+_np: Any = optional_module("numpy")
+
+_DIFF_CHUNK_SIZE = 1 << 16
+# Bytes compared per step of a batch. Small frames share a step; larger masks
+# than one chunk fall past the allocator's mmap threshold and cost page faults.
+_BATCH_BLOCK_SIZE = _DIFF_CHUNK_SIZE
 
 
 @dataclass(frozen=True)
@@ -16,6 +27,9 @@ class StrategyDecision:
 
 class BaseStrategy:
     name: str = "base"
+    # Relative cost of one decide() call, used to run cheap strategies first
+    # when FrameDeduper short-circuits. Overridden by a "cost" param.
+    cost: float = 1.0
 
     def decide(
         self,
@@ -26,6 +40,25 @@ class BaseStrategy:
     ) -> StrategyDecision:
         raise NotImplementedError
 
+    def decide_batch(
+        self,
+        previous_frame: Any | None,
+        frames: Sequence[Any],
+        config: DedupeConfig,
+        strategy_config: StrategyConfig,
+    ) -> Generator[StrategyDecision, bool, None] | None:
+        """Decide ``frames`` in order, each against the last kept frame.
+
+        ``previous_frame`` is the kept frame before the batch. FrameDeduper
+        reads the first decision with ``next()`` and every later one with
+        ``send(kept)``, where ``kept`` says whether the frame before was kept
+        in the end; another strategy may have dropped a frame this one kept.
+        The default returns ``None`` so every frame goes through
+        :meth:`decide`, which strategies with state must keep.
+        """
+
+        return None
+
 
 class StrategyRegistry:
     _registry: dict[str, Callable[[], BaseStrategy]] = {}
@@ -46,8 +79,26 @@ class StrategyRegistry:
 
 
 class HashDiffStrategy(BaseStrategy):
+    """Drop frames whose bytes barely differ from the previous kept frame.
+
+    With a ``proxy_scale`` param the comparison runs on gray proxies
+    downscaled by that factor instead of the full frames: ``FramePacket.proxy``
+    when the decoder attached one (``FFmpegDecoder(proxy_scale=...)``),
+    otherwise one computed in process from the frame, which then needs its
+    width/height (attributes, array shape or params) and ``channels``
+    (default 3). The threshold applies to the fraction of proxy pixels that
+    differ.
+    """
+
     name = "hash_diff"
 
+    def __init__(self) -> None:
+        # Proxies computed in process, one slot for the previous (kept) frame
+        # and one for the last current frame, which becomes the previous one
+        # if it is kept. Dropped frames only ever replace the current slot.
+        self._previous_proxy: tuple[Any, bytes] | None = None
+        self._current_proxy: tuple[Any, bytes] | None = None
+
     def decide(
         self,
         previous_frame: Any | None,
@@ -57,49 +108,440 @@ class HashDiffStrategy(BaseStrategy):
     ) -> StrategyDecision:
         if previous_frame is None:
             return StrategyDecision(keep=True, reason="no_previous_frame")
-        previous_bytes = _frame_bytes(previous_frame)
-        current_bytes = _frame_bytes(current_frame)
-        diff_ratio = _byte_diff_ratio(previous_bytes, current_bytes)
-        threshold = strategy_config.threshold
-        if threshold is None:
-            threshold = config.threshold
-        keep = diff_ratio > threshold
-        reason = "diff_above_threshold" if keep else "diff_below_threshold"
-        metrics = {
-            "diff_ratio": diff_ratio,
-            "threshold": threshold,
-            "hash_prev": _sha_digest(previous_bytes),
-            "hash_curr": _sha_digest(current_bytes),
-        }
-        return StrategyDecision(keep=keep, reason=reason, metrics=metrics)
+        previous_bytes = self._compared_bytes(
+            previous_frame, strategy_config, previous=True
+        )
+        current_bytes = self._compared_bytes(current_frame, strategy_config)
+        threshold = _threshold(config, strategy_config)
+        # The scan stops as soon as the threshold is exceeded, so the reported
+        # ratio is a lower bound for kept frames.
+        diff_ratio = _byte_diff_ratio(previous_bytes, current_bytes, limit=threshold)
+        return _diff_decision(
+            diff_ratio, threshold, config, previous_bytes, current_bytes
+        )
+
+    def decide_batch(
+        self,
+        previous_frame: Any | None,
+        frames: Sequence[Any],
+        config: DedupeConfig,
+        strategy_config: StrategyConfig,
+    ) -> Generator[StrategyDecision, bool, None] | None:
+        if _np is None or len(frames) == 0:
+            return None
+        if _proxy_scale(strategy_config) > 0:
+            rows = _frame_rows(
+                [self._compared_bytes(frame, strategy_config) for frame in frames]
+            )
+        else:
+            rows = _frame_rows(frames)
+        if rows is None or len(rows[0]) == 0:
+            return None
+        reference = None
+        if previous_frame is not None:
+            reference = _np.frombuffer(
+                self._compared_bytes(previous_frame, strategy_config, previous=True),
+                dtype=_np.uint8,
+            )
+            if len(reference) != len(rows[0]):
+                return None
+        return self._batch_decisions(
+            rows, reference, _threshold(config, strategy_config), config
+        )
+
+    def _batch_decisions(
+        self, rows: Any, reference: Any | None, threshold: float, config: DedupeConfig
+    ) -> Generator[StrategyDecision, bool, None]:
+        index = 0
+        while reference is None and index < len(rows):
+            kept = yield StrategyDecision(keep=True, reason="no_previous_frame")
+            if kept:
+                reference = rows[index]
+            index += 1
+        width = len(rows[0])
+        max_diff = threshold * width
+        first_chunk = min(width, _DIFF_CHUNK_SIZE)
+        max_rows = max(1, _BATCH_BLOCK_SIZE // max(1, first_chunk))
+        if not isinstance(rows, _np.ndarray):
+            # Separate buffers are compared one row at a time either way, so
+            # a window would only add rows past the answer.
+            max_rows = 1
+        # While the frame before was kept, consecutive rows are compared and
+        # every row over the threshold within the first chunk is a keep, as
+        # decide() would stop there too. Otherwise the following rows are
+        # compared with the kept reference until the first one over it. Each
+        # step doubles its window while its guess holds.
+        after_keep = index > 0
+        head = None
+        window = 1
+        while index < len(rows):
+            end = min(index + window, len(rows))
+            if after_keep:
+                counts = _row_counts(
+                    rows[index:end], rows[index - 1 : end - 1], 0, first_chunk
+                )
+                kept = True
+                for count in counts:
+                    if count <= max_diff:
+                        # Carry the first chunk over to the full comparison.
+                        head = count
+                        break
+                    kept = yield _diff_decision(
+                        count / width, threshold, config, rows[index - 1], rows[index]
+                    )
+                    index += 1
+                    if not kept:
+                        break
+                if kept and index == end:
+                    window = min(window * 2, max_rows)
+                else:
+                    # The run ended at a row within the threshold, or at one
+                    # another strategy dropped, so the one before is the last
+                    # kept frame.
+                    after_keep = False
+                    window = 1
+                    reference = rows[index - 1] if kept else rows[index - 2]
+                continue
+            first, counts = _first_row_over(
+                rows[index:end], reference, max_diff, head=head
+            )
+            head = None
+            last = len(counts) if first is None else first + 1
+            kept = False
+            for count in counts[:last]:
+                kept = yield _diff_decision(
+                    count / width, threshold, config, reference, rows[index]
+                )
+                index += 1
+            if first is None:
+                window = min(window * 2, max_rows)
+            else:
+                window = 1
+                if kept:
+                    reference = rows[index - 1]
+                    after_keep = True
+
+    def _compared_bytes(
+        self, frame: Any, strategy_config: StrategyConfig, *, previous: bool = False
+    ) -> _BytesLike:
+        scale = _proxy_scale(strategy_config)
+        if scale <= 0:
+            return _frame_bytes(frame)
+        proxy = getattr(frame, "proxy", None)
+        if proxy is not None:
+            return proxy
+        cached = None
+        for slot in (self._previous_proxy, self._current_proxy):
+            if slot is not None and slot[0] is frame:
+                cached = slot
+                break
+        if cached is None:
+            params = strategy_config.params
+            width, height = _frame_dimensions(frame, params)
+            cached = (
+                frame,
+                luma_proxy(
+                    _frame_bytes(frame),
+                    width,
+                    height,
+                    scale=scale,
+                    channels=int(params.get("channels", 3)),
+                ),
+            )
+        if previous:
+            self._previous_proxy = cached
+        else:
+            self._current_proxy = cached
+        return cached[1]
+
+
+class _PerceptualHashStrategy(BaseStrategy):
+    """Drop frames whose 64-bit signature is near one seen in recent history.
+
+    ``threshold`` is the maximum Hamming distance in bits (``max_distance`` in
+    params otherwise). Params: ``history_size`` (distinct signatures kept in
+    the BK-tree index, least recently matched evicted first), ``width``/
+    ``height`` for frames that do not expose them, and ``channels`` (default
+    3, interleaved 8-bit).
+    """
+
+    default_max_distance = 4
+    default_history_size = 1024
+
+    def __init__(self) -> None:
+        self._index: BKTree | None = None
+
+    def signature(
+        self, frame: _BytesLike, width: int, height: int, channels: int
+    ) -> int:
+        raise NotImplementedError
+
+    def decide(
+        self,
+        previous_frame: Any | None,
+        current_frame: Any,
+        config: DedupeConfig,
+        strategy_config: StrategyConfig,
+    ) -> StrategyDecision:
+        params = strategy_config.params
+        width, height = _frame_dimensions(current_frame, params)
+        signature = self.signature(
+            _frame_bytes(current_frame),
+            width,
+            height,
+            int(params.get("channels", 3)),
+        )
+        max_distance = strategy_config.threshold
+        if max_distance is None:
+            max_distance = params.get("max_distance", self.default_max_distance)
+        max_distance = int(max_distance)
+        if self._index is None:
+            self._index = BKTree(
+                capacity=int(params.get("history_size", self.default_history_size))
+            )
+        match = self._index.find(signature, max_distance)
+        metrics: dict[str, Any] = {"max_distance": max_distance}
+        if config.debug:
+            metrics["signature"] = f"{signature:016x}"
+        if match is None:
+            self._index.add(signature)
+            return StrategyDecision(
+                keep=True, reason="no_similar_signature", metrics=metrics
+            )
+        distance, matched_signature = match
+        # Refresh the match so a long-running repeat stays in the history.
+        self._index.add(matched_signature)
+        metrics["distance"] = distance
+        return StrategyDecision(
+            keep=False, reason="similar_signature_in_history", metrics=metrics
+        )
+
+
+class DHashStrategy(_PerceptualHashStrategy):
+    name = "dhash"
+    cost = 4.0
+
+    def signature(
+        self, frame: _BytesLike, width: int, height: int, channels: int
+    ) -> int:
+        return dhash(frame, width, height, channels=channels)
+
+
+class PHashStrategy(_PerceptualHashStrategy):
+    name = "phash"
+    cost = 8.0
+
+    def signature(
+        self, frame: _BytesLike, width: int, height: int, channels: int
+    ) -> int:
+        return phash(frame, width, height, channels=channels)
 
 
 StrategyRegistry.register(HashDiffStrategy.name, HashDiffStrategy)
+StrategyRegistry.register(DHashStrategy.name, DHashStrategy)
+StrategyRegistry.register(PHashStrategy.name, PHashStrategy)
+
+
+_BytesLike = bytes | bytearray | memoryview
+
 
+def _frame_bytes(frame: Any) -> _BytesLike:
+    """Return the frame payload without copying it."""
 
-def _frame_bytes(frame: Any) -> bytes:
     if isinstance(frame, (bytes, bytearray, memoryview)):
-        return bytes(frame)
-    data = getattr(frame, "data", None)
-    if isinstance(data, (bytes, bytearray, memoryview)):
-        return bytes(data)
-    raise TypeError("Frame must be bytes-like or expose a 'data' attribute.")
+        return _flat(frame)
+    for attribute in ("data", "frame"):
+        data = getattr(frame, attribute, None)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return _flat(data)
+    raise TypeError("Frame must be bytes-like or expose a 'data' or 'frame' attribute.")
 
 
-def _byte_diff_ratio(previous: bytes, current: bytes) -> float:
-    if not previous and not current:
-        return 0.0
+def _flat(data: _BytesLike) -> _BytesLike:
+    # Array frames (an (H, W, C) row of a batch) expose shaped memoryviews;
+    # compare them as flat bytes.
+    if isinstance(data, memoryview) and (data.ndim != 1 or data.itemsize != 1):
+        return data.cast("B")
+    return data
+
+
+def _frame_rows(frames: Sequence[Any]) -> Any | None:
+    """The compared bytes of ``frames`` as uint8 rows, without copying.
+
+    An (N, ...) array or a PacketBatch gives an (N, frame_bytes) array; other
+    buffers give a list of 1-D arrays. Returns ``None`` when the frames differ
+    in size.
+    """
+
+    if isinstance(frames, _np.ndarray):
+        return _np.ascontiguousarray(frames).view(_np.uint8).reshape(len(frames), -1)
+    if isinstance(frames, PacketBatch):
+        return frames.frame_rows()
+    rows = [_np.frombuffer(_frame_bytes(frame), dtype=_np.uint8) for frame in frames]
+    if len({len(row) for row in rows}) != 1:
+        return None
+    return rows
+
+
+def _row_counts(rows: Any, references: Any, start: int, stop: int) -> list[int]:
+    """Differing bytes in columns ``start:stop`` of each row.
+
+    ``references`` holds one row per row, or is a single row for all of them.
+    Several array rows are compared in one step; count_nonzero per row beats
+    its axis=1 form.
+    """
+
+    if isinstance(rows, _np.ndarray) and len(rows) > 1:
+        mask = rows[:, start:stop] != references[..., start:stop]
+        return [int(_np.count_nonzero(row)) for row in mask]
+    if isinstance(references, _np.ndarray) and references.ndim == 1:
+        references = [references] * len(rows)
+    return [
+        int(_np.count_nonzero(row[start:stop] != reference[start:stop]))
+        for row, reference in zip(rows, references)
+    ]
+
+
+def _first_row_over(
+    rows: Any, reference: Any, max_diff: float, *, head: int | None = None
+) -> tuple[int | None, list[int]]:
+    """First row differing from ``reference`` in more than ``max_diff`` bytes.
+
+    Also returns the differing-byte count of each row up to that one. Columns
+    are compared a chunk at a time and only rows before the first one found
+    go on, so that row's count stops where it crossed, as in
+    :func:`_byte_diff_ratio`. ``head`` is the first row's count over the first
+    chunk when it is already known to be within ``max_diff``.
+    """
+
+    width = len(reference)
+    if len(rows) == 1:
+        # A lone row (large frames get one per window) skips the bookkeeping.
+        row = rows[0]
+        count = head or 0
+        begin = 0 if head is None else _DIFF_CHUNK_SIZE
+        for start in range(begin, width, _DIFF_CHUNK_SIZE):
+            stop = start + _DIFF_CHUNK_SIZE
+            count += int(_np.count_nonzero(row[start:stop] != reference[start:stop]))
+            if count > max_diff:
+                return 0, [count]
+        return None, [count]
+    counts = [0] * len(rows)
+    skip = 0
+    if head is not None:
+        counts[0] = head
+        skip = 1
+    first = None
+    end = len(rows)
+    for start in range(0, width, _DIFF_CHUNK_SIZE):
+        stop = min(start + _DIFF_CHUNK_SIZE, width)
+        begin = skip if start == 0 else 0
+        if begin == end:
+            continue
+        chunk_counts = _row_counts(rows[begin:end], reference, start, stop)
+        for offset, count in enumerate(chunk_counts, begin):
+            counts[offset] += count
+            if counts[offset] > max_diff:
+                first = end = offset
+                break
+        if end == 0:
+            break
+    return first, counts
+
+
+def _threshold(config: DedupeConfig, strategy_config: StrategyConfig) -> float:
+    threshold = strategy_config.threshold
+    if threshold is None:
+        threshold = config.threshold
+    return threshold
+
+
+def _diff_decision(
+    diff_ratio: float,
+    threshold: float,
+    config: DedupeConfig,
+    previous: Any,
+    current: Any,
+) -> StrategyDecision:
+    keep = diff_ratio > threshold
+    reason = "diff_above_threshold" if keep else "diff_below_threshold"
+    metrics: dict[str, Any] = {"diff_ratio": diff_ratio, "threshold": threshold}
+    if config.debug:
+        metrics["hash_prev"] = _sha_digest(previous)
+        metrics["hash_curr"] = _sha_digest(current)
+    return StrategyDecision(keep=keep, reason=reason, metrics=metrics)
+
+
+def _proxy_scale(strategy_config: StrategyConfig) -> int:
+    return int(strategy_config.params.get("proxy_scale", 0) or 0)
+
+
+def _frame_dimensions(frame: Any, params: dict[str, Any]) -> tuple[int, int]:
+    shape = getattr(frame, "shape", None)
+    if shape is not None and len(shape) >= 2:
+        return int(shape[1]), int(shape[0])
+    width = getattr(frame, "width", None) or params.get("width")
+    height = getattr(frame, "height", None) or params.get("height")
+    if not width or not height:
+        raise ValueError(
+            "Frame width/height are unknown; set them in the strategy params or "
+            "pass frames that expose them."
+        )
+    return int(width), int(height)
+
+
+def _byte_diff_ratio(
+    previous: _BytesLike, current: _BytesLike, limit: float | None = None
+) -> float:
+    """Fraction of byte positions that differ, counting any length mismatch.
+
+    With ``limit`` the comparison stops once the ratio is known to exceed it and
+    returns the ratio counted so far.
+    """
+
     max_len = max(len(previous), len(current))
     if max_len == 0:
         return 0.0
-    diff = 0
-    for idx in range(max_len):
-        prev_byte = previous[idx] if idx < len(previous) else None
-        curr_byte = current[idx] if idx < len(current) else None
-        if prev_byte != curr_byte:
-            diff += 1
+    max_diff = None if limit is None else limit * max_len
+    common = min(len(previous), len(current))
+    diff = max_len - common
+    if max_diff is not None and diff > max_diff:
+        return diff / max_len
+    count_chunk = _chunk_counter(previous, current, common)
+    for start in range(0, common, _DIFF_CHUNK_SIZE):
+        diff += count_chunk(start, min(start + _DIFF_CHUNK_SIZE, common))
+        if max_diff is not None and diff > max_diff:
+            break
     return diff / max_len
 
 
-def _sha_digest(payload: bytes) -> str:
+def _chunk_counter(
+    previous: _BytesLike, current: _BytesLike, common: int
+) -> Callable[[int, int], int]:
+    if _np is not None:
+        previous_array = _np.frombuffer(previous, dtype=_np.uint8, count=common)
+        current_array = _np.frombuffer(current, dtype=_np.uint8, count=common)
+
+        def _count_numpy(start: int, end: int) -> int:
+            return int(
+                _np.count_nonzero(previous_array[start:end] != current_array[start:end])
+            )
+
+        return _count_numpy
+
+    previous_view = memoryview(previous).cast("B")
+    current_view = memoryview(current).cast("B")
+
+    def _count_words(start: int, end: int) -> int:
+        # XOR the chunks as big integers (machine-word operations in C); zero
+        # bytes of the result are the positions that match.
+        left = int.from_bytes(previous_view[start:end], "little")
+        right = int.from_bytes(current_view[start:end], "little")
+        length = end - start
+        return length - (left ^ right).to_bytes(length, "little").count(0)
+
+    return _count_words
+
+
+def _sha_digest(payload: _BytesLike) -> str:
     return sha256(payload).hexdigest()
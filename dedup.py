@@ -1,8 +1,26 @@
 from __future__ import annotations
 
+import importlib
+import importlib.util
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict, Iterable, Optional, Sequence, Tuple
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+_np: Any = (
+    importlib.import_module("numpy")
+    if importlib.util.find_spec("numpy") is not None
+    else None
+)
 
 
 @dataclass(frozen=True)
@@ -71,13 +89,33 @@ def _resolution_relative_diff(
     return max(width_diff, height_diff)
 
 
+_FUSION_MODES = ("AND", "OR", "WEIGHTED")
+# Below this window the per-frame compare() loop is cheaper than the fixed
+# overhead of one vectorized pass.
+_RING_MIN_HISTORY = 16
+
+
 class Deduplicator:
+    """Flag frames that duplicate any of the last ``history_size`` frames.
+
+    For windows of at least ``_RING_MIN_HISTORY`` frames and with NumPy, the
+    window is kept as a :class:`_HistoryRing` and each frame is compared
+    against all of it in one vectorized pass, so the cost barely grows with
+    ``history_size``. Smaller windows are kept in a deque and compared frame
+    by frame with :meth:`compare`.
+    """
+
     def __init__(self, config: DedupConfig) -> None:
         self._config = config
         self._history: Deque[FrameFeatures] = deque(maxlen=config.history_size)
+        self._ring: Optional[_HistoryRing] = None
+        if _np is not None and config.history_size >= _RING_MIN_HISTORY:
+            self._ring = _HistoryRing(config.history_size)
 
     @property
     def history(self) -> Iterable[FrameFeatures]:
+        if self._ring is not None:
+            return self._ring.frames()
         return tuple(self._history)
 
     def compare(
@@ -160,9 +198,12 @@ class Deduplicator:
         )
 
     def is_duplicate(self, current: FrameFeatures) -> bool:
-        if not self._history:
-            return False
         mode = self._config.fusion_mode.upper()
+        if self._ring is not None:
+            if not self._ring.size or mode not in _FUSION_MODES:
+                return False
+            pairs = _duplicate_pairs(self._ring.diffs(current), (self._config,), mode)
+            return bool(pairs.any())
         for previous in self._history:
             result = self.compare(current, previous)
             if mode == "WEIGHTED":
@@ -188,5 +229,511 @@ class Deduplicator:
 
     def add(self, current: FrameFeatures) -> bool:
         duplicate = self.is_duplicate(current)
-        self._history.append(current)
+        if self._ring is not None:
+            self._ring.append(current)
+        else:
+            self._history.append(current)
         return duplicate
+
+    def replay(self, features: Iterable[FrameFeatures]) -> List[bool]:
+        """Run ``add`` over ``features`` and return the keep flag of each."""
+
+        return [not self.add(current) for current in features]
+
+
+def features_from_cache(
+    cached: Any, brightness: str = "luma"
+) -> Iterator[FrameFeatures]:
+    """Build per-frame features from a ``cc.feature_cache.CachedFeatures``.
+
+    Each frame takes the audio features of the last audio packet starting at
+    or before it.
+    """
+
+    brightness_values = cached.brightness_column(brightness).tolist()
+    audio_index = cached.audio_index_for_frames().tolist()
+    energies = cached.audio_energy.tolist()
+    spectra = cached.audio_bands.tolist()
+    resolution = (cached.width, cached.height)
+    for value, index in zip(brightness_values, audio_index):
+        has_audio = index >= 0
+        yield FrameFeatures(
+            brightness=value,
+            audio_energy=energies[index] if has_audio else None,
+            audio_spectrum=tuple(spectra[index]) if has_audio else None,
+            resolution=resolution,
+        )
+
+
+@dataclass(frozen=True)
+class FeatureColumns:
+    """Per-frame features as NumPy columns for :func:`sweep_configs`.
+
+    Missing values are NaN in ``brightness``/``audio_energy``, ``-1`` in
+    ``spectrum_lengths`` and ``(0, 0)`` with ``resolution_valid`` unset.
+    """
+
+    brightness: Any
+    audio_energy: Any
+    spectra: Any
+    spectrum_lengths: Any
+    resolution: Any
+    resolution_valid: Any
+
+    def __len__(self) -> int:
+        return len(self.brightness)
+
+    @classmethod
+    def from_features(cls, features: Sequence[FrameFeatures]) -> "FeatureColumns":
+        _require_numpy()
+        count = len(features)
+        width = max(
+            (len(f.audio_spectrum) for f in features if f.audio_spectrum is not None),
+            default=0,
+        )
+        spectra = _np.zeros((count, width))
+        lengths = _np.full(count, -1, dtype=_np.int64)
+        for index, current in enumerate(features):
+            if current.audio_spectrum is not None:
+                lengths[index] = len(current.audio_spectrum)
+                spectra[index, : lengths[index]] = current.audio_spectrum
+        return cls(
+            brightness=_optional_column([f.brightness for f in features]),
+            audio_energy=_optional_column([f.audio_energy for f in features]),
+            spectra=spectra,
+            spectrum_lengths=lengths,
+            resolution=_np.array(
+                [f.resolution or (0, 0) for f in features], dtype=_np.float64
+            ).reshape(count, 2),
+            resolution_valid=_np.array(
+                [f.resolution is not None for f in features], dtype=bool
+            ),
+        )
+
+    @classmethod
+    def from_cache(cls, cached: Any, brightness: str = "luma") -> "FeatureColumns":
+        """Columns of a ``cc.feature_cache.CachedFeatures``, as in
+        :func:`features_from_cache`."""
+
+        _require_numpy()
+        count = cached.frame_count
+        audio_index = cached.audio_index_for_frames()
+        has_audio = audio_index >= 0
+        safe_index = _np.where(has_audio, audio_index, 0)
+        bands = len(cached.band_names)
+        if len(cached.audio_pts):
+            energy = _np.where(has_audio, cached.audio_energy[safe_index], _np.nan)
+            spectra = _np.asarray(cached.audio_bands)[safe_index]
+        else:
+            energy = _np.full(count, _np.nan)
+            spectra = _np.zeros((count, bands))
+        return cls(
+            brightness=_np.asarray(cached.brightness_column(brightness), dtype=float),
+            audio_energy=energy,
+            spectra=spectra,
+            spectrum_lengths=_np.where(has_audio, bands, -1),
+            resolution=_np.tile(
+                _np.array([cached.width, cached.height], dtype=float), (count, 1)
+            ),
+            resolution_valid=_np.ones(count, dtype=bool),
+        )
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    configs: Tuple[DedupConfig, ...]
+    keep: Any
+    """Boolean array of shape (configs, frames)."""
+
+    @property
+    def drop_rates(self) -> Any:
+        if self.keep.shape[1] == 0:
+            return _np.zeros(len(self.configs))
+        return 1.0 - self.keep.mean(axis=1)
+
+
+@dataclass(frozen=True)
+class _PairDiffs:
+    """Diffs between every frame and each of its ``lags`` predecessors.
+
+    Arrays have shape (frames, lags); column ``k`` compares frame ``i`` with
+    frame ``i - k - 1``.
+    """
+
+    in_window: Any
+    brightness: Any
+    brightness_valid: Any
+    energy: Any
+    energy_valid: Any
+    spectrum: Any
+    spectrum_valid: Any
+    resolution: Any
+    resolution_valid: Any
+
+
+def sweep_configs(
+    columns: FeatureColumns,
+    configs: Sequence[DedupConfig],
+    *,
+    max_elements: int = 1 << 24,
+) -> SweepResult:
+    """Replay :meth:`Deduplicator.add` over ``columns`` for every config.
+
+    ``add`` keeps every frame in history, so the comparison window of a frame
+    does not depend on earlier decisions: diffs against the previous
+    ``history_size`` frames are computed once and each config only applies
+    its thresholds and weights. Configs are broadcast in chunks of at most
+    ``max_elements`` pair comparisons.
+    """
+
+    _require_numpy()
+    configs = tuple(configs)
+    count = len(columns)
+    keep = _np.ones((len(configs), count), dtype=bool)
+    if not configs or count == 0:
+        return SweepResult(configs=configs, keep=keep)
+    lags = max(config.history_size for config in configs)
+    diffs = _pair_diffs(columns, lags)
+    by_mode: Dict[str, List[int]] = {}
+    for index, config in enumerate(configs):
+        by_mode.setdefault(config.fusion_mode.upper(), []).append(index)
+    chunk = max(1, max_elements // max(1, count * lags))
+    for mode, indices in by_mode.items():
+        if mode not in _FUSION_MODES:
+            continue
+        for start in range(0, len(indices), chunk):
+            selected = indices[start : start + chunk]
+            batch = [configs[index] for index in selected]
+            pairs = _duplicate_pairs(diffs, batch, mode)
+            history = _np.array([config.history_size for config in batch])
+            pairs &= diffs.in_window[None]
+            pairs &= _np.arange(lags)[None, None, :] < history[:, None, None]
+            keep[selected] = ~pairs.any(axis=2)
+    return SweepResult(configs=configs, keep=keep)
+
+
+class _HistoryRing:
+    """Struct-of-arrays ring of the last ``capacity`` frames' features.
+
+    Missing values use the :class:`FeatureColumns` conventions. The spectrum
+    matrix only grows when a longer spectrum arrives. :meth:`diffs` writes
+    into buffers allocated with the ring, so its result is only valid until
+    the next call.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.size = 0
+        self._next = 0
+        self._frames: List[Optional[FrameFeatures]] = [None] * capacity
+        self.brightness = _np.full(capacity, _np.nan)
+        self.energy = _np.full(capacity, _np.nan)
+        self.spectra = _np.zeros((capacity, 0))
+        self.lengths = _np.full(capacity, -1, dtype=_np.int64)
+        self.resolution = _np.zeros((capacity, 2))
+        self.resolution_valid = _np.zeros(capacity, dtype=bool)
+        # Outputs and scratch space of diffs().
+        self._in_window = _np.ones((1, capacity), dtype=bool)
+        self._out = {
+            name: _np.zeros((1, capacity))
+            for name in ("brightness", "energy", "spectrum", "resolution")
+        }
+        self._out_valid = {
+            name: _np.zeros((1, capacity), dtype=bool)
+            for name in ("brightness", "energy", "spectrum", "resolution")
+        }
+        self._shared = _np.zeros(capacity, dtype=_np.int64)
+        self._spectrum_scratch = _np.zeros((capacity, 0))
+        self._spectrum_mask = _np.zeros((capacity, 0), dtype=bool)
+        self._positions = _np.arange(0)
+        self._resolution_scratch = _np.zeros((capacity, 2))
+        self._resolution_larger = _np.zeros((capacity, 2))
+        self._resolution_positive = _np.zeros((capacity, 2), dtype=bool)
+
+    def frames(self) -> Tuple[FrameFeatures, ...]:
+        """The stored frames, oldest first."""
+
+        if self.size < self.capacity:
+            stored = self._frames[: self.size]
+        else:
+            stored = self._frames[self._next :] + self._frames[: self._next]
+        return tuple(frame for frame in stored if frame is not None)
+
+    def append(self, current: FrameFeatures) -> None:
+        if self.capacity <= 0:
+            return
+        slot = self._next
+        self._frames[slot] = current
+        self.brightness[slot] = _nan_if_none(current.brightness)
+        self.energy[slot] = _nan_if_none(current.audio_energy)
+        spectrum = current.audio_spectrum
+        if spectrum is None:
+            self.lengths[slot] = -1
+        else:
+            if len(spectrum) > self.spectra.shape[1]:
+                self._grow_spectra(len(spectrum))
+            self.lengths[slot] = len(spectrum)
+            self.spectra[slot, : len(spectrum)] = spectrum
+        self.resolution_valid[slot] = current.resolution is not None
+        self.resolution[slot] = current.resolution or (0, 0)
+        self._next = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def diffs(self, current: FrameFeatures) -> _PairDiffs:
+        """Diffs of ``current`` against every stored frame, shaped (1, size)."""
+
+        count = self.size
+        out = {name: values[:, :count] for name, values in self._out.items()}
+        valid = {name: values[:, :count] for name, values in self._out_valid.items()}
+        with _np.errstate(invalid="ignore", divide="ignore"):
+            _scalar_diffs(
+                current.brightness,
+                self.brightness[:count],
+                valid["brightness"][0],
+                out["brightness"][0],
+            )
+            _scalar_diffs(
+                current.audio_energy,
+                self.energy[:count],
+                valid["energy"][0],
+                out["energy"][0],
+            )
+            self._spectrum_diffs(
+                current.audio_spectrum, valid["spectrum"][0], out["spectrum"][0]
+            )
+            self._resolution_diffs(
+                current.resolution, valid["resolution"][0], out["resolution"][0]
+            )
+        return _PairDiffs(
+            in_window=self._in_window[:, :count],
+            brightness=out["brightness"],
+            brightness_valid=valid["brightness"],
+            energy=out["energy"],
+            energy_valid=valid["energy"],
+            spectrum=out["spectrum"],
+            spectrum_valid=valid["spectrum"],
+            resolution=out["resolution"],
+            resolution_valid=valid["resolution"],
+        )
+
+    def _grow_spectra(self, length: int) -> None:
+        grown = _np.zeros((self.capacity, length))
+        grown[:, : self.spectra.shape[1]] = self.spectra
+        self.spectra = grown
+        self._spectrum_scratch = _np.zeros((self.capacity, length))
+        self._spectrum_mask = _np.zeros((self.capacity, length), dtype=bool)
+        self._positions = _np.arange(length)
+
+    def _spectrum_diffs(
+        self, spectrum: Optional[Sequence[float]], valid: Any, out: Any
+    ) -> None:
+        count = self.size
+        lengths = self.lengths[:count]
+        if spectrum is None:
+            valid.fill(False)
+            out.fill(0.0)
+            return
+        width = min(len(spectrum), self.spectra.shape[1])
+        shared = _np.minimum(lengths, len(spectrum), out=self._shared[:count])
+        mask = _np.less(
+            self._positions[None, :width],
+            shared[:, None],
+            out=self._spectrum_mask[:count, :width],
+        )
+        values = _np.asarray(spectrum[:width], dtype=_np.float64)
+        totals = _np.subtract(
+            self.spectra[:count, :width],
+            values,
+            out=self._spectrum_scratch[:count, :width],
+        )
+        _np.abs(totals, out=totals)
+        _np.multiply(totals, mask, out=totals)
+        totals.sum(axis=1, out=out)
+        # Rows sharing no values total zero, so dividing by one leaves zero.
+        _np.maximum(shared, 1, out=shared)
+        _np.divide(out, shared, out=out)
+        _np.greater_equal(lengths, 0, out=valid)
+
+    def _resolution_diffs(
+        self, resolution: Optional[Tuple[int, int]], valid: Any, out: Any
+    ) -> None:
+        count = self.size
+        if resolution is None:
+            valid.fill(False)
+            out.fill(0.0)
+            return
+        current = _np.asarray(resolution, dtype=_np.float64)
+        previous = self.resolution[:count]
+        relative = _np.subtract(
+            previous, current, out=self._resolution_scratch[:count]
+        )
+        _np.abs(relative, out=relative)
+        larger = _np.maximum(previous, current, out=self._resolution_larger[:count])
+        _np.divide(relative, larger, out=relative)
+        relative.max(axis=1, out=out)
+        positive = _np.greater(
+            previous, 0, out=self._resolution_positive[:count]
+        )
+        if (current > 0).all():
+            # valid marks the rows with a dimension that is not positive.
+            _np.logical_not(positive.all(axis=1, out=valid), out=valid)
+            _np.copyto(out, _np.inf, where=valid)
+        else:
+            out.fill(_np.inf)
+        valid[:] = self.resolution_valid[:count]
+
+
+def _scalar_diffs(value: Optional[float], stored: Any, valid: Any, out: Any) -> None:
+    if value is None:
+        valid.fill(False)
+        out.fill(0.0)
+        return
+    _np.isnan(stored, out=valid)
+    _np.logical_not(valid, out=valid)
+    _np.subtract(stored, value, out=out)
+    _np.abs(out, out=out)
+
+
+def _nan_if_none(value: Optional[float]) -> float:
+    return _np.nan if value is None else value
+
+
+def _pair_diffs(columns: FeatureColumns, lags: int) -> _PairDiffs:
+    count = len(columns)
+    shape = (count, lags)
+    in_window = _np.zeros(shape, dtype=bool)
+    brightness = _np.full(shape, _np.inf)
+    energy = _np.full(shape, _np.inf)
+    spectrum = _np.full(shape, _np.inf)
+    resolution = _np.full(shape, _np.inf)
+    brightness_valid = _np.zeros(shape, dtype=bool)
+    energy_valid = _np.zeros(shape, dtype=bool)
+    spectrum_valid = _np.zeros(shape, dtype=bool)
+    resolution_valid = _np.zeros(shape, dtype=bool)
+    lengths = columns.spectrum_lengths
+    positions = _np.arange(columns.spectra.shape[1])
+    with _np.errstate(invalid="ignore", divide="ignore"):
+        for lag in range(1, min(lags, count - 1) + 1):
+            k = lag - 1
+            in_window[lag:, k] = True
+
+            current, previous = columns.brightness[lag:], columns.brightness[:-lag]
+            valid = ~(_np.isnan(current) | _np.isnan(previous))
+            brightness_valid[lag:, k] = valid
+            brightness[lag:, k] = _np.abs(current - previous)
+
+            current, previous = columns.audio_energy[lag:], columns.audio_energy[:-lag]
+            energy_valid[lag:, k] = ~(_np.isnan(current) | _np.isnan(previous))
+            energy[lag:, k] = _np.abs(current - previous)
+
+            shared = _np.minimum(lengths[lag:], lengths[:-lag])
+            spectrum_valid[lag:, k] = (lengths[lag:] >= 0) & (lengths[:-lag] >= 0)
+            mask = positions[None, :] < shared[:, None]
+            totals = (
+                _np.abs(columns.spectra[lag:] - columns.spectra[:-lag]) * mask
+            ).sum(axis=1)
+            spectrum[lag:, k] = _np.where(shared > 0, totals / shared, 0.0)
+
+            current, previous = columns.resolution[lag:], columns.resolution[:-lag]
+            relative = _np.abs(current - previous) / _np.maximum(current, previous)
+            dims_ok = (current > 0).all(axis=1) & (previous > 0).all(axis=1)
+            resolution_valid[lag:, k] = (
+                columns.resolution_valid[lag:] & columns.resolution_valid[:-lag]
+            )
+            resolution[lag:, k] = _np.where(dims_ok, relative.max(axis=1), _np.inf)
+    return _PairDiffs(
+        in_window=in_window,
+        brightness=brightness,
+        brightness_valid=brightness_valid,
+        energy=energy,
+        energy_valid=energy_valid,
+        spectrum=spectrum,
+        spectrum_valid=spectrum_valid,
+        resolution=resolution,
+        resolution_valid=resolution_valid,
+    )
+
+
+def _duplicate_pairs(
+    diffs: _PairDiffs, configs: Sequence[DedupConfig], mode: str
+) -> Any:
+    def thresholds(name: str) -> Any:
+        values = [getattr(config, name) for config in configs]
+        return _np.array(values, dtype=float)[:, None, None]
+
+    brightness_t = thresholds("brightness_threshold")
+    energy_t = thresholds("audio_energy_threshold")
+    spectrum_t = thresholds("audio_spectrum_threshold")
+    resolution_t = thresholds("resolution_threshold")
+    audio_valid = diffs.energy_valid | diffs.spectrum_valid
+
+    if mode == "WEIGHTED":
+
+        def weights(name: str) -> Any:
+            values = [config.weights.get(name, 1.0) for config in configs]
+            return _np.array(values, dtype=float)[:, None, None]
+
+        with _np.errstate(invalid="ignore", divide="ignore"):
+            audio_normalized = _np.minimum(
+                _np.where(
+                    diffs.energy_valid,
+                    _normalized_diffs(diffs.energy, energy_t),
+                    _np.inf,
+                ),
+                _np.where(
+                    diffs.spectrum_valid,
+                    _normalized_diffs(diffs.spectrum, spectrum_t),
+                    _np.inf,
+                ),
+            )
+            score = _np.zeros(audio_normalized.shape)
+            total = _np.zeros(audio_normalized.shape)
+            for valid, normalized, weight in (
+                (
+                    diffs.brightness_valid,
+                    _normalized_diffs(diffs.brightness, brightness_t),
+                    weights("brightness"),
+                ),
+                (audio_valid, audio_normalized, weights("audio")),
+                (
+                    diffs.resolution_valid,
+                    _normalized_diffs(diffs.resolution, resolution_t),
+                    weights("resolution"),
+                ),
+            ):
+                score += _np.where(valid, normalized * weight, 0.0)
+                total += _np.where(valid, weight, 0.0)
+            score = _np.where(total != 0, score / total, score)
+        weighted_t = thresholds("weighted_threshold")
+        return score < weighted_t
+
+    brightness_ok = diffs.brightness_valid & (diffs.brightness < brightness_t)
+    audio_ok = (diffs.energy_valid & (diffs.energy < energy_t)) | (
+        diffs.spectrum_valid & (diffs.spectrum < spectrum_t)
+    )
+    resolution_ok = diffs.resolution_valid & (diffs.resolution < resolution_t)
+    if mode == "OR":
+        return brightness_ok | audio_ok | resolution_ok
+    available = diffs.brightness_valid | audio_valid | diffs.resolution_valid
+    return (
+        available
+        & (brightness_ok | ~diffs.brightness_valid)
+        & (audio_ok | ~audio_valid)
+        & (resolution_ok | ~diffs.resolution_valid)
+    )
+
+
+def _normalized_diffs(diff: Any, threshold: Any) -> Any:
+    zero_threshold = _np.where(diff == 0, 0.0, _np.inf)
+    return _np.where(threshold <= 0, zero_threshold, diff / threshold)
+
+
+def _optional_column(values: Sequence[Optional[float]]) -> Any:
+    return _np.array(
+        [_np.nan if value is None else value for value in values], dtype=_np.float64
+    )
+
+
+def _require_numpy() -> None:
+    if _np is None:
+        raise RuntimeError("NumPy is required for threshold sweeps.")
@@ -9,11 +9,15 @@ from .dedup import (
     TimeWindowStrategy,
     WeightedCompositeStrategy,
 )
-from .pipeline import Pipeline
-from .stages import PipelineStage
+from .fingerprint import ContentFingerprinter, prefetch_fingerprints
+from .pipeline import AsyncPipeline, Pipeline
+from .stages import AsyncPipelineStage, PipelineStage
 
 __all__ = [
+    "AsyncPipeline",
+    "AsyncPipelineStage",
     "AudioPacket",
+    "ContentFingerprinter",
     "DedupHistory",
     "DedupStrategy",
     "ExactHashStrategy",
@@ -26,4 +30,5 @@ __all__ = [
     "TimeWindowStrategy",
     "WeightedCompositeStrategy",
     "load_config",
+    "prefetch_fingerprints",
 ]
@@ -6,7 +6,12 @@ from typing import Any, Dict, List, Optional
 
 import yaml
 
-from .dedup import ExactHashStrategy, TimeWindowStrategy, WeightedCompositeStrategy
+from .dedup import (
+    DedupHistory,
+    ExactHashStrategy,
+    TimeWindowStrategy,
+    WeightedCompositeStrategy,
+)
 
 
 @dataclass(frozen=True)
@@ -21,6 +26,8 @@ class StrategyConfig:
 class PipelineConfig:
     threshold: float
     strategies: List[StrategyConfig]
+    history_max_size: Optional[int] = None
+    history_max_age: Optional[float] = None
 
 
 _STRATEGY_REGISTRY = {
@@ -43,7 +50,22 @@ def load_config(path: str | Path) -> PipelineConfig:
                 params=entry.get("params", {}),
             )
         )
-    return PipelineConfig(threshold=threshold, strategies=strategies)
+    history_config = dedup_config.get("history", {}) or {}
+    max_size = history_config.get("max_size")
+    max_age = history_config.get("max_age_seconds")
+    return PipelineConfig(
+        threshold=threshold,
+        strategies=strategies,
+        history_max_size=int(max_size) if max_size is not None else None,
+        history_max_age=float(max_age) if max_age is not None else None,
+    )
+
+
+def build_dedup_history(config: PipelineConfig) -> DedupHistory:
+    return DedupHistory(
+        max_size=config.history_max_size,
+        max_age=config.history_max_age,
+    )
 
 
 def build_dedup_strategy(config: PipelineConfig) -> WeightedCompositeStrategy:
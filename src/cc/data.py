@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 
+from .fingerprint import ContentFingerprinter
+
 
 @dataclass(frozen=True)
 class Metadata:
@@ -18,9 +20,19 @@ class FramePacket:
     data: bytes
     metadata: Optional[Metadata] = None
     features: Dict[str, Any] = field(default_factory=dict)
+    fingerprinter: Optional[ContentFingerprinter] = field(default=None, compare=False)
+    _fingerprint: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def fingerprint(self) -> str:
-        return self.frame_id
+        """Return ``frame_id``, or a cached content hash with a fingerprinter."""
+
+        if self.fingerprinter is None:
+            return self.frame_id
+        if self._fingerprint is None:
+            object.__setattr__(self, "_fingerprint", self.fingerprinter(self.data))
+        return self._fingerprint
 
 
 @dataclass(frozen=True)
@@ -30,6 +42,16 @@ class AudioPacket:
     data: bytes
     metadata: Optional[Metadata] = None
     features: Dict[str, Any] = field(default_factory=dict)
+    fingerprinter: Optional[ContentFingerprinter] = field(default=None, compare=False)
+    _fingerprint: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def fingerprint(self) -> str:
-        return self.audio_id
+        """Return ``audio_id``, or a cached content hash with a fingerprinter."""
+
+        if self.fingerprinter is None:
+            return self.audio_id
+        if self._fingerprint is None:
+            object.__setattr__(self, "_fingerprint", self.fingerprinter(self.data))
+        return self._fingerprint
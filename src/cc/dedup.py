@@ -1,8 +1,18 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Iterable, List, Protocol, Sequence
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+)
 
 
 class PacketWithFingerprint(Protocol):
@@ -11,7 +21,76 @@ class PacketWithFingerprint(Protocol):
     def fingerprint(self) -> str: ...
 
 
-DedupHistory = List[PacketWithFingerprint]
+class _HistoryEntry(NamedTuple):
+    timestamp: float
+    fingerprint: str
+    packet: PacketWithFingerprint
+
+
+class DedupHistory:
+    """Kept packets indexed by fingerprint, in arrival order.
+
+    Lookups go through a fingerprint -> latest entry dict; a deque in arrival
+    (time) order drives eviction. ``max_size`` caps the number of entries and
+    ``max_age`` drops entries older than the newest timestamp minus
+    ``max_age`` seconds. Both default to unbounded.
+    """
+
+    def __init__(
+        self,
+        packets: Iterable[PacketWithFingerprint] = (),
+        *,
+        max_size: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ) -> None:
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        if max_age is not None and max_age < 0:
+            raise ValueError("max_age must not be negative.")
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries: Deque[_HistoryEntry] = deque()
+        self._latest: Dict[str, _HistoryEntry] = {}
+        for packet in packets:
+            self.append(packet)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[PacketWithFingerprint]:
+        return (entry.packet for entry in self._entries)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return fingerprint in self._latest
+
+    def append(self, packet: PacketWithFingerprint) -> None:
+        entry = _HistoryEntry(packet.timestamp, packet.fingerprint(), packet)
+        self._entries.append(entry)
+        self._latest[entry.fingerprint] = entry
+        self._evict(entry.timestamp)
+
+    def latest_timestamp(self, fingerprint: str) -> Optional[float]:
+        entry = self._latest.get(fingerprint)
+        return None if entry is None else entry.timestamp
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._latest.clear()
+
+    def _evict(self, now: float) -> None:
+        entries = self._entries
+        if self.max_size is not None:
+            while len(entries) > self.max_size:
+                self._discard(entries.popleft())
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+            while entries and entries[0].timestamp < cutoff:
+                self._discard(entries.popleft())
+
+    def _discard(self, entry: _HistoryEntry) -> None:
+        # Only forget the fingerprint if no newer entry replaced it.
+        if self._latest.get(entry.fingerprint) is entry:
+            del self._latest[entry.fingerprint]
 
 
 class DedupStrategy(ABC):
@@ -31,6 +110,8 @@ class ExactHashStrategy(DedupStrategy):
 
     def should_drop(self, packet: PacketWithFingerprint, history: DedupHistory) -> bool:
         fingerprint = packet.fingerprint()
+        if isinstance(history, DedupHistory):
+            return fingerprint in history
         return any(previous.fingerprint() == fingerprint for previous in history)
 
 
@@ -43,6 +124,9 @@ class TimeWindowStrategy(DedupStrategy):
     def should_drop(self, packet: PacketWithFingerprint, history: DedupHistory) -> bool:
         fingerprint = packet.fingerprint()
         cutoff = packet.timestamp - self.window_seconds
+        if isinstance(history, DedupHistory):
+            latest = history.latest_timestamp(fingerprint)
+            return latest is not None and latest >= cutoff
         return any(
             previous.fingerprint() == fingerprint and previous.timestamp >= cutoff
             for previous in history
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+SKIP = object()
+"""Returned by a step to drop the item instead of passing it downstream."""
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class Step:
+    """One stage of a :func:`run_threaded` chain.
+
+    ``workers > 1`` runs ``func`` on a thread pool; it must then be safe to
+    call concurrently. Results are still delivered in input order.
+    """
+
+    func: Callable[[Any], Any]
+    workers: int = 1
+    name: str = "step"
+
+    def __post_init__(self) -> None:
+        if self.workers <= 0:
+            raise ValueError("workers must be positive.")
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def run_threaded(
+    items: Iterable[Any],
+    steps: Sequence[Step],
+    *,
+    queue_size: int = 8,
+) -> Iterator[Any]:
+    """Pass ``items`` through ``steps`` with every step on its own thread.
+
+    Steps are connected by queues holding at most ``queue_size`` items, so a
+    slow step blocks the ones before it and memory stays bounded on endless
+    inputs. The first exception raised by the source or a step is re-raised
+    here; closing the generator early stops the worker threads.
+    """
+
+    if queue_size <= 0:
+        raise ValueError("queue_size must be positive.")
+    stop = threading.Event()
+    queues: List[queue.Queue[Any]] = [
+        queue.Queue(maxsize=queue_size) for _ in range(len(steps) + 1)
+    ]
+    pools: List[ThreadPoolExecutor] = []
+    threads = [
+        threading.Thread(
+            target=_feed, args=(items, queues[0], stop), name="cc-source", daemon=True
+        )
+    ]
+    for index, step in enumerate(steps):
+        pool = None
+        if step.workers > 1:
+            pool = ThreadPoolExecutor(
+                max_workers=step.workers, thread_name_prefix=f"cc-{step.name}"
+            )
+            pools.append(pool)
+        threads.append(
+            threading.Thread(
+                target=_work,
+                args=(step.func, pool, queues[index], queues[index + 1], stop),
+                name=f"cc-{step.name}",
+                daemon=True,
+            )
+        )
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = _resolve(_get(queues[-1], stop))
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            if item is not SKIP:
+                yield item
+    finally:
+        stop.set()
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _feed(
+    items: Iterable[Any], output: queue.Queue[Any], stop: threading.Event
+) -> None:
+    try:
+        for item in items:
+            if not _put(output, item, stop):
+                return
+    except BaseException as error:
+        _put(output, _Failure(error), stop)
+        return
+    _put(output, _END, stop)
+
+
+def _work(
+    func: Callable[[Any], Any],
+    pool: ThreadPoolExecutor | None,
+    source: queue.Queue[Any],
+    output: queue.Queue[Any],
+    stop: threading.Event,
+) -> None:
+    while True:
+        item = _resolve(_get(source, stop))
+        if item is _END or isinstance(item, _Failure):
+            _put(output, item, stop)
+            return
+        if item is SKIP:
+            continue
+        if pool is not None:
+            result: Any = pool.submit(func, item)
+        else:
+            try:
+                result = func(item)
+            except BaseException as error:
+                result = _Failure(error)
+        if not _put(output, result, stop):
+            return
+        if isinstance(result, _Failure):
+            return
+
+
+def _resolve(item: Any) -> Any:
+    if not isinstance(item, Future):
+        return item
+    try:
+        return item.result()
+    except BaseException as error:
+        return _Failure(error)
+
+
+def _get(source: queue.Queue[Any], stop: threading.Event) -> Any:
+    while True:
+        try:
+            return source.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            if stop.is_set():
+                return _END
+
+
+def _put(output: queue.Queue[Any], item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+__all__ = ["SKIP", "Step", "run_threaded"]
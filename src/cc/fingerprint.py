@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import importlib.util
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterable, Iterator, Protocol, TypeVar
+
+_xxhash: Any = (
+    importlib.import_module("xxhash")
+    if importlib.util.find_spec("xxhash") is not None
+    else None
+)
+
+_BytesLike = bytes | bytearray | memoryview
+
+
+class _Digest(Protocol):
+    def update(self, data: _BytesLike) -> None: ...
+
+    def hexdigest(self) -> str: ...
+
+
+def _blake2b() -> _Digest:
+    return hashlib.blake2b(digest_size=16)
+
+
+def _xxh3() -> _Digest:
+    if _xxhash is None:
+        raise RuntimeError("xxhash is required for the 'xxhash' hasher.")
+    return _xxhash.xxh3_128()
+
+
+_HASHERS: dict[str, Callable[[], _Digest]] = {
+    "blake2b": _blake2b,
+    "xxhash": _xxh3,
+}
+
+
+def available_hashers() -> list[str]:
+    names = ["blake2b"]
+    if _xxhash is not None:
+        names.append("xxhash")
+    return names
+
+
+@dataclass(frozen=True)
+class ContentFingerprinter:
+    """Fingerprint packet payloads by content.
+
+    ``hasher`` is ``"xxhash"``, ``"blake2b"`` or ``"auto"`` (xxhash when it is
+    installed). Payloads larger than ``sample_above`` bytes are fingerprinted
+    from ``sample_blocks`` evenly spaced blocks of ``block_size`` bytes plus
+    their length; this bounds the cost for very large frames but only sees
+    changes that touch a sampled block.
+    """
+
+    hasher: str = "auto"
+    sample_above: int | None = None
+    sample_blocks: int = 64
+    block_size: int = 4096
+
+    def __post_init__(self) -> None:
+        if self.hasher != "auto" and self.hasher not in _HASHERS:
+            raise ValueError(f"Unknown hasher '{self.hasher}'.")
+        if self.sample_blocks <= 0 or self.block_size <= 0:
+            raise ValueError("sample_blocks and block_size must be positive.")
+
+    def __call__(self, data: _BytesLike) -> str:
+        digest = self._new_digest()
+        view = memoryview(data).cast("B")
+        sample_above = max(self.sample_above or 0, self.sample_blocks * self.block_size)
+        if self.sample_above is None or len(view) <= sample_above:
+            digest.update(view)
+            return digest.hexdigest()
+        digest.update(len(view).to_bytes(8, "little"))
+        last_start = len(view) - self.block_size
+        for index in range(self.sample_blocks):
+            start = last_start * index // max(1, self.sample_blocks - 1)
+            digest.update(view[start : start + self.block_size])
+        return digest.hexdigest()
+
+    def _new_digest(self) -> _Digest:
+        if self.hasher == "auto":
+            return _xxh3() if _xxhash is not None else _blake2b()
+        return _HASHERS[self.hasher]()
+
+
+class _Fingerprinted(Protocol):
+    def fingerprint(self) -> str: ...
+
+
+PacketT = TypeVar("PacketT", bound=_Fingerprinted)
+
+
+def prefetch_fingerprints(
+    packets: Iterable[PacketT],
+    *,
+    executor: Executor | None = None,
+    max_workers: int = 4,
+    lookahead: int = 16,
+) -> Iterator[PacketT]:
+    """Compute fingerprints on a thread pool ahead of the dedup stage.
+
+    Packets are yielded in their original order with ``fingerprint()`` already
+    cached; at most ``lookahead`` packets are in flight. hashlib and xxhash
+    release the GIL on large buffers, so hashing overlaps across threads.
+    """
+
+    if lookahead <= 0:
+        raise ValueError("lookahead must be positive.")
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(max_workers=max_workers)
+    pending: Deque[tuple[PacketT, Future[str]]] = deque()
+    try:
+        for packet in packets:
+            pending.append((packet, pool.submit(packet.fingerprint)))
+            if len(pending) >= lookahead:
+                ready, future = pending.popleft()
+                future.result()
+                yield ready
+        while pending:
+            ready, future = pending.popleft()
+            future.result()
+            yield ready
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            pool.shutdown(wait=True)
@@ -1,35 +1,132 @@
 from __future__ import annotations
 
+import inspect
 from dataclasses import dataclass, field
-from typing import Any, Iterable, List, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
 
 from .dedup import DedupHistory, DedupStrategy
+from .executor import SKIP, Step, run_threaded
 from .stages import PipelineStage
 
+_Item = tuple[Any, dict[str, Any]]
+
 
 @dataclass
 class Pipeline:
+    """Decode, extract features, de-duplicate and output packets.
+
+    With ``threaded`` every stage runs on its own thread, connected by queues
+    of ``queue_size`` packets; ``feature_workers`` threads share feature
+    extraction, which must then be stateless. Dedup always runs on a single
+    thread in packet order, so results match the serial run.
+    """
+
     decoder: PipelineStage
     feature_extractor: PipelineStage
     dedup_strategy: DedupStrategy
     output: Optional[PipelineStage] = None
-    history: DedupHistory = field(default_factory=list)
+    history: DedupHistory = field(default_factory=DedupHistory)
+    threaded: bool = False
+    queue_size: int = 8
+    feature_workers: int = 1
 
     def process(self, packet: Any) -> Optional[Any]:
+        item: Any = (packet, {})
+        for step in (self._decode, self._extract, self._dedup, self._output):
+            item = step(item)
+            if item is SKIP:
+                return None
+        return item
+
+    def run(self, packets: Iterable[Any]) -> Iterator[Any]:
+        """Yield the output of every packet that is not dropped."""
+
+        if not self.threaded:
+            for packet in packets:
+                output = self.process(packet)
+                if output is not None:
+                    yield output
+            return
+        steps = [
+            Step(self._decode, name="decode"),
+            Step(self._extract, workers=self.feature_workers, name="features"),
+            Step(self._dedup, name="dedup"),
+            Step(self._output, name="output"),
+        ]
+        items = ((packet, {}) for packet in packets)
+        for output in run_threaded(items, steps, queue_size=self.queue_size):
+            if output is not None:
+                yield output
+
+    def _decode(self, item: _Item) -> _Item:
+        packet, context = item
+        return self.decoder.process(packet, context), context
+
+    def _extract(self, item: _Item) -> _Item:
+        decoded, context = item
+        return self.feature_extractor.process(decoded, context), context
+
+    def _dedup(self, item: _Item) -> Any:
+        features, context = item
+        if self.dedup_strategy.should_drop(features, self.history):
+            return SKIP
+        self.history.append(features)
+        return item
+
+    def _output(self, item: _Item) -> Any:
+        features, context = item
+        if self.output is not None:
+            return self.output.process(features, context)
+        return features
+
+
+@dataclass
+class AsyncPipeline:
+    """Async counterpart of :class:`Pipeline` for use inside an event loop.
+
+    Stage ``process`` methods may be plain functions or coroutines. Packets are
+    processed in order; serve many streams by running one AsyncPipeline per
+    stream concurrently on the same loop.
+    """
+
+    decoder: PipelineStage
+    feature_extractor: PipelineStage
+    dedup_strategy: DedupStrategy
+    output: Optional[PipelineStage] = None
+    history: DedupHistory = field(default_factory=DedupHistory)
+
+    async def process(self, packet: Any) -> Optional[Any]:
         context: dict[str, Any] = {}
-        decoded = self.decoder.process(packet, context)
-        features = self.feature_extractor.process(decoded, context)
+        decoded = await _resolve(self.decoder.process(packet, context))
+        features = await _resolve(self.feature_extractor.process(decoded, context))
         if self.dedup_strategy.should_drop(features, self.history):
             return None
         self.history.append(features)
         if self.output is not None:
-            return self.output.process(features, context)
+            return await _resolve(self.output.process(features, context))
         return features
 
-    def run(self, packets: Iterable[Any]) -> List[Any]:
-        results: List[Any] = []
-        for packet in packets:
-            output = self.process(packet)
+    async def run(
+        self, packets: AsyncIterable[Any] | Iterable[Any]
+    ) -> AsyncIterator[Any]:
+        """Yield the output of every packet that is not dropped."""
+
+        async for packet in _aiterate(packets):
+            output = await self.process(packet)
             if output is not None:
-                results.append(output)
-        return results
+                yield output
+
+
+async def _resolve(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _aiterate(packets: AsyncIterable[Any] | Iterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(packets, AsyncIterable):
+        async for packet in packets:
+            yield packet
+    else:
+        for packet in packets:
+            yield packet
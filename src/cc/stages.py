@@ -10,3 +10,11 @@ class PipelineStage(ABC):
     @abstractmethod
     def process(self, packet: Any, context: dict[str, Any]) -> Any:
         """Process the packet and return the transformed packet."""
+
+
+class AsyncPipelineStage(ABC):
+    """Abstract pipeline stage whose processing is a coroutine."""
+
+    @abstractmethod
+    async def process(self, packet: Any, context: dict[str, Any]) -> Any:
+        """Process the packet and return the transformed packet."""
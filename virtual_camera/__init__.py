@@ -4,6 +4,12 @@ from .base import VideoFormat, VirtualCameraSink
 from .factory import create_default_sink, default_sink_cls
 from .linux import LinuxVirtualCameraSink
 from .macos import MacOSVirtualCameraSink
+from .pacing import (
+    AsyncPacedWriter,
+    LatencyHistogram,
+    PacedSinkWriter,
+    PacingStats,
+)
 from .windows import WindowsVirtualCameraSink
 
 __all__ = [
@@ -12,6 +18,10 @@ __all__ = [
     "LinuxVirtualCameraSink",
     "MacOSVirtualCameraSink",
     "WindowsVirtualCameraSink",
+    "AsyncPacedWriter",
+    "LatencyHistogram",
+    "PacedSinkWriter",
+    "PacingStats",
     "create_default_sink",
     "default_sink_cls",
 ]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Protocol
@@ -27,6 +28,15 @@ class VirtualCameraSink(ABC):
     def write(self, frame: bytes) -> None:
         """Write a single frame to the sink."""
 
+    async def write_async(self, frame: bytes) -> None:
+        """Write a frame without blocking the event loop.
+
+        The default runs :meth:`write` in a worker thread; sinks with a native
+        async path may override it.
+        """
+
+        await asyncio.to_thread(self.write, frame)
+
     @abstractmethod
     def close(self) -> None:
         """Close the sink and release any resources."""
@@ -2,23 +2,563 @@
 
 from __future__ import annotations
 
+import ctypes
+import importlib
+import importlib.util
+import mmap
+import os
+from collections import deque
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any, Callable, Deque, Optional
+
 from .base import VirtualCameraSink
 
+_fcntl: Any = (
+    importlib.import_module("fcntl")
+    if importlib.util.find_spec("fcntl") is not None
+    else None
+)
+_np: Any = (
+    importlib.import_module("numpy")
+    if importlib.util.find_spec("numpy") is not None
+    else None
+)
+
+
+# ioctl request encoding from <asm-generic/ioctl.h>, V4L2 structs from
+# <linux/videodev2.h>. ctypes reproduces the kernel's native struct layout.
+_IOC_WRITE = 1
+_IOC_READ = 2
+
+
+def _vidioc(direction: int, number: int, struct: Any) -> int:
+    return (
+        (direction << 30) | (ctypes.sizeof(struct) << 16) | (ord("V") << 8) | number
+    )
+
+
+def _fourcc(code: str) -> int:
+    a, b, c, d = code.encode("ascii")
+    return a | (b << 8) | (c << 16) | (d << 24)
+
+
+class _Capability(ctypes.Structure):
+    _fields_ = [
+        ("driver", ctypes.c_uint8 * 16),
+        ("card", ctypes.c_uint8 * 32),
+        ("bus_info", ctypes.c_uint8 * 32),
+        ("version", ctypes.c_uint32),
+        ("capabilities", ctypes.c_uint32),
+        ("device_caps", ctypes.c_uint32),
+        ("reserved", ctypes.c_uint32 * 3),
+    ]
+
+
+class _PixFormat(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_uint32),
+        ("height", ctypes.c_uint32),
+        ("pixelformat", ctypes.c_uint32),
+        ("field", ctypes.c_uint32),
+        ("bytesperline", ctypes.c_uint32),
+        ("sizeimage", ctypes.c_uint32),
+        ("colorspace", ctypes.c_uint32),
+        ("priv", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("ycbcr_enc", ctypes.c_uint32),
+        ("quantization", ctypes.c_uint32),
+        ("xfer_func", ctypes.c_uint32),
+    ]
+
+
+class _FormatUnion(ctypes.Union):
+    # v4l2_window holds pointers, which sets the union's alignment.
+    _fields_ = [
+        ("pix", _PixFormat),
+        ("raw_data", ctypes.c_uint8 * 200),
+        ("_align", ctypes.c_void_p),
+    ]
+
+
+class _Format(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_uint32), ("fmt", _FormatUnion)]
+
+
+class _Fract(ctypes.Structure):
+    _fields_ = [("numerator", ctypes.c_uint32), ("denominator", ctypes.c_uint32)]
+
+
+class _OutputParm(ctypes.Structure):
+    _fields_ = [
+        ("capability", ctypes.c_uint32),
+        ("outputmode", ctypes.c_uint32),
+        ("timeperframe", _Fract),
+        ("extendedmode", ctypes.c_uint32),
+        ("writebuffers", ctypes.c_uint32),
+        ("reserved", ctypes.c_uint32 * 4),
+    ]
+
+
+class _StreamParmUnion(ctypes.Union):
+    _fields_ = [("output", _OutputParm), ("raw_data", ctypes.c_uint8 * 200)]
+
+
+class _StreamParm(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_uint32), ("parm", _StreamParmUnion)]
+
+
+class _RequestBuffers(ctypes.Structure):
+    _fields_ = [
+        ("count", ctypes.c_uint32),
+        ("type", ctypes.c_uint32),
+        ("memory", ctypes.c_uint32),
+        ("capabilities", ctypes.c_uint32),
+        ("flags", ctypes.c_uint8),
+        ("reserved", ctypes.c_uint8 * 3),
+    ]
+
+
+class _Timeval(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_usec", ctypes.c_long)]
+
+
+class _Timecode(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("frames", ctypes.c_uint8),
+        ("seconds", ctypes.c_uint8),
+        ("minutes", ctypes.c_uint8),
+        ("hours", ctypes.c_uint8),
+        ("userbits", ctypes.c_uint8 * 4),
+    ]
+
+
+class _BufferMemory(ctypes.Union):
+    _fields_ = [
+        ("offset", ctypes.c_uint32),
+        ("userptr", ctypes.c_ulong),
+        ("planes", ctypes.c_void_p),
+        ("fd", ctypes.c_int32),
+    ]
+
+
+class _Buffer(ctypes.Structure):
+    _fields_ = [
+        ("index", ctypes.c_uint32),
+        ("type", ctypes.c_uint32),
+        ("bytesused", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("field", ctypes.c_uint32),
+        ("timestamp", _Timeval),
+        ("timecode", _Timecode),
+        ("sequence", ctypes.c_uint32),
+        ("memory", ctypes.c_uint32),
+        ("m", _BufferMemory),
+        ("length", ctypes.c_uint32),
+        ("reserved2", ctypes.c_uint32),
+        ("request_fd", ctypes.c_int32),
+    ]
+
+
+VIDIOC_QUERYCAP = _vidioc(_IOC_READ, 0, _Capability)
+VIDIOC_S_FMT = _vidioc(_IOC_READ | _IOC_WRITE, 5, _Format)
+VIDIOC_REQBUFS = _vidioc(_IOC_READ | _IOC_WRITE, 8, _RequestBuffers)
+VIDIOC_QUERYBUF = _vidioc(_IOC_READ | _IOC_WRITE, 9, _Buffer)
+VIDIOC_QBUF = _vidioc(_IOC_READ | _IOC_WRITE, 15, _Buffer)
+VIDIOC_DQBUF = _vidioc(_IOC_READ | _IOC_WRITE, 17, _Buffer)
+VIDIOC_STREAMON = _vidioc(_IOC_WRITE, 18, ctypes.c_int)
+VIDIOC_STREAMOFF = _vidioc(_IOC_WRITE, 19, ctypes.c_int)
+VIDIOC_S_PARM = _vidioc(_IOC_READ | _IOC_WRITE, 22, _StreamParm)
+
+_BUF_TYPE_VIDEO_OUTPUT = 2
+_MEMORY_MMAP = 1
+_FIELD_NONE = 1
+_COLORSPACE_SMPTE170M = 1
+_CAP_VIDEO_OUTPUT = 0x00000002
+_CAP_READWRITE = 0x01000000
+_CAP_STREAMING = 0x04000000
+_CAP_DEVICE_CAPS = 0x80000000
+
+PIXEL_FORMATS = {"YUYV": _fourcc("YUYV"), "NV12": _fourcc("NV12")}
+IO_METHODS = ("auto", "mmap", "write")
+
+# BT.601 limited-range coefficients scaled by 256, with rounding and the
+# 16/128 offsets folded into the bias. Negative weights are applied modulo
+# 2**16: every true sum lies in [0, 65535], so wrapping uint16 arithmetic
+# produces exact results without widening.
+_Y_WEIGHTS = ((66, 129, 25), 16 * 256 + 128)
+_U_WEIGHTS = ((-38, -74, 112), 128 * 256 + 128)
+_V_WEIGHTS = ((112, -94, -18), 128 * 256 + 128)
+
+
+@dataclass(frozen=True)
+class _FrameLayout:
+    width: int
+    height: int
+    pixel_format: str
+    bytesperline: int
+    sizeimage: int
+
+    @property
+    def rows(self) -> int:
+        if self.pixel_format == "NV12":
+            return self.height * 3 // 2
+        return self.height
+
+    @property
+    def row_bytes(self) -> int:
+        if self.pixel_format == "NV12":
+            return self.width
+        return self.width * 2
+
+    @property
+    def packed_size(self) -> int:
+        return self.rows * self.row_bytes
+
+    @property
+    def rgb_size(self) -> int:
+        return self.width * self.height * 3
+
+
+class _RGBToYUV:
+    """Convert rgb24 frames into a YUYV or NV12 destination in place."""
+
+    def __init__(self, width: int, height: int, pixel_format: str) -> None:
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        chroma_rows = height // 2 if pixel_format == "NV12" else height
+        chroma_shape = (chroma_rows, width // 2)
+        self._luma = (
+            _np.empty((height, width), dtype=_np.uint16),
+            _np.empty((height, width), dtype=_np.uint16),
+        )
+        self._chroma = (
+            _np.empty(chroma_shape, dtype=_np.uint16),
+            _np.empty(chroma_shape, dtype=_np.uint16),
+        )
+        # rgb24 is split once into contiguous uint16 planes; every later step
+        # then runs on long same-type rows without casting.
+        self._planes = _np.empty((3, height, width), dtype=_np.uint16)
+        self._average = _np.empty((3,) + chroma_shape, dtype=_np.uint16)
+
+    def convert(self, frame: Any, destination: Any) -> None:
+        """Write ``frame`` into ``destination``, a (rows, row_bytes) uint8 view."""
+
+        rgb = _np.frombuffer(frame, dtype=_np.uint8, count=self.width * self.height * 3)
+        planes = self._planes
+        planes[...] = rgb.reshape(self.height, self.width, 3).transpose(2, 0, 1)
+        average = self._average_chroma(planes)
+        if self.pixel_format == "NV12":
+            luma = destination[: self.height]
+            chroma = destination[self.height :]
+            u_plane, v_plane = chroma[:, 0::2], chroma[:, 1::2]
+        else:
+            luma = destination[:, 0::2]
+            u_plane, v_plane = destination[:, 1::4], destination[:, 3::4]
+        _weighted_sum(planes, _Y_WEIGHTS, self._luma, luma)
+        _weighted_sum(average, _U_WEIGHTS, self._chroma, u_plane)
+        _weighted_sum(average, _V_WEIGHTS, self._chroma, v_plane)
+
+    def _average_chroma(self, planes: Any) -> Any:
+        average = self._average
+        if self.pixel_format == "NV12":
+            _np.add(planes[:, 0::2, 0::2], planes[:, 0::2, 1::2], out=average)
+            average += planes[:, 1::2, 0::2]
+            average += planes[:, 1::2, 1::2]
+            average += 2
+            average >>= 2
+        else:
+            _np.add(planes[:, :, 0::2], planes[:, :, 1::2], out=average)
+            average += 1
+            average >>= 1
+        return average
+
+
+def _weighted_sum(
+    channels: Any,
+    weights: tuple[tuple[int, int, int], int],
+    scratch: tuple[Any, Any],
+    destination: Any,
+) -> None:
+    coefficients, bias = weights
+    total, term = scratch
+    for index, (channel, coefficient) in enumerate(zip(channels, coefficients)):
+        target = total if index == 0 else term
+        _np.multiply(channel, _np.uint16(coefficient % 65536), out=target)
+        if index:
+            total += term
+    total += _np.uint16(bias)
+    total >>= 8
+    destination[...] = total
+
+
+class _MappedBuffer:
+    __slots__ = ("index", "mapping", "array")
+
+    def __init__(self, index: int, mapping: mmap.mmap) -> None:
+        self.index = index
+        self.mapping = mapping
+        self.array: Any = None
+
 
 class LinuxVirtualCameraSink(VirtualCameraSink):
-    """Virtual camera sink for Linux.
+    """Virtual camera sink for a v4l2loopback output device.
 
-    Consider using v4l2loopback to create a device node and write frames.
+    Frames are rgb24 (converted to ``pixel_format``, which needs NumPy) or
+    already in ``pixel_format`` (``YUYV`` or ``NV12``), in which case they are
+    copied unchanged; decoding straight to the device format is the cheapest
+    path. With ``io_method="mmap"`` frames are written into driver buffers
+    mapped into this process and queued with ``VIDIOC_QBUF``; ``"write"`` uses
+    ``write()`` on the device and ``"auto"`` picks mmap when the driver
+    supports streaming I/O. ``ioctl`` defaults to ``fcntl.ioctl`` and can be
+    replaced to drive the sink without a real device.
     """
 
+    def __init__(
+        self,
+        device_path: str = "/dev/video0",
+        *,
+        pixel_format: str = "YUYV",
+        io_method: str = "auto",
+        buffer_count: int = 4,
+        ioctl: Optional[Callable[[int, int, Any], Any]] = None,
+    ) -> None:
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format '{pixel_format}'.")
+        if io_method not in IO_METHODS:
+            raise ValueError(f"Unknown io_method '{io_method}'.")
+        if buffer_count <= 0:
+            raise ValueError("buffer_count must be positive.")
+        self.device_path = device_path
+        self.pixel_format = pixel_format
+        self.io_method = io_method
+        self.buffer_count = buffer_count
+        self.active_io_method: Optional[str] = None
+        self._ioctl = ioctl
+        self._fd: Optional[int] = None
+        self._layout: Optional[_FrameLayout] = None
+        self._converter: Optional[_RGBToYUV] = None
+        self._buffers: list[_MappedBuffer] = []
+        self._free: Deque[int] = deque()
+        self._streaming = False
+        self._write_buffer: Optional[bytearray] = None
+        self._write_array: Any = None
+
     def open(self, width: int, height: int, fps: float) -> None:
-        raise NotImplementedError(
-            "Linux virtual camera sink not implemented. "
-            "Consider v4l2loopback integration."
-        )
+        if self._fd is not None:
+            raise RuntimeError("Sink is already open.")
+        if width <= 0 or height <= 0 or width % 2 or height % 2:
+            raise ValueError("width and height must be positive and even.")
+        if self._ioctl is None and _fcntl is None:
+            raise RuntimeError("fcntl is required for the Linux virtual camera sink.")
+        self._fd = os.open(self.device_path, os.O_RDWR)
+        try:
+            capabilities = self._query_capabilities()
+            self._layout = self._set_format(width, height)
+            self._set_frame_rate(fps)
+            self._converter = (
+                _RGBToYUV(width, height, self.pixel_format) if _np is not None else None
+            )
+            self._setup_io(capabilities)
+        except BaseException:
+            self.close()
+            raise
 
     def write(self, frame: bytes) -> None:
-        raise NotImplementedError("Linux virtual camera sink not implemented.")
+        if self._fd is None or self._layout is None:
+            raise RuntimeError("Sink is not open.")
+        if self.active_io_method == "mmap":
+            buffer = self._buffers[self._next_buffer_index()]
+            self._fill(frame, buffer.mapping, buffer.array)
+            self._queue_buffer(buffer.index)
+            return
+        self._fill(frame, self._write_buffer, self._write_array)
+        view = memoryview(self._write_buffer)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
 
     def close(self) -> None:
-        raise NotImplementedError("Linux virtual camera sink not implemented.")
+        if self._fd is None:
+            return
+        try:
+            if self._streaming:
+                try:
+                    self._call(VIDIOC_STREAMOFF, ctypes.c_int(_BUF_TYPE_VIDEO_OUTPUT))
+                except OSError:
+                    pass
+            for buffer in self._buffers:
+                buffer.array = None
+                buffer.mapping.close()
+        finally:
+            self._buffers = []
+            self._free.clear()
+            self._streaming = False
+            self._write_buffer = None
+            self._write_array = None
+            self.active_io_method = None
+            os.close(self._fd)
+            self._fd = None
+
+    def _call(self, request: int, argument: Any) -> None:
+        ioctl = self._ioctl or _fcntl.ioctl
+        ioctl(self._fd, request, argument)
+
+    def _query_capabilities(self) -> int:
+        capability = _Capability()
+        self._call(VIDIOC_QUERYCAP, capability)
+        capabilities = capability.capabilities
+        if capabilities & _CAP_DEVICE_CAPS:
+            capabilities = capability.device_caps
+        if not capabilities & _CAP_VIDEO_OUTPUT:
+            raise RuntimeError(f"{self.device_path} is not a video output device.")
+        return capabilities
+
+    def _set_format(self, width: int, height: int) -> _FrameLayout:
+        fmt = _Format(type=_BUF_TYPE_VIDEO_OUTPUT)
+        pix = fmt.fmt.pix
+        pix.width = width
+        pix.height = height
+        pix.pixelformat = PIXEL_FORMATS[self.pixel_format]
+        pix.field = _FIELD_NONE
+        pix.colorspace = _COLORSPACE_SMPTE170M
+        layout = _FrameLayout(width, height, self.pixel_format, 0, 0)
+        pix.bytesperline = layout.row_bytes
+        pix.sizeimage = layout.packed_size
+        self._call(VIDIOC_S_FMT, fmt)
+        if (pix.width, pix.height) != (width, height):
+            raise RuntimeError(
+                f"Device adjusted the format to {pix.width}x{pix.height}."
+            )
+        return _FrameLayout(
+            width,
+            height,
+            self.pixel_format,
+            max(pix.bytesperline, layout.row_bytes),
+            max(pix.sizeimage, layout.packed_size),
+        )
+
+    def _set_frame_rate(self, fps: float) -> None:
+        if fps <= 0:
+            raise ValueError("fps must be positive.")
+        rate = Fraction(fps).limit_denominator(1001)
+        parm = _StreamParm(type=_BUF_TYPE_VIDEO_OUTPUT)
+        parm.parm.output.timeperframe.numerator = rate.denominator
+        parm.parm.output.timeperframe.denominator = rate.numerator
+        try:
+            self._call(VIDIOC_S_PARM, parm)
+        except OSError:
+            # Frame rate is advisory for loopback devices.
+            pass
+
+    def _setup_io(self, capabilities: int) -> None:
+        use_mmap = self.io_method == "mmap" or (
+            self.io_method == "auto" and capabilities & _CAP_STREAMING
+        )
+        if use_mmap:
+            try:
+                self._map_buffers()
+                self.active_io_method = "mmap"
+                return
+            except OSError:
+                if self.io_method == "mmap":
+                    raise
+                self._unmap_buffers()
+        if not capabilities & _CAP_READWRITE and self.io_method == "auto":
+            raise RuntimeError(f"{self.device_path} supports neither mmap nor write().")
+        self._write_buffer = bytearray(self._layout.sizeimage)
+        self._write_array = self._frame_array(self._write_buffer)
+        self.active_io_method = "write"
+
+    def _map_buffers(self) -> None:
+        request = _RequestBuffers(
+            count=self.buffer_count, type=_BUF_TYPE_VIDEO_OUTPUT, memory=_MEMORY_MMAP
+        )
+        self._call(VIDIOC_REQBUFS, request)
+        if request.count == 0:
+            raise OSError("Device granted no mmap buffers.")
+        for index in range(request.count):
+            info = _Buffer(
+                index=index, type=_BUF_TYPE_VIDEO_OUTPUT, memory=_MEMORY_MMAP
+            )
+            self._call(VIDIOC_QUERYBUF, info)
+            mapping = mmap.mmap(
+                self._fd,
+                info.length,
+                flags=mmap.MAP_SHARED,
+                prot=mmap.PROT_READ | mmap.PROT_WRITE,
+                offset=info.m.offset,
+            )
+            buffer = _MappedBuffer(index, mapping)
+            buffer.array = self._frame_array(mapping)
+            self._buffers.append(buffer)
+            self._free.append(index)
+
+    def _unmap_buffers(self) -> None:
+        for buffer in self._buffers:
+            buffer.array = None
+            buffer.mapping.close()
+        self._buffers = []
+        self._free.clear()
+
+    def _frame_array(self, target: Any) -> Any:
+        """View ``target`` as (rows, row_bytes) uint8, skipping row padding."""
+
+        if _np is None:
+            return None
+        layout = self._layout
+        rows = _np.frombuffer(
+            target, dtype=_np.uint8, count=layout.rows * layout.bytesperline
+        ).reshape(layout.rows, layout.bytesperline)
+        return rows[:, : layout.row_bytes]
+
+    def _fill(self, frame: bytes, target: Any, array: Any) -> None:
+        layout = self._layout
+        size = len(frame)
+        if size == layout.rgb_size:
+            if self._converter is None:
+                raise RuntimeError(
+                    "NumPy is required to convert rgb24 frames; write frames in "
+                    f"{self.pixel_format} instead."
+                )
+            self._converter.convert(frame, array)
+        elif size == layout.packed_size:
+            if layout.bytesperline == layout.row_bytes:
+                target[:size] = frame
+            elif array is not None:
+                array[...] = _np.frombuffer(frame, dtype=_np.uint8).reshape(
+                    layout.rows, layout.row_bytes
+                )
+            else:
+                raise RuntimeError("NumPy is required for padded device rows.")
+        else:
+            raise ValueError(
+                f"Frame has {size} bytes; expected {layout.rgb_size} (rgb24) or "
+                f"{layout.packed_size} ({self.pixel_format})."
+            )
+
+    def _next_buffer_index(self) -> int:
+        if self._free:
+            return self._free.popleft()
+        done = _Buffer(type=_BUF_TYPE_VIDEO_OUTPUT, memory=_MEMORY_MMAP)
+        self._call(VIDIOC_DQBUF, done)
+        return done.index
+
+    def _queue_buffer(self, index: int) -> None:
+        buffer = _Buffer(
+            index=index,
+            type=_BUF_TYPE_VIDEO_OUTPUT,
+            memory=_MEMORY_MMAP,
+            bytesused=self._layout.sizeimage,
+            field=_FIELD_NONE,
+        )
+        self._call(VIDIOC_QBUF, buffer)
+        if not self._streaming:
+            self._call(VIDIOC_STREAMON, ctypes.c_int(_BUF_TYPE_VIDEO_OUTPUT))
+            self._streaming = True
+
+
+__all__ = ["LinuxVirtualCameraSink", "PIXEL_FORMATS"]
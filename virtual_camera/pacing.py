@@ -0,0 +1,329 @@
+"""Frame pacing for virtual camera sinks."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional
+
+from .base import VirtualCameraSink
+
+_LATENCY_BOUNDS_MS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+class _TickSchedule:
+    """Deadlines of a monotonic ``interval`` schedule.
+
+    When the caller falls more than a tick behind, :meth:`advance` skips the
+    missed ticks instead of letting them burst out to catch up.
+    """
+
+    def __init__(self, interval: float, start: float) -> None:
+        self.interval = interval
+        self.start = start
+        self.deadline = start
+
+    @property
+    def elapsed(self) -> float:
+        return self.deadline - self.start
+
+    def is_late(self, jitter: float) -> bool:
+        return jitter > self.interval / 2
+
+    def advance(self, now: float) -> int:
+        """Move to the next tick; return how many ticks were skipped."""
+
+        self.deadline += self.interval
+        behind = now - self.deadline
+        if behind <= self.interval:
+            return 0
+        missed = int(behind // self.interval)
+        self.deadline += missed * self.interval
+        return missed
+
+
+class AsyncPacedWriter:
+    """Write frames to a sink from asyncio at a steady frame rate.
+
+    Each :meth:`write` waits for the next tick of the same schedule
+    :class:`PacedSinkWriter` uses before handing the frame to
+    ``sink.write_async``. Frames written more than half a tick after their
+    deadline count as late, and after a stall the missed ticks are skipped
+    rather than written as a burst of catch-up frames.
+    """
+
+    def __init__(
+        self,
+        sink: VirtualCameraSink,
+        fps: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if fps <= 0:
+            raise ValueError("fps must be positive.")
+        self.sink = sink
+        self.interval = 1.0 / fps
+        self.late_frames = 0
+        self.missed_ticks = 0
+        self._clock = clock
+        self._schedule: Optional[_TickSchedule] = None
+
+    async def write(self, frame: bytes) -> None:
+        schedule = self._schedule
+        if schedule is None:
+            schedule = self._schedule = _TickSchedule(self.interval, self._clock())
+        else:
+            delay = schedule.deadline - self._clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if schedule.is_late(self._clock() - schedule.deadline):
+            self.late_frames += 1
+        await self.sink.write_async(frame)
+        self.missed_ticks += schedule.advance(self._clock())
+
+    def reset(self) -> None:
+        """Forget the schedule, e.g. after the stream was paused."""
+
+        self._schedule = None
+
+
+class LatencyHistogram:
+    """Counts of durations in fixed millisecond buckets."""
+
+    def __init__(self, bounds_ms: tuple[float, ...] = _LATENCY_BOUNDS_MS) -> None:
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds_ms, seconds * 1000.0)] += 1
+
+    def as_dict(self) -> dict[str, int]:
+        labels = [f"<={bound:g}ms" for bound in self.bounds_ms]
+        labels.append(f">{self.bounds_ms[-1]:g}ms")
+        return dict(zip(labels, self.counts))
+
+
+@dataclass(frozen=True)
+class PacingStats:
+    frames_written: int
+    new_frames: int
+    repeated_frames: int
+    skipped_frames: int
+    late_frames: int
+    missed_ticks: int
+    mean_jitter: float
+    max_jitter: float
+    write_latency: dict[str, int]
+
+
+@dataclass(frozen=True)
+class _PendingFrame:
+    frame: bytes
+    pts: Optional[float]
+
+
+class PacedSinkWriter(VirtualCameraSink):
+    """Wrap a sink so it receives exactly one frame per ``1 / fps`` tick.
+
+    :meth:`write` queues frames for a pacing thread, blocking while
+    ``max_pending`` frames are waiting. At every tick of a monotonic schedule
+    the oldest due frame is written; when none is due, e.g. because dedup
+    dropped frames, the last frame is repeated. Frames with a ``pts`` are due
+    once the schedule reaches it, relative to the first frame, and are
+    skipped as stale only when they are more than a tick behind and a newer
+    frame is due. Frames without one are due immediately, one per tick. If
+    writing falls more than a tick behind, the schedule skips the missed
+    ticks instead of bursting to catch up.
+    """
+
+    def __init__(
+        self,
+        sink: VirtualCameraSink,
+        fps: Optional[float] = None,
+        *,
+        max_pending: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if fps is not None and fps <= 0:
+            raise ValueError("fps must be positive.")
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive.")
+        self.sink = sink
+        self.fps = fps
+        self.max_pending = max_pending
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._pending: Deque[_PendingFrame] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._drain = True
+        self._error: Optional[BaseException] = None
+        self._reset_stats()
+
+    @classmethod
+    def from_config(cls, sink: VirtualCameraSink, config: Any) -> PacedSinkWriter:
+        """Pace at ``config.output_fps``, e.g. of a ``cc.DedupeConfig``."""
+
+        return cls(sink, fps=float(config.output_fps))
+
+    def open(self, width: int, height: int, fps: float) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Writer is already open.")
+        rate = self.fps or fps
+        if rate <= 0:
+            raise ValueError("fps must be positive.")
+        self.sink.open(width, height, rate)
+        self._interval = 1.0 / rate
+        self._closing = False
+        self._error = None
+        self._reset_stats()
+        self._thread = threading.Thread(
+            target=self._run, name="paced-sink-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, frame: bytes, pts: Optional[float] = None) -> None:
+        with self._condition:
+            while len(self._pending) >= self.max_pending and not self._closing:
+                self._condition.wait()
+            self._raise_error()
+            if self._closing:
+                raise RuntimeError("Writer is closed.")
+            self._pending.append(_PendingFrame(frame, pts))
+            self._condition.notify_all()
+
+    def close(self, *, drain: bool = True) -> None:
+        """Stop pacing; with ``drain`` pending frames are written first."""
+
+        thread = self._thread
+        with self._condition:
+            self._closing = True
+            self._drain = drain
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        self.sink.close()
+        with self._condition:
+            self._raise_error()
+
+    def stats(self) -> PacingStats:
+        with self._condition:
+            ticks = self._frames_written
+            return PacingStats(
+                frames_written=ticks,
+                new_frames=self._new_frames,
+                repeated_frames=ticks - self._new_frames,
+                skipped_frames=self._skipped_frames,
+                late_frames=self._late_frames,
+                missed_ticks=self._missed_ticks,
+                mean_jitter=self._jitter_total / ticks if ticks else 0.0,
+                max_jitter=self._max_jitter,
+                write_latency=self._write_latency.as_dict(),
+            )
+
+    def _reset_stats(self) -> None:
+        self._frames_written = 0
+        self._new_frames = 0
+        self._skipped_frames = 0
+        self._late_frames = 0
+        self._missed_ticks = 0
+        self._jitter_total = 0.0
+        self._max_jitter = 0.0
+        self._write_latency = LatencyHistogram()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Paced sink write failed.") from error
+
+    def _run(self) -> None:
+        try:
+            self._pace()
+        except BaseException as error:
+            with self._condition:
+                self._error = error
+                self._closing = True
+                self._condition.notify_all()
+
+    def _pace(self) -> None:
+        with self._condition:
+            while not self._pending and not self._closing:
+                self._condition.wait()
+            if not self._pending or not self._drain:
+                return
+            first_pts = self._pending[0].pts or 0.0
+        schedule = _TickSchedule(self._interval, self._clock())
+        last: Optional[bytes] = None
+        while True:
+            if not self._wait_until(schedule.deadline):
+                return
+            frame = self._take_due(first_pts + schedule.elapsed)
+            if frame is None:
+                with self._condition:
+                    if self._closing and not self._pending:
+                        return
+                frame = last
+            else:
+                last = frame
+            if frame is not None:
+                self._write_tick(frame, schedule)
+            missed = schedule.advance(self._clock())
+            if missed:
+                with self._condition:
+                    self._missed_ticks += missed
+
+    def _wait_until(self, deadline: float) -> bool:
+        with self._condition:
+            while True:
+                if self._closing and not (self._drain and self._pending):
+                    return False
+                delay = deadline - self._clock()
+                if delay <= 0:
+                    return True
+                self._condition.wait(delay)
+
+    def _take_due(self, stream_time: float) -> Optional[bytes]:
+        with self._condition:
+            pending = self._pending
+            if not pending or not self._is_due(pending[0], stream_time):
+                return None
+            stale_before = stream_time - self._interval - 1e-9
+            while len(pending) > 1 and self._is_due(pending[1], stream_time):
+                pts = pending[0].pts
+                if pts is None or pts >= stale_before:
+                    break
+                pending.popleft()
+                self._skipped_frames += 1
+            self._new_frames += 1
+            self._condition.notify_all()
+            return pending.popleft().frame
+
+    @staticmethod
+    def _is_due(pending: _PendingFrame, stream_time: float) -> bool:
+        return pending.pts is None or pending.pts <= stream_time + 1e-9
+
+    def _write_tick(self, frame: bytes, schedule: _TickSchedule) -> None:
+        started = self._clock()
+        self.sink.write(frame)
+        finished = self._clock()
+        jitter = started - schedule.deadline
+        with self._condition:
+            self._frames_written += 1
+            self._jitter_total += jitter
+            self._max_jitter = max(self._max_jitter, jitter)
+            if schedule.is_late(jitter):
+                self._late_frames += 1
+            self._write_latency.record(finished - started)
+
+
+__all__ = [
+    "AsyncPacedWriter",
+    "LatencyHistogram",
+    "PacedSinkWriter",
+    "PacingStats",
+]